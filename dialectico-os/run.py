@@ -6,11 +6,28 @@ Dialéctico OS - Ejecutor Principal
 
 import os
 import sys
+import multiprocessing
 
 # Agregar src al path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from src.app import app, init_db
+from src.app import app, init_db, proveedor_feriados
+
+
+def servir_produccion(port: int, workers: int):
+    """Reemplazar el proceso por gunicorn con varios workers"""
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    # La caché en memoria es por worker: una escritura solo invalida la del
+    # que la atendió. La de SQLite la comparten todos
+    entorno = {**os.environ, 'CACHE_RESPUESTAS': os.environ.get('CACHE_RESPUESTAS', 'sqlite')}
+    os.execvpe(sys.executable, [
+        sys.executable, '-m', 'gunicorn',
+        '--chdir', raiz,
+        '--workers', str(workers),
+        '--bind', f'0.0.0.0:{port}',
+        '--access-logfile', '-',
+        'wsgi:app'
+    ], entorno)
 
 if __name__ == '__main__':
     import argparse
@@ -19,6 +36,20 @@ if __name__ == '__main__':
     parser.add_argument('--init', action='store_true', help='Inicializar base de datos')
     parser.add_argument('--port', type=int, default=8080, help='Puerto')
     parser.add_argument('--debug', action='store_true', help='Modo debug')
+    parser.add_argument('--recalcular', action='store_true', help='Recalcular vencimientos de todos los plazos (tras editar Feriado o Suspension '
+                             'directamente en la base; la API ya recalcula los afectados)')
+    parser.add_argument('--alertas', action='store_true', help='Escanear plazos y notificar alertas (una vez, para cron)')
+    parser.add_argument('--programador', action='store_true',
+                        help='Escanear alertas a diario y recordatorios de tareas (proceso dedicado)')
+    parser.add_argument('--recordatorios', metavar='DESTINO', choices=['notificaciones', 'whatsapp', 'correo'],
+                        help='Enviar recordatorios de tareas por vencer (una vez, para cron)')
+    parser.add_argument('--importar', nargs=2, metavar=('TIPO', 'ARCHIVO'),
+                        help='Importar clientes, casos o plazos desde un CSV o XLSX')
+    parser.add_argument('--podar-cambios', action='store_true',
+                        help='Borrar del registro de cambios lo anterior a CAMBIOS_RETENCION_DIAS (30)')
+    parser.add_argument('--produccion', action='store_true', help='Servir con gunicorn (varios workers)')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count() * 2 + 1,
+                        help='Workers de gunicorn en modo producción')
     
     args = parser.parse_args()
     
@@ -26,6 +57,59 @@ if __name__ == '__main__':
         print("🔧 Inicializando base de datos...")
         init_db()
         print("✅ Base de datos lista")
+    elif args.recalcular:
+        from src.recalculo import recalcular_plazos
+        with app.app_context():
+            resultado = recalcular_plazos(proveedor_feriados.calendario())
+        print(f"✅ {resultado.actualizados} de {resultado.revisados} plazos actualizados en {resultado.segundos:.2f}s")
+    elif args.alertas:
+        from src.alertas import escanear_alertas, notificador_polab
+        with app.app_context():
+            resultado = escanear_alertas(notificar=notificador_polab())
+        print(f"🔔 {resultado.notificados} plazos notificados {resultado.por_estado}, "
+              f"{resultado.recalculados} estados recalculados en {resultado.segundos:.2f}s")
+    elif args.recordatorios:
+        from src.recordatorios import enviar_recordatorios, crear_destino
+        with app.app_context():
+            resultado = enviar_recordatorios(crear_destino(args.recordatorios))
+        print(f"📨 {resultado.enviados} resúmenes enviados ({resultado.tareas} tareas), "
+              f"{len(resultado.fallidos)} fallidos en {resultado.segundos:.2f}s")
+    elif args.programador:
+        from src.alertas import ProgramadorAlertas, notificador_polab
+        from src.recordatorios import ProgramadorRecordatorios, crear_destino
+        programador = ProgramadorAlertas(app, notificar=notificador_polab())
+        recordatorios = ProgramadorRecordatorios(
+            app, crear_destino(os.environ.get('DESTINO_RECORDATORIOS', 'notificaciones'))
+        )
+        print(f"⏰ Escaneo de alertas diario a las {programador.hora.strftime('%H:%M')}, "
+              f"recordatorios de tareas cada {recordatorios.intervalo} minutos")
+        programador.start()
+        recordatorios.start()
+        try:
+            programador.join()
+        except KeyboardInterrupt:
+            programador.detener()
+            recordatorios.detener()
+    elif args.importar:
+        from src.importacion import importar, leer_archivo
+        tipo, ruta = args.importar
+        with open(ruta, 'rb') as archivo, app.app_context():
+            resultado = importar(tipo, leer_archivo(archivo, ruta), proveedor_feriados.calendario())
+        for error in resultado.errores[:20]:
+            print(f"   fila {error.fila}: {error.mensaje}")
+        if len(resultado.errores) > 20:
+            print(f"   ... y {len(resultado.errores) - 20} errores más")
+        print(f"📥 {resultado.insertadas} de {resultado.leidas} {tipo} importados, "
+              f"{len(resultado.errores)} con errores, en {resultado.segundos:.2f}s")
+    elif args.podar_cambios:
+        from src.cambios import podar_cambios, RETENCION_DIAS
+        with app.app_context():
+            borrados = podar_cambios()
+        print(f"🧹 {borrados} cambios con más de {RETENCION_DIAS} días borrados")
+    elif args.produccion:
+        os.makedirs(os.path.dirname(os.path.abspath(__file__)) + '/db', exist_ok=True)
+        print(f"🚀 Dialéctico OS en http://0.0.0.0:{args.port} con {args.workers} workers")
+        servir_produccion(args.port, args.workers)
     else:
         # Asegurar que existe el directorio
         os.makedirs(os.path.dirname(os.path.abspath(__file__)) + '/db', exist_ok=True)
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Dialéctico OS - Benchmarks
+==========================
+
+Mide el motor de plazos (calcular_vencimiento por tipo y duración,
+dias_habiles_entre sobre varios años, cambios de feriados) y las rutas
+principales con el cliente de test de Flask sobre bases sintéticas de
+1k/10k/100k casos.
+
+Los resultados se guardan en JSON y se comparan contra una línea base;
+el proceso termina con código 1 si algún tiempo empeora más que el umbral:
+
+    python3 scripts/benchmark.py --guardar scripts/benchmark_base.json
+    # ... cambio en el motor ...
+    python3 scripts/benchmark.py --comparar scripts/benchmark_base.json
+
+Para una pasada rápida: --escalas 1000 o --solo motor.
+
+Las mediciones principales son en frío: calendario sin caché de
+vencimientos (tamaño_cache=0), caché de respuestas apagada y cachés ICS
+vacías en cada llamada, para que detecten regresiones del motor y de las
+consultas. Los aciertos de caché se miden aparte, con sufijo `.cache`.
+"""
+
+from datetime import date, datetime, timedelta
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+ESCALAS = [1000, 10000, 100000]
+UMBRAL = 0.20
+
+# Rutas medidas por escala (/casos no tiene plantilla)
+RUTAS = [
+    '/', '/clientes', '/tareas', '/api/plazos', '/api/plazos?formato=jsonl', '/caso/{caso_id}',
+    '/api/buscar?q=materia+{caso_id}', '/api/buscar?q=cli',
+    '/api/calendario.ics?caso={caso_id}',
+]
+
+# Rutas con caché (de respuestas o de feed ICS): también se miden en caliente
+RUTAS_CON_CACHE = [
+    '/api/plazos', '/api/buscar?q=materia+{caso_id}', '/api/buscar?q=cli',
+    '/api/calendario.ics?caso={caso_id}',
+]
+
+TIPOS = ['corrido', 'habil', 'judicial']
+DURACIONES = [5, 30, 180, 365]
+SPANS_AÑOS = [1, 5, 20]
+
+INICIO = date(2025, 3, 3)
+
+# ============ MEDICIÓN ============
+
+def medir(funcion, repeticiones: int = 5, minimo_segundos: float = 0.05) -> float:
+    """
+    Segundos por llamada: mediana de `repeticiones` tandas.
+
+    Cada tanda repite la función hasta durar al menos `minimo_segundos`
+    (calibrado en la primera), para que las operaciones cortas no queden
+    dominadas por la resolución del reloj.
+    """
+    numero = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(numero):
+            funcion()
+        duracion = time.perf_counter() - inicio
+        if duracion >= minimo_segundos or numero >= 1 << 20:
+            break
+        numero *= 2
+
+    tiempos = [duracion / numero]
+    for _ in range(repeticiones - 1):
+        inicio = time.perf_counter()
+        for _ in range(numero):
+            funcion()
+        tiempos.append((time.perf_counter() - inicio) / numero)
+    return statistics.median(tiempos)
+
+# ============ MOTOR DE PLAZOS ============
+
+def bench_motor() -> dict:
+    """Tiempos del calendario en memoria"""
+    from src.deadlines import CalendarioChileno
+
+    resultados = {}
+    # Sin caché de vencimientos: cada llamada recorre el calendario
+    calendario = CalendarioChileno(tamaño_cache=0)
+    # Calentar índices y feriados generados para medir el estado estable
+    calendario.calcular_vencimiento(INICIO, 365, 'habil')
+
+    for tipo in TIPOS:
+        for dias in DURACIONES:
+            resultados[f'motor.calcular_vencimiento.{tipo}.{dias}'] = medir(
+                lambda: calendario.calcular_vencimiento(INICIO, dias, tipo)
+            )
+
+    for años in SPANS_AÑOS:
+        fin = INICIO + timedelta(days=365 * años)
+        resultados[f'motor.dias_habiles_entre.{años}a'] = medir(
+            lambda: calendario.dias_habiles_entre(INICIO, fin)
+        )
+
+    azar = random.Random(1)
+    lote = [
+        (INICIO + timedelta(days=azar.randrange(3650)), azar.randrange(1, 180), azar.choice(TIPOS))
+        for _ in range(10000)
+    ]
+    resultados['motor.calcular_vencimientos.lote_10000'] = medir(
+        lambda: calendario.calcular_vencimientos(lote), repeticiones=3
+    )
+
+    # Un cambio de feriado invalida los índices: medir el ciclo completo
+    feriado = date(2026, 7, 7)
+    def ciclo_feriado():
+        calendario.agregar_feriado(feriado, 'Benchmark')
+        calendario.calcular_vencimiento(INICIO, 365, 'habil')
+        calendario.remover_feriado(feriado)
+        calendario.calcular_vencimiento(INICIO, 365, 'habil')
+    resultados['motor.feriado.agregar_remover_recalcular'] = medir(ciclo_feriado)
+
+    resultados['motor.calendario.nuevo'] = medir(
+        lambda: CalendarioChileno().calcular_vencimiento(INICIO, 30, 'habil')
+    )
+
+    con_cache = CalendarioChileno()
+    con_cache.calcular_vencimiento(INICIO, 30, 'habil')
+    resultados['motor.calcular_vencimiento.cache'] = medir(
+        lambda: con_cache.calcular_vencimiento(INICIO, 30, 'habil')
+    )
+    return resultados
+
+# ============ RUTAS ============
+
+def poblar(db, casos: int):
+    """Base sintética: 1 cliente cada 10 casos, 2 tareas y 2 plazos por caso"""
+    from sqlalchemy import insert
+    from src.models import Cliente, Caso, Tarea, Plazo, Prioridad, TipoPlazo, EstadoCaso
+
+    azar = random.Random(casos)
+    hoy = date.today()
+    ahora = datetime.now()
+    lote = 10000
+
+    def insertar(modelo, filas):
+        for i in range(0, len(filas), lote):
+            db.session.execute(insert(modelo), filas[i:i + lote])
+
+    clientes = max(1, casos // 10)
+    insertar(Cliente, [
+        {'id': i, 'nombre': f'Cliente {i}', 'rut': f'{i:08d}-{i % 10}', 'creado': ahora, 'actualizado': ahora}
+        for i in range(1, clientes + 1)
+    ])
+    estados = list(EstadoCaso)
+    insertar(Caso, [
+        {
+            'id': i, 'cliente_id': azar.randint(1, clientes), 'materia': f'Materia {i}',
+            'estado': azar.choice(estados), 'fecha_inicio': hoy - timedelta(days=azar.randrange(720)),
+            'creado': ahora, 'actualizado': ahora
+        }
+        for i in range(1, casos + 1)
+    ])
+    prioridades = list(Prioridad)
+    insertar(Tarea, [
+        {
+            'caso_id': 1 + i // 2, 'titulo': f'Tarea {i}', 'prioridad': azar.choice(prioridades),
+            'completado': azar.random() < 0.5, 'fecha_vencimiento': hoy + timedelta(days=azar.randrange(-30, 60)),
+            'creado': ahora, 'actualizado': ahora
+        }
+        for i in range(casos * 2)
+    ])
+    tipos = list(TipoPlazo)
+    filas = []
+    for i in range(casos * 2):
+        inicio = hoy - timedelta(days=azar.randrange(60))
+        dias = azar.randrange(5, 60)
+        filas.append({
+            'caso_id': 1 + i // 2, 'titulo': f'Plazo {i}', 'tipo': azar.choice(tipos), 'dias': dias,
+            'fecha_inicio': inicio, 'fecha_vencimiento': inicio + timedelta(days=dias),
+            'suspendido': False, 'creado': ahora, 'actualizado': ahora
+        })
+    insertar(Plazo, filas)
+    db.session.commit()
+
+def nombre_ruta(ruta: str) -> str:
+    """'/api/plazos?formato=jsonl' -> 'api.plazos.jsonl'"""
+    camino, _, consulta = ruta.partition('?')
+    partes = [p for p in camino.split('/') if p and not p.startswith('{')] or ['index']
+    if 'jsonl' in consulta:
+        partes.append('jsonl')
+    elif consulta.startswith('caso='):
+        partes.append('caso')
+    elif consulta.startswith('q='):
+        # Palabra completa o prefijo corto
+        partes.append('exacta' if '{' in consulta else 'prefijo')
+    return '.'.join(partes)
+
+def bench_rutas(escalas) -> dict:
+    """Tiempos de las rutas principales por escala, en frío y con caché"""
+    from src.app import app, db
+    from src.busqueda import instalar_busqueda
+    from src.cache_respuestas import cache, AlmacenMemoria
+    from src import calendario_ics
+
+    resultados = {}
+    cliente_http = app.test_client()
+    original = cache.almacen
+
+    def en_frio(url):
+        calendario_ics.eventos.limpiar()
+        calendario_ics.feeds.limpiar()
+        return cliente_http.get(url).get_data()
+    with app.app_context():
+        for casos in escalas:
+            db.drop_all()
+            db.create_all()
+            inicio = time.perf_counter()
+            poblar(db, casos)
+            instalar_busqueda(db.session.connection())
+            db.session.commit()
+            print(f"  {casos} casos poblados en {time.perf_counter() - inicio:.1f}s", file=sys.stderr)
+            db.session.remove()
+
+            cache.almacen = None
+            con_cache = []
+            for ruta in RUTAS:
+                url = ruta.format(caso_id=casos // 2)
+                respuesta = cliente_http.get(url)
+                if respuesta.status_code != 200:
+                    raise RuntimeError(f"{url} respondió {respuesta.status_code}")
+                resultados[f'rutas.{casos}.{nombre_ruta(ruta)}'] = medir(
+                    lambda: en_frio(url), repeticiones=3, minimo_segundos=0.2
+                )
+                if ruta in RUTAS_CON_CACHE:
+                    con_cache.append((ruta, url))
+
+            cache.almacen = AlmacenMemoria()
+            for ruta, url in con_cache:
+                cliente_http.get(url)
+                resultados[f'rutas.{casos}.{nombre_ruta(ruta)}.cache'] = medir(
+                    lambda: cliente_http.get(url).get_data(), repeticiones=3, minimo_segundos=0.2
+                )
+        db.drop_all()
+    cache.almacen = original
+    return resultados
+
+# ============ LÍNEA BASE ============
+
+def comparar(actual: dict, base: dict, umbral: float) -> list:
+    """Mediciones que empeoraron más que `umbral` respecto de la base"""
+    regresiones = []
+    for nombre, segundos in sorted(actual.items()):
+        anterior = base.get(nombre)
+        if anterior is None:
+            print(f"{nombre:55s} {segundos * 1e6:12.1f} µs  (nuevo)")
+            continue
+        cambio = segundos / anterior - 1
+        marca = ''
+        if cambio > umbral:
+            marca = '  ← REGRESIÓN'
+            regresiones.append(nombre)
+        print(f"{nombre:55s} {segundos * 1e6:12.1f} µs  {cambio:+7.1%}{marca}")
+    return regresiones
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks de Dialéctico OS')
+    parser.add_argument('--escalas', type=int, nargs='+', default=ESCALAS, help='Casos por base sintética')
+    parser.add_argument('--solo', choices=['motor', 'rutas'], help='Medir solo una parte')
+    parser.add_argument('--guardar', help='Guardar resultados como línea base en este JSON')
+    parser.add_argument('--comparar', help='Comparar contra la línea base de este JSON')
+    parser.add_argument('--umbral', type=float, default=UMBRAL, help='Empeoramiento tolerado (0.20 = 20%%)')
+    args = parser.parse_args()
+
+    # Base temporal propia: nunca tocar la base real
+    directorio = tempfile.mkdtemp(prefix='dialectico-bench-')
+    os.environ['DB_PATH'] = os.path.join(directorio, 'bench.db')
+
+    resultados = {}
+    if args.solo in (None, 'motor'):
+        print("⏱️  Motor de plazos...", file=sys.stderr)
+        resultados.update(bench_motor())
+    if args.solo in (None, 'rutas'):
+        print("⏱️  Rutas...", file=sys.stderr)
+        resultados.update(bench_rutas(args.escalas))
+
+    salida = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'resultados': resultados,
+    }
+
+    regresiones = []
+    if args.comparar:
+        with open(args.comparar) as f:
+            base = json.load(f)['resultados']
+        regresiones = comparar(resultados, base, args.umbral)
+    else:
+        print(json.dumps(salida, indent=2))
+
+    if args.guardar:
+        with open(args.guardar, 'w') as f:
+            json.dump(salida, f, indent=2)
+        print(f"💾 Línea base guardada en {args.guardar}", file=sys.stderr)
+
+    if regresiones:
+        print(f"❌ {len(regresiones)} regresiones sobre {args.umbral:.0%}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Dialéctico OS - Prueba de Carga
+===============================
+
+Golpea un servidor en ejecución con varias conexiones concurrentes y
+reporta requests/segundo y latencias. Para comparar configuraciones,
+correr contra cada una con los mismos parámetros:
+
+    python3 run.py --port 8080                 # servidor de desarrollo
+    python3 scripts/prueba_carga.py --url http://localhost:8080
+
+    python3 run.py --produccion --port 8081    # gunicorn + WAL
+    python3 scripts/prueba_carga.py --url http://localhost:8081
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+RUTAS = ['/', '/clientes', '/tareas', '/api/plazos', '/api/calendario/feriados']
+
+
+def trabajador(base: str, rutas, hasta: float, latencias: list, errores: list):
+    """Pedir las rutas en ciclo hasta el tiempo límite"""
+    i = 0
+    while time.perf_counter() < hasta:
+        ruta = rutas[i % len(rutas)]
+        i += 1
+        inicio = time.perf_counter()
+        try:
+            with urllib.request.urlopen(base + ruta, timeout=30) as respuesta:
+                respuesta.read()
+            latencias.append(time.perf_counter() - inicio)
+        except (urllib.error.URLError, OSError) as e:
+            errores.append(str(e))
+
+
+def medir(base: str, rutas, concurrencia: int, segundos: float) -> dict:
+    """Ejecutar la carga y resumir resultados"""
+    latencias, errores = [], []
+    hasta = time.perf_counter() + segundos
+    hilos = [
+        threading.Thread(target=trabajador, args=(base, rutas, hasta, latencias, errores))
+        for _ in range(concurrencia)
+    ]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+
+    latencias.sort()
+    percentil = lambda p: latencias[min(int(len(latencias) * p), len(latencias) - 1)] * 1000 if latencias else 0
+    return {
+        'url': base,
+        'concurrencia': concurrencia,
+        'requests': len(latencias),
+        'errores': len(errores),
+        'req_por_segundo': round(len(latencias) / duracion, 1),
+        'latencia_media_ms': round(statistics.mean(latencias) * 1000, 2) if latencias else 0,
+        'latencia_p95_ms': round(percentil(0.95), 2),
+        'latencia_p99_ms': round(percentil(0.99), 2),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prueba de carga de Dialéctico OS')
+    parser.add_argument('--url', default='http://localhost:8080', help='URL base del servidor')
+    parser.add_argument('--concurrencia', type=int, default=16, help='Conexiones simultáneas')
+    parser.add_argument('--segundos', type=float, default=20, help='Duración de la prueba')
+    parser.add_argument('--rutas', nargs='+', default=RUTAS, help='Rutas a pedir')
+    args = parser.parse_args()
+
+    print(json.dumps(medir(args.url.rstrip('/'), args.rutas, args.concurrencia, args.segundos), indent=2))
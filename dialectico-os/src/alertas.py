@@ -0,0 +1,275 @@
+# Dialéctico OS - Alertas de Plazos
+# =================================
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as hora_del_dia, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Optional
+import importlib.util
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import case, or_, select, update
+
+from .models import (
+    db, Caso, Cliente, Plazo, Configuracion, EstadoCaso, dias_alerta, rangos_estado
+)
+from .cambios import SIN_REGISTRO, podar_cambios
+
+logger = logging.getLogger(__name__)
+
+# Clave de Configuracion (la de días de alerta, CLAVE_DIAS_ALERTA, vive en models)
+CLAVE_ULTIMO_ESCANEO = 'ultimo_escaneo_alertas'
+
+# Estados que generan notificación, del más urgente al menos
+ESTADOS_NOTIFICABLES = ('vencido', 'hoy', 'critico', 'alerta')
+
+# Casos cuyos plazos ya no se notifican
+ESTADOS_CASO_CERRADOS = (EstadoCaso.TERMINADO, EstadoCaso.ARCHIVADO)
+
+TITULOS = {
+    'vencido': 'Plazos vencidos',
+    'hoy': 'Plazos que vencen hoy',
+    'critico': 'Plazos críticos',
+    'alerta': 'Plazos próximos a vencer',
+}
+PRIORIDADES = {'vencido': 'high', 'hoy': 'high', 'critico': 'high', 'alerta': 'normal'}
+
+# Plazos listados por notificación; el resto se resume en una línea
+MAX_LINEAS = 50
+
+# Hora local del escaneo diario del programador
+HORA_ESCANEO = hora_del_dia.fromisoformat(os.environ.get('HORA_ESCANEO_ALERTAS', '06:00'))
+
+# Sistema de notificaciones de POLAB (hermano de dialectico-os en el repo)
+RUTA_NOTIFICACIONES = Path(os.environ.get(
+    'POLAB_NOTIFICACIONES',
+    Path(__file__).resolve().parents[2] / 'projects' / 'polab' / 'notifications' / 'system.py'
+))
+
+# notificar(titulo, mensaje, tipo, prioridad)
+Notificador = Callable[[str, str, str, str], object]
+
+# ============ RESULTADO ============
+
+@dataclass
+class ResultadoAlertas:
+    """Resumen de un escaneo de alertas"""
+    fecha: Optional[date] = None
+    recalculados: int = 0
+    notificados: int = 0
+    por_estado: Dict[str, int] = field(default_factory=dict)
+    segundos: float = 0.0
+
+    def to_dict(self):
+        return {
+            'fecha': self.fecha.isoformat() if self.fecha else None,
+            'recalculados': self.recalculados,
+            'notificados': self.notificados,
+            'por_estado': self.por_estado,
+            'segundos': round(self.segundos, 3)
+        }
+
+# ============ NOTIFICADOR ============
+
+def notificador_polab(workspace: Optional[str] = None) -> Notificador:
+    """
+    Notificador que encola en el sistema de notificaciones de POLAB.
+
+    El módulo se carga por ruta porque vive fuera del paquete de la app.
+    """
+    spec = importlib.util.spec_from_file_location('polab_notificaciones', RUTA_NOTIFICACIONES)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    sistema = modulo.NotificationSystem(workspace) if workspace else modulo.notifications
+
+    def notificar(titulo, mensaje, tipo, prioridad):
+        return sistema.send(titulo, mensaje, type=tipo, priority=prioridad)
+    return notificar
+
+# ============ ESCANEO ============
+
+def _mensaje(filas) -> str:
+    """Una línea por plazo: vencimiento, título, caso y cliente"""
+    lineas = [
+        f"{fila.fecha_vencimiento.strftime('%d/%m/%Y')} · {fila.titulo} · "
+        f"{fila.materia} ({fila.cliente})"
+        for fila in filas[:MAX_LINEAS]
+    ]
+    if len(filas) > MAX_LINEAS:
+        lineas.append(f"... y {len(filas) - MAX_LINEAS} más")
+    return '\n'.join(lineas)
+
+def escanear_alertas(
+    hoy: Optional[date] = None,
+    notificar: Optional[Notificador] = None
+) -> ResultadoAlertas:
+    """
+    Precalcular el estado de los plazos y notificar los que entran en alerta.
+
+    1. Un UPDATE con CASE asigna vencido/hoy/critico/alerta/normal a los
+       plazos cuyo estado puede haber cambiado desde el último escaneo:
+       los sin estado vigente y los que vencen entre ese escaneo y el fin
+       de la ventana de alerta (rango sobre ix_plazo_vencimiento).
+    2. Los plazos no suspendidos en alerta, de casos no cerrados, cuyo
+       estado no es el ya notificado (nuevos en la ventana, o que
+       escalaron de alerta a critico, hoy o vencido) se encolan agrupados
+       por estado y se marcan en un solo UPDATE con `notificado_estado`.
+       Cambiar el vencimiento borra la marca. De los vencidos solo se
+       avisan los que vencieron desde el último escaneo (o desde ayer, en
+       el primero): los anteriores ya se avisaron o son históricos.
+
+    Las notificaciones se encolan antes del commit: si el envío falla no
+    se marca nada y el próximo escaneo las reintenta.
+
+    Args:
+        hoy: Fecha del escaneo (por defecto, hoy)
+        notificar: Destino de las notificaciones (None = solo precalcular)
+
+    Returns:
+        ResultadoAlertas con filas recalculadas y notificadas por estado
+    """
+    inicio_reloj = time.perf_counter()
+    hoy = hoy or date.today()
+    ventana = dias_alerta()
+    limite = hoy + timedelta(days=ventana)
+    resultado = ResultadoAlertas(fecha=hoy)
+
+    # Mismos rangos que Plazo.estado_plazo
+    estado = case(
+        *[(Plazo.fecha_vencimiento <= hoy + timedelta(days=maximo), nombre)
+          for nombre, maximo in rangos_estado(ventana)],
+        else_='normal'
+    )
+    pendientes = Plazo.alerta_calculada.is_(None)
+    ultimo = Configuracion.get(CLAVE_ULTIMO_ESCANEO)
+    if ultimo:
+        # Antes del último escaneo ya eran 'vencido'; después de `limite`, 'normal'
+        desde = min(date.fromisoformat(ultimo), hoy)
+        pendientes = or_(pendientes, Plazo.fecha_vencimiento.between(desde, limite))
+    else:
+        desde = hoy - timedelta(days=1)
+        pendientes = or_(pendientes, Plazo.alerta_calculada != hoy)
+
+    # El estado es derivado: no toca `actualizado` (lo usan los feeds y cachés)
+    resultado.recalculados = db.session.execute(
+        update(Plazo).where(pendientes).values(
+            estado_alerta=estado,
+            alerta_calculada=hoy,
+            actualizado=Plazo.actualizado
+        ),
+        execution_options={'synchronize_session': False, SIN_REGISTRO: False}
+    ).rowcount
+
+    por_notificar = (
+        Plazo.notificado_estado.is_distinct_from(Plazo.estado_alerta),
+        Plazo.suspendido.isnot(True),
+        Plazo.fecha_vencimiento <= limite,
+        Plazo.estado_alerta.in_(ESTADOS_NOTIFICABLES),
+        or_(Plazo.estado_alerta != 'vencido', Plazo.fecha_vencimiento >= desde),
+        # Subconsulta y no join: el mismo filtro sirve para el UPDATE
+        Plazo.caso_id.in_(select(Caso.id).where(Caso.estado.notin_(ESTADOS_CASO_CERRADOS)))
+    )
+    filas = db.session.execute(
+        select(
+            Plazo.id,
+            Plazo.titulo,
+            Plazo.fecha_vencimiento,
+            Plazo.estado_alerta,
+            Caso.materia,
+            Cliente.nombre.label('cliente')
+        ).join(Caso, Plazo.caso_id == Caso.id).join(Cliente, Caso.cliente_id == Cliente.id)
+        .where(*por_notificar)
+        .order_by(Plazo.fecha_vencimiento, Plazo.id)
+    ).all()
+
+    grupos: Dict[str, list] = {}
+    for fila in filas:
+        grupos.setdefault(fila.estado_alerta, []).append(fila)
+
+    try:
+        if notificar is not None:
+            for nombre in ESTADOS_NOTIFICABLES:
+                if nombre in grupos:
+                    notificar(
+                        f"{TITULOS[nombre]} ({len(grupos[nombre])})",
+                        _mensaje(grupos[nombre]),
+                        'plazo',
+                        PRIORIDADES[nombre]
+                    )
+        if filas:
+            db.session.execute(
+                # Mismo filtro que la lectura: la transacción ya tiene el lock de escritura
+                update(Plazo).where(*por_notificar).values(
+                    notificado=True,
+                    notificado_estado=Plazo.estado_alerta,
+                    actualizado=Plazo.actualizado
+                ),
+                execution_options={'synchronize_session': False, SIN_REGISTRO: False}
+            )
+    except Exception:
+        db.session.rollback()
+        raise
+
+    resultado.notificados = len(filas)
+    resultado.por_estado = {nombre: len(grupos[nombre]) for nombre in grupos}
+    # Configuracion.set hace commit junto con los UPDATE anteriores
+    Configuracion.set(CLAVE_ULTIMO_ESCANEO, hoy.isoformat(), 'Fecha del último escaneo de alertas')
+
+    resultado.segundos = time.perf_counter() - inicio_reloj
+    logger.info(
+        "Escaneo de alertas %s: %d recalculados, %d notificados en %.2fs",
+        hoy, resultado.recalculados, resultado.notificados, resultado.segundos
+    )
+    return resultado
+
+# ============ PROGRAMADOR ============
+
+def segundos_hasta(hora: hora_del_dia, ahora: Optional[datetime] = None) -> float:
+    """Segundos hasta la próxima ocurrencia de `hora`"""
+    ahora = ahora or datetime.now()
+    proxima = datetime.combine(ahora.date(), hora)
+    if proxima <= ahora:
+        proxima += timedelta(days=1)
+    return (proxima - ahora).total_seconds()
+
+class ProgramadorAlertas(threading.Thread):
+    """
+    Hilo que ejecuta `escanear_alertas` una vez al día, y de paso poda el
+    registro de cambios (`podar_cambios`).
+
+    Al arrancar escanea de inmediato si hoy todavía no se hizo. Con varios
+    procesos (gunicorn) conviene un solo programador: `run.py --programador`
+    o `run.py --alertas` desde cron.
+    """
+
+    def __init__(self, app, hora: hora_del_dia = HORA_ESCANEO, notificar: Optional[Notificador] = None):
+        super().__init__(name='programador-alertas', daemon=True)
+        self.app = app
+        self.hora = hora
+        self.notificar = notificar
+        self._detener = threading.Event()
+
+    def _escanear(self):
+        with self.app.app_context():
+            try:
+                escanear_alertas(notificar=self.notificar)
+            except Exception:
+                logger.exception("Falló el escaneo de alertas")
+            try:
+                podar_cambios()
+            except Exception:
+                logger.exception("Falló la poda del registro de cambios")
+
+    def run(self):
+        with self.app.app_context():
+            pendiente = Configuracion.get(CLAVE_ULTIMO_ESCANEO) != date.today().isoformat()
+        if pendiente:
+            self._escanear()
+        while not self._detener.wait(segundos_hasta(self.hora)):
+            self._escanear()
+
+    def detener(self):
+        self._detener.set()
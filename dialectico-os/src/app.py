@@ -1,14 +1,26 @@
 # Dialéctico OS - Aplicación Principal
 # =====================================
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, flash
+from werkzeug.http import is_resource_modified
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import joinedload, selectinload
 from datetime import date, datetime
 import os
 
 # Importar modelos y utilidades
-from models import db, Cliente, Caso, Tarea, Plazo, Feriado, Configuracion
-from deadlines import CalendarioChileno
+from .models import db, Cliente, Caso, Tarea, Plazo, Feriado, Suspension, Configuracion, dias_alerta, metricas_dashboard, plazos_criticos
+from .migraciones import migrar
+from .contador_sql import instalar_contador
+from .motor_db import opciones_motor, instalar_pragmas
+from .paginacion import paginar_request, url_siguiente, pide_jsonl, respuesta_jsonl
+from .feriados import ProveedorFeriados
+from .recalculo import recalcular_por_feriado, recalcular_por_suspension
+from .busqueda import buscar as buscar_texto, INDICES, LIMITE_RESULTADOS
+from .importacion import importar, leer_archivo, TIPOS_IMPORTACION
+from .calendario_ics import FeedCalendario
+from .cache_respuestas import cache, instalar_invalidacion
+from .cambios import instalar_registro, leer_cambios, ultimo_seq, CursorVencido, TABLAS, LIMITE_LECTURA
 
 # ============ CONFIGURACIÓN ============
 
@@ -19,39 +31,31 @@ app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dialectico-os-2026')
 DB_PATH = os.environ.get('DB_PATH', '/home/pi/.openclaw/workspace/dialectico-os/db/dialectico.db')
 app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{DB_PATH}'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = opciones_motor(app.config['SQLALCHEMY_DATABASE_URI'])
 
 # Inicializar
+instalar_pragmas()
 db.init_app(app)
+instalar_contador(app)
+instalar_invalidacion(db)
+instalar_registro()
 
-# Calendario chileno
-calendario = CalendarioChileno()
+# Calendario chileno (feriados legales + tabla Feriado)
+proveedor_feriados = ProveedorFeriados()
 
 # ============ RUTAS PRINCIPALES ============
 
 @app.route('/')
 def index():
     """Dashboard principal"""
-    # Métricas
-    total_clientes = Cliente.query.count()
-    casos_activos = Caso.query.filter(Caso.estado != 'archivado').count()
-    tareas_pendientes = Tarea.query.filter(Tarea.completado == False).count()
-    
-    # Plazos críticos (próximos 7 días)
-    hoy = date.today()
-    desde = hoy
-    hasta = hoy + __import__('datetime').timedelta(days=7)
-    plazos_criticos = Plazo.query.filter(
-        Plazo.fecha_vencimiento >= desde,
-        Plazo.fecha_vencimiento <= hasta,
-        Plazo.suspendido == False
-    ).order_by(Plazo.fecha_vencimiento).all()
+    # Métricas (una sola consulta)
+    metricas = metricas_dashboard()
     
+    # Primeros plazos críticos (próximos 7 días, usa ix_plazo_vigentes); el total viene en las métricas
     return render_template('dashboard.html',
-        total_clientes=total_clientes,
-        casos_activos=casos_activos,
-        tareas_pendientes=tareas_pendientes,
-        plazos_criticos=plazos_criticos,
-        hoy=hoy
+        plazos_criticos=plazos_criticos(),
+        hoy=date.today(),
+        **metricas
     )
 
 @app.route('/clientes')
@@ -61,8 +65,10 @@ def clientes():
     query = Cliente.query
     if estado:
         query = query.filter_by(estado=estado)
-    lista = query.order_by(Cliente.nombre).all()
-    return render_template('clientes.html', clientes=lista)
+    if pide_jsonl():
+        return respuesta_jsonl(query.order_by(Cliente.nombre, Cliente.id))
+    lista, siguiente = paginar_request(query, [Cliente.nombre, Cliente.id])
+    return render_template('clientes.html', clientes=lista, siguiente_url=url_siguiente(siguiente))
 
 @app.route('/cliente/nuevo', methods=['GET', 'POST'])
 def nuevo_cliente():
@@ -108,8 +114,12 @@ def casos():
         query = query.filter_by(estado=estado)
     if materia:
         query = query.filter_by(materia=materia)
-    lista = query.order_by(Caso.creado.desc()).all()
-    return render_template('casos.html', casos=lista)
+    if pide_jsonl():
+        return respuesta_jsonl(query.order_by(Caso.creado.desc(), Caso.id.desc()))
+    lista, siguiente = paginar_request(
+        query.options(joinedload(Caso.cliente)), [Caso.creado, Caso.id], descendente=True
+    )
+    return render_template('casos.html', casos=lista, siguiente_url=url_siguiente(siguiente))
 
 @app.route('/caso/nuevo', methods=['GET', 'POST'])
 def nuevo_caso():
@@ -133,8 +143,12 @@ def nuevo_caso():
 @app.route('/caso/<int:id>')
 def ver_caso(id):
     """Ver detalle de un caso"""
-    caso = Caso.query.get_or_404(id)
-    return render_template('caso_detail.html', caso=caso)
+    caso = db.get_or_404(Caso, id, options=[
+        joinedload(Caso.cliente),
+        selectinload(Caso.plazos),
+        selectinload(Caso.tareas)
+    ])
+    return render_template('caso_detail.html', caso=caso, ventana=dias_alerta())
 
 @app.route('/caso/<int:id>/plazo', methods=['POST'])
 def agregar_plazo(id):
@@ -145,7 +159,9 @@ def agregar_plazo(id):
     dias = int(request.form['dias'])
     tipo = request.form.get('tipo', 'habil')
     
-    vencimiento = calendario.calcular_vencimiento(fecha_inicio, dias, tipo)
+    vencimiento = proveedor_feriados.calendario().calcular_vencimiento(
+        fecha_inicio, dias, tipo, tribunal=caso.tribunal
+    )
     
     plazo = Plazo(
         caso_id=caso.id,
@@ -170,8 +186,16 @@ def tareas():
         query = query.filter(Tarea.completado == False)
     elif estado == 'completada':
         query = query.filter(Tarea.completado == True)
-    lista = query.order_by(Tarea.prioridad, Tarea.fecha_vencimiento).all()
-    return render_template('tareas.html', tareas=lista, estado=estado)
+    # Las tareas sin vencimiento van al final de cada prioridad
+    vencimiento = db.func.coalesce(Tarea.fecha_vencimiento, date.max)
+    if pide_jsonl():
+        return respuesta_jsonl(query.order_by(Tarea.prioridad, vencimiento, Tarea.id))
+    lista, siguiente = paginar_request(
+        query.options(joinedload(Tarea.caso).joinedload(Caso.cliente)),
+        [Tarea.prioridad, vencimiento, Tarea.id]
+    )
+    return render_template('tareas.html', tareas=lista, estado=estado,
+                           siguiente_url=url_siguiente(siguiente))
 
 @app.route('/tarea/<int:id>/completar', methods=['POST'])
 def completar_tarea(id):
@@ -182,25 +206,182 @@ def completar_tarea(id):
     db.session.commit()
     return redirect(url_for('tareas'))
 
+# ============ BÚSQUEDA ============
+
+def _resultados_busqueda():
+    """Resultados de ?q= (filtrados por ?tipo=) con la URL de cada uno"""
+    tipos = [tipo for tipo in request.args.getlist('tipo') if tipo] or None
+    limite = max(1, min(request.args.get('limite', LIMITE_RESULTADOS, type=int), 100))
+    resultados = buscar_texto(request.args.get('q', ''), tipos, limite)
+    for resultado in resultados:
+        if resultado['tipo'] == 'cliente':
+            resultado['url'] = url_for('editar_cliente', id=resultado['id'])
+        else:
+            resultado['url'] = url_for('ver_caso', id=resultado['caso_id'] or resultado['id'])
+    return resultados
+
+@app.route('/buscar')
+def buscar():
+    """Búsqueda en clientes, casos, tareas y plazos"""
+    return render_template(
+        'buscar.html',
+        q=request.args.get('q', ''),
+        resultados=_resultados_busqueda(),
+        tipos=INDICES
+    )
+
+@app.route('/api/buscar')
+@cache.respuesta(ttl=60, etiquetas=INDICES)
+def api_buscar():
+    """API: búsqueda con resultados ordenados y resaltados"""
+    return jsonify([
+        {**resultado, 'titulo': str(resultado['titulo']), 'fragmento': str(resultado['fragmento'])}
+        for resultado in _resultados_busqueda()
+    ])
+
 @app.route('/api/plazos')
+@cache.respuesta(ttl=30, etiquetas=['plazo'])
 def api_plazos():
     """API: plazos próximos"""
     hoy = date.today()
+    ventana = dias_alerta()
     semana = hoy + __import__('datetime').timedelta(days=7)
-    plazos = Plazo.query.filter(
+    query = Plazo.query.filter(
         Plazo.fecha_vencimiento <= semana,
         Plazo.fecha_vencimiento >= hoy
-    ).all()
-    return jsonify([p.to_dict() for p in plazos])
+    )
+    if pide_jsonl():
+        return respuesta_jsonl(
+            query.order_by(Plazo.fecha_vencimiento, Plazo.id),
+            lambda p: p.to_dict(hoy, ventana)
+        )
+    plazos, siguiente = paginar_request(query, [Plazo.fecha_vencimiento, Plazo.id])
+    response = jsonify([p.to_dict(hoy, ventana) for p in plazos])
+    if siguiente:
+        response.headers['X-Siguiente-Cursor'] = siguiente
+    return response
 
-@app.route('/api/calendario/feriados')
+@app.route('/api/calendario/feriados', methods=['GET', 'POST'])
+@cache.respuesta(ttl=3600, etiquetas=['feriado'])
 def api_feriados():
-    """API: feriados del año"""
-    año = request.args.get('año', date.today().year)
-    return jsonify(calendario.listar_feriados(int(año)))
+    """API: feriados del año, o agregar uno"""
+    if request.method == 'GET':
+        año = request.args.get('año', date.today().year)
+        return jsonify(proveedor_feriados.snapshot().listar(int(año)))
+    
+    datos = request.get_json(silent=True) or {}
+    try:
+        fecha = date.fromisoformat(datos['fecha'])
+        nombre = datos['nombre']
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Se requieren fecha (AAAA-MM-DD) y nombre'}), 400
+    
+    feriado = Feriado(fecha=fecha, nombre=nombre, tipo=datos.get('tipo') or 'nacional')
+    db.session.add(feriado)
+    db.session.commit()
+    # Solo los plazos hábiles que corren durante ese día
+    resultado = recalcular_por_feriado(proveedor_feriados.calendario(), fecha)
+    return jsonify({'feriado': feriado.to_dict(), 'recalculo': resultado.to_dict()}), 201
+
+@app.route('/api/calendario/feriados/<int:feriado_id>', methods=['DELETE'])
+def api_feriado_eliminar(feriado_id):
+    """API: desactivar un feriado y recalcular los plazos afectados"""
+    feriado = db.get_or_404(Feriado, feriado_id)
+    feriado.activo = False
+    db.session.commit()
+    resultado = recalcular_por_feriado(proveedor_feriados.calendario(), feriado.fecha)
+    return jsonify({'feriado': feriado.to_dict(), 'recalculo': resultado.to_dict()})
+
+@app.route('/api/calendario.ics')
+def api_calendario_ics():
+    """Feed iCalendar de plazos: todos, ?caso=<id> o ?cliente=<id>"""
+    try:
+        feed = FeedCalendario(
+            caso_id=request.args.get('caso', type=int),
+            cliente_id=request.args.get('cliente', type=int)
+        )
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    etag, modificado = feed.version()
+    # Los calendarios consultan cada pocos minutos: sin cambios, 304 sin generar el feed
+    if is_resource_modified(request.environ, etag=etag, last_modified=modificado):
+        respuesta = Response(feed.generar(etag), mimetype='text/calendar')
+        respuesta.headers['Content-Disposition'] = 'inline; filename="plazos.ics"'
+    else:
+        respuesta = Response(status=304)
+    respuesta.set_etag(etag)
+    respuesta.last_modified = modificado
+    respuesta.cache_control.no_cache = True
+    return respuesta
+
+@app.route('/api/suspensiones', methods=['GET', 'POST'])
+@cache.respuesta(ttl=300, etiquetas=['suspension'])
+def api_suspensiones():
+    """API: períodos de suspensión de plazos"""
+    if request.method == 'GET':
+        suspensiones = Suspension.query.filter_by(activo=True).order_by(Suspension.fecha_inicio).all()
+        return jsonify([s.to_dict() for s in suspensiones])
+    
+    datos = request.get_json(silent=True) or {}
+    try:
+        inicio = date.fromisoformat(datos['inicio'])
+        fin = date.fromisoformat(datos['fin'])
+        motivo = datos['motivo']
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Se requieren inicio, fin (AAAA-MM-DD) y motivo'}), 400
+    if fin < inicio:
+        return jsonify({'error': 'El fin es anterior al inicio'}), 400
+    
+    suspension = Suspension(tribunal=datos.get('tribunal') or None, fecha_inicio=inicio, fecha_fin=fin, motivo=motivo)
+    db.session.add(suspension)
+    db.session.commit()
+    # Solo los plazos que corren durante la suspensión (y del tribunal, si aplica)
+    resultado = recalcular_por_suspension(proveedor_feriados.calendario(), inicio, fin, suspension.tribunal)
+    return jsonify({'suspension': suspension.to_dict(), 'recalculo': resultado.to_dict()}), 201
+
+@app.route('/api/importar/<tipo>', methods=['POST'])
+def api_importar(tipo):
+    """API: importación masiva de clientes, casos o plazos desde CSV/XLSX"""
+    if tipo not in TIPOS_IMPORTACION:
+        return jsonify({'error': f"Tipo desconocido (usar {', '.join(TIPOS_IMPORTACION)})"}), 404
+    archivo = request.files.get('archivo')
+    if archivo is None or not archivo.filename:
+        return jsonify({'error': 'Se requiere el archivo en el campo "archivo"'}), 400
+    try:
+        filas = leer_archivo(archivo.stream, archivo.filename)
+        resultado = importar(tipo, filas, proveedor_feriados.calendario())
+    except (ValueError, RuntimeError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(resultado.to_dict()), 201 if resultado.insertadas else 200
+
+@app.route('/api/cambios')
+def api_cambios():
+    """API: cambios posteriores a ?since=<seq> (opcional ?tabla=plazo&tabla=caso)"""
+    desde = request.args.get('since', 0, type=int)
+    limite = max(1, min(request.args.get('limite', LIMITE_LECTURA, type=int), LIMITE_LECTURA))
+    tablas = [t for t in request.args.getlist('tabla') if t]
+    desconocidas = set(tablas) - set(TABLAS)
+    if desconocidas:
+        return jsonify({'error': f"Tablas desconocidas: {', '.join(sorted(desconocidas))}"}), 400
+    try:
+        cambios, cursor = leer_cambios(desde, tablas, limite)
+    except CursorVencido as e:
+        # El lector debe resincronizar desde las tablas y seguir desde `ultimo`
+        return jsonify({'error': str(e), 'podado_hasta': e.podado_hasta, 'ultimo': ultimo_seq()}), 410
+    return jsonify({'cambios': cambios, 'cursor': cursor, 'completo': len(cambios) < limite})
+
+@app.route('/api/cache')
+def api_cache():
+    """API: métricas de la caché de respuestas de este proceso"""
+    return jsonify(cache.metricas())
 
 # ============ UTILIDADES ============
 
+@app.context_processor
+def contexto_fechas():
+    """Fecha actual disponible en todos los templates"""
+    return {'hoy': date.today(), 'date': date}
+
 @app.template_filter('fecha')
 def formato_fecha(fecha):
     """Formatear fecha para display"""
@@ -231,6 +412,7 @@ def init_db():
     """Inicializar base de datos"""
     with app.app_context():
         db.create_all()
+        migrar()
         
         # Crear configuración inicial
         Configuracion.set('app_name', 'Dialéctico OS', 'Nombre de la aplicación')
@@ -246,6 +428,7 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Dialéctico OS')
     parser.add_argument('--init', action='store_true', help='Inicializar base de datos')
     parser.add_argument('--port', type=int, default=8080, help='Puerto')
+    parser.add_argument('--debug', action='store_true', help='Modo debug')
     
     args = parser.parse_args()
     
@@ -254,4 +437,4 @@ if __name__ == '__main__':
     else:
         # Asegurar que existe el directorio de la BD
         os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-        app.run(host='0.0.0.0', port=args.port, debug=True)
+        app.run(host='0.0.0.0', port=args.port, debug=args.debug)
@@ -0,0 +1,152 @@
+# Dialéctico OS - Búsqueda de Texto Completo
+# ==========================================
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import re
+
+from markupsafe import Markup, escape
+from sqlalchemy import text
+
+from .models import db
+
+# Tablas indexadas: tabla -> [(columna, peso en el ranking)]. La primera
+# columna es el título del resultado.
+INDICES: Dict[str, List[Tuple[str, float]]] = {
+    'cliente': [('nombre', 10.0), ('rut', 8.0), ('email', 4.0), ('notas', 1.0)],
+    'caso': [
+        ('materia', 6.0), ('numero_expediente', 10.0), ('tribunal', 4.0),
+        ('tipo_proceso', 3.0), ('observaciones', 1.0)
+    ],
+    'tarea': [('titulo', 8.0), ('descripcion', 1.0)],
+    'plazo': [('titulo', 8.0), ('descripcion', 1.0), ('observaciones', 1.0)],
+}
+
+# Tablas cuyos resultados enlazan al caso al que pertenecen
+CON_CASO = ('tarea', 'plazo')
+
+# Sin acentos ni mayúsculas ("perez" encuentra "Pérez"); prefijos de 2-4
+# letras indexados para que "ped*" no recorra todo el vocabulario
+TOKENIZADOR = "unicode61 remove_diacritics 2"
+PREFIJOS = '2 3 4'
+
+LIMITE_RESULTADOS = 20
+
+# Marcas internas de highlight()/snippet(): no aparecen en texto de usuario
+_INICIO_MARCA = '\x02'
+_FIN_MARCA = '\x03'
+
+# ============ ESQUEMA ============
+
+def _tabla_fts(tabla: str) -> str:
+    return f'{tabla}_fts'
+
+def instalar_busqueda(conexion):
+    """
+    Crear las tablas FTS5 y los triggers que las mantienen sincronizadas
+    (idempotente), y reconstruir su contenido desde las tablas base.
+
+    Son tablas de contenido externo: guardan solo el índice invertido y
+    leen el texto de la tabla original. Los triggers de UPDATE se limitan
+    a las columnas indexadas, así los UPDATE masivos de otras columnas
+    (recálculos, alertas) no reindexan nada.
+    """
+    for tabla, columnas in INDICES.items():
+        fts = _tabla_fts(tabla)
+        nombres = [columna for columna, _ in columnas]
+        lista = ', '.join(nombres)
+        nuevos = ', '.join(f'new.{c}' for c in nombres)
+        viejos = ', '.join(f'old.{c}' for c in nombres)
+        sentencias = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{lista}, content='{tabla}', content_rowid='id', "
+            f"tokenize='{TOKENIZADOR}', prefix='{PREFIJOS}')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabla} BEGIN "
+            f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {nuevos}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabla} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {lista} ON {tabla} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {lista}) VALUES ('delete', old.id, {viejos}); "
+            f"INSERT INTO {fts}(rowid, {lista}) VALUES (new.id, {nuevos}); END",
+            f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+            # Ranking por defecto con los pesos de cada columna
+            f"INSERT INTO {fts}({fts}, rank) VALUES "
+            f"('rank', 'bm25({', '.join(str(peso) for _, peso in columnas)})')",
+        ]
+        for sentencia in sentencias:
+            conexion.execute(text(sentencia))
+
+# ============ CONSULTAS ============
+
+def consulta_fts(texto: str) -> Optional[str]:
+    """
+    Traducir lo que escribe el usuario a una consulta FTS5: cada palabra
+    entre comillas (sin operadores ni sintaxis inválida) y como prefijo,
+    todas requeridas.
+
+    "juan pér" -> '"juan"* "pér"*'
+    """
+    palabras = re.findall(r'\w+', texto or '')
+    if not palabras:
+        return None
+    return ' '.join(f'"{palabra}"*' for palabra in palabras)
+
+def resaltar(fragmento: Optional[str]) -> Markup:
+    """Escapar el texto y convertir las marcas de coincidencia en <mark>"""
+    if not fragmento:
+        return Markup('')
+    return Markup(
+        str(escape(fragmento))
+        .replace(_INICIO_MARCA, '<mark>')
+        .replace(_FIN_MARCA, '</mark>')
+    )
+
+def _buscar_en(tabla: str, consulta: str, limite: int) -> List[dict]:
+    """Mejores `limite` coincidencias de una tabla"""
+    fts = _tabla_fts(tabla)
+    caso = 't.caso_id' if tabla in CON_CASO else 'NULL'
+    filas = db.session.execute(text(
+        f"SELECT r.id, r.titulo, r.fragmento, r.rango, {caso} AS caso_id FROM ("
+        f"  SELECT rowid AS id,"
+        f"    highlight({fts}, 0, :inicio, :fin) AS titulo,"
+        f"    snippet({fts}, -1, :inicio, :fin, '…', 16) AS fragmento,"
+        f"    rank AS rango"
+        f"  FROM {fts} WHERE {fts} MATCH :consulta ORDER BY rank LIMIT :limite"
+        f") r JOIN {tabla} t ON t.id = r.id"
+    ), {'consulta': consulta, 'limite': limite, 'inicio': _INICIO_MARCA, 'fin': _FIN_MARCA}).all()
+    return [
+        {
+            'tipo': tabla,
+            'id': fila.id,
+            'caso_id': fila.caso_id,
+            'titulo': resaltar(fila.titulo),
+            'fragmento': resaltar(fila.fragmento),
+            'rango': fila.rango,
+        }
+        for fila in filas
+    ]
+
+def buscar(texto: str, tipos: Iterable[str] = None, limite: int = LIMITE_RESULTADOS) -> List[dict]:
+    """
+    Buscar en clientes, casos, tareas y plazos.
+
+    Cada tabla aporta sus `limite` mejores resultados por BM25 y se mezclan
+    por puntaje (menor = más relevante).
+
+    Args:
+        texto: Texto ingresado por el usuario (las palabras se buscan como prefijo)
+        tipos: Tablas donde buscar (por defecto, todas)
+        limite: Máximo de resultados
+
+    Returns:
+        Lista de dicts con tipo, id, caso_id, titulo y fragmento resaltados
+        (HTML seguro) y rango
+    """
+    consulta = consulta_fts(texto)
+    if consulta is None:
+        return []
+    resultados = []
+    for tabla in tipos or INDICES:
+        if tabla in INDICES:
+            resultados.extend(_buscar_en(tabla, consulta, limite))
+    resultados.sort(key=lambda resultado: resultado['rango'])
+    return resultados[:limite]
@@ -0,0 +1,404 @@
+# Dialéctico OS - Caché de Respuestas de la API
+# =============================================
+
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from datetime import date
+from functools import wraps
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from flask import Response, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Entradas del almacén en memoria (por proceso)
+TAMAÑO_CACHE = 1024
+
+# Clave de session.info con las tablas escritas en la transacción
+_CLAVE_SESION = 'etiquetas_cache'
+
+# Cabeceras que no se guardan con la respuesta
+_CABECERAS_OMITIDAS = {'content-length', 'set-cookie', 'x-cache'}
+
+# (estado, tipo, cabeceras, cuerpo)
+Entrada = Tuple[int, str, Dict[str, str], bytes]
+
+# ============ MÉTRICAS ============
+
+@dataclass
+class MetricasCache:
+    """Contadores de la caché en este proceso"""
+    aciertos: int = 0
+    fallos: int = 0
+    expirados: int = 0
+    guardados: int = 0
+    invalidados: int = 0
+    desalojados: int = 0
+
+    def to_dict(self):
+        consultas = self.aciertos + self.fallos
+        return {**asdict(self), 'tasa_aciertos': round(self.aciertos / consultas, 3) if consultas else None}
+
+# ============ ALMACENES ============
+
+class AlmacenMemoria:
+    """
+    TTL + LRU en memoria, con índice de claves por etiqueta.
+
+    Es por proceso: con varios workers, las invalidaciones de uno no llegan
+    a los otros (quedan acotadas por el TTL). Para eso está AlmacenSQLite.
+    """
+
+    nombre = 'memoria'
+
+    def __init__(self, tamaño: int = TAMAÑO_CACHE):
+        self.tamaño = tamaño
+        self._datos: 'OrderedDict[str, Tuple[float, Entrada, Tuple[str, ...]]]' = OrderedDict()
+        self._por_etiqueta: Dict[str, Set[str]] = {}
+        self._epoca = 0
+        self._lock = threading.Lock()
+        self.metricas = MetricasCache()
+
+    def __len__(self):
+        return len(self._datos)
+
+    def epoca(self) -> int:
+        return self._epoca
+
+    def obtener(self, clave: str) -> Optional[Entrada]:
+        with self._lock:
+            guardado = self._datos.get(clave)
+            if guardado is None:
+                self.metricas.fallos += 1
+                return None
+            expira, entrada, _ = guardado
+            if expira <= time.monotonic():
+                self._quitar(clave)
+                self.metricas.expirados += 1
+                self.metricas.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.metricas.aciertos += 1
+            return entrada
+
+    def guardar(self, clave: str, entrada: Entrada, ttl: float, etiquetas: Tuple[str, ...], epoca: int):
+        with self._lock:
+            if epoca != self._epoca:
+                return  # Hubo una invalidación mientras se generaba
+            self._quitar(clave)
+            self._datos[clave] = (time.monotonic() + ttl, entrada, etiquetas)
+            for etiqueta in etiquetas:
+                self._por_etiqueta.setdefault(etiqueta, set()).add(clave)
+            self.metricas.guardados += 1
+            while len(self._datos) > self.tamaño:
+                self._quitar(next(iter(self._datos)))
+                self.metricas.desalojados += 1
+
+    def invalidar(self, etiquetas: Iterable[str]) -> int:
+        with self._lock:
+            self._epoca += 1
+            claves = set()
+            for etiqueta in etiquetas:
+                claves |= self._por_etiqueta.pop(etiqueta, set())
+            for clave in claves:
+                self._quitar(clave)
+            self.metricas.invalidados += len(claves)
+            return len(claves)
+
+    def limpiar(self):
+        with self._lock:
+            self._epoca += 1
+            self._datos.clear()
+            self._por_etiqueta.clear()
+
+    def _quitar(self, clave: str):
+        guardado = self._datos.pop(clave, None)
+        if guardado is not None:
+            for etiqueta in guardado[2]:
+                claves = self._por_etiqueta.get(etiqueta)
+                if claves is not None:
+                    claves.discard(clave)
+                    if not claves:
+                        del self._por_etiqueta[etiqueta]
+
+class AlmacenSQLite:
+    """
+    Almacén compartido en un archivo SQLite, para varios workers.
+
+    Las invalidaciones de un proceso borran las filas que leen todos. Una
+    conexión por hilo, en modo WAL; el LRU usa la hora del último acceso.
+    """
+
+    nombre = 'sqlite'
+
+    ESQUEMA = (
+        "CREATE TABLE IF NOT EXISTS respuesta ("
+        " clave TEXT PRIMARY KEY, expira REAL, usado REAL,"
+        " estado INTEGER, tipo TEXT, cabeceras TEXT, cuerpo BLOB)",
+        "CREATE TABLE IF NOT EXISTS respuesta_etiqueta ("
+        " etiqueta TEXT, clave TEXT, PRIMARY KEY (etiqueta, clave)) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS ix_respuesta_usado ON respuesta (usado)",
+        "CREATE TABLE IF NOT EXISTS respuesta_epoca (id INTEGER PRIMARY KEY CHECK (id = 1), valor INTEGER)",
+        "INSERT OR IGNORE INTO respuesta_epoca VALUES (1, 0)",
+    )
+
+    def __init__(self, ruta: str, tamaño: int = TAMAÑO_CACHE * 10):
+        self.ruta = str(Path(ruta).expanduser())
+        self.tamaño = tamaño
+        self._local = threading.local()
+        self._escrituras = 0
+        self.metricas = MetricasCache()
+        with self._conexion() as conexion:
+            for sentencia in self.ESQUEMA:
+                conexion.execute(sentencia)
+
+    def _conexion(self) -> sqlite3.Connection:
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=5, isolation_level=None)
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.execute('PRAGMA synchronous=NORMAL')
+            self._local.conexion = conexion
+        return conexion
+
+    def __len__(self):
+        return self._conexion().execute('SELECT count(*) FROM respuesta').fetchone()[0]
+
+    def epoca(self) -> int:
+        return self._conexion().execute('SELECT valor FROM respuesta_epoca').fetchone()[0]
+
+    def _avanzar_epoca(self, conexion):
+        conexion.execute('UPDATE respuesta_epoca SET valor = valor + 1')
+
+    def obtener(self, clave: str) -> Optional[Entrada]:
+        conexion = self._conexion()
+        fila = conexion.execute(
+            'SELECT expira, estado, tipo, cabeceras, cuerpo FROM respuesta WHERE clave = ?', (clave,)
+        ).fetchone()
+        ahora = time.time()
+        if fila is None or fila[0] <= ahora:
+            if fila is not None:
+                self.metricas.expirados += 1
+            self.metricas.fallos += 1
+            return None
+        conexion.execute('UPDATE respuesta SET usado = ? WHERE clave = ?', (ahora, clave))
+        self.metricas.aciertos += 1
+        return fila[1], fila[2], json.loads(fila[3]), fila[4]
+
+    def guardar(self, clave: str, entrada: Entrada, ttl: float, etiquetas: Tuple[str, ...], epoca: int):
+        estado, tipo, cabeceras, cuerpo = entrada
+        ahora = time.time()
+        conexion = self._conexion()
+        with conexion:
+            conexion.execute('BEGIN IMMEDIATE')
+            if conexion.execute('SELECT valor FROM respuesta_epoca').fetchone()[0] != epoca:
+                return  # Otro proceso invalidó mientras se generaba
+            conexion.execute(
+                'INSERT OR REPLACE INTO respuesta VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (clave, ahora + ttl, ahora, estado, tipo, json.dumps(cabeceras), cuerpo)
+            )
+            conexion.executemany(
+                'INSERT OR IGNORE INTO respuesta_etiqueta VALUES (?, ?)',
+                [(etiqueta, clave) for etiqueta in etiquetas]
+            )
+        self.metricas.guardados += 1
+        self._escrituras += 1
+        if self._escrituras % 100 == 0:
+            self._desalojar()
+
+    def _desalojar(self):
+        """Borrar expiradas y, si sobra, las menos usadas"""
+        conexion = self._conexion()
+        with conexion:
+            conexion.execute('BEGIN IMMEDIATE')
+            borradas = conexion.execute('DELETE FROM respuesta WHERE expira <= ?', (time.time(),)).rowcount
+            borradas += conexion.execute(
+                'DELETE FROM respuesta WHERE clave IN ('
+                ' SELECT clave FROM respuesta ORDER BY usado DESC LIMIT -1 OFFSET ?)',
+                (self.tamaño,)
+            ).rowcount
+            conexion.execute('DELETE FROM respuesta_etiqueta WHERE clave NOT IN (SELECT clave FROM respuesta)')
+        self.metricas.desalojados += borradas
+
+    def invalidar(self, etiquetas: Iterable[str]) -> int:
+        etiquetas = list(etiquetas)
+        marcas = ', '.join('?' * len(etiquetas))
+        conexion = self._conexion()
+        with conexion:
+            conexion.execute('BEGIN IMMEDIATE')
+            self._avanzar_epoca(conexion)
+            borradas = conexion.execute(
+                f'DELETE FROM respuesta WHERE clave IN ('
+                f' SELECT clave FROM respuesta_etiqueta WHERE etiqueta IN ({marcas}))',
+                etiquetas
+            ).rowcount
+            conexion.execute(f'DELETE FROM respuesta_etiqueta WHERE etiqueta IN ({marcas})', etiquetas)
+        self.metricas.invalidados += borradas
+        return borradas
+
+    def limpiar(self):
+        conexion = self._conexion()
+        with conexion:
+            conexion.execute('BEGIN IMMEDIATE')
+            self._avanzar_epoca(conexion)
+            conexion.execute('DELETE FROM respuesta')
+            conexion.execute('DELETE FROM respuesta_etiqueta')
+
+def crear_almacen(configuracion: str):
+    """
+    Almacén según CACHE_RESPUESTAS: 'memoria' (por defecto), 'sqlite' (archivo
+    junto a la base) o 'sqlite:/ruta/cache.db'. 'no' desactiva la caché.
+    """
+    if configuracion in ('', 'no', 'off'):
+        return None
+    if configuracion == 'memoria':
+        return AlmacenMemoria()
+    if configuracion.startswith('sqlite'):
+        ruta = configuracion.partition(':')[2] or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), '..', 'db', 'cache_respuestas.db'
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        return AlmacenSQLite(ruta)
+    raise ValueError(f"CACHE_RESPUESTAS inválido: {configuracion}")
+
+# ============ CACHÉ ============
+
+class CacheRespuestas:
+    """
+    Caché de respuestas GET de la API, con invalidación por etiquetas.
+
+    Las etiquetas son nombres de tabla: `instalar_invalidacion` registra
+    eventos de sesión que, al hacer commit, invalidan las respuestas
+    etiquetadas con las tablas escritas en la transacción.
+    """
+
+    def __init__(self, almacen=None):
+        self.almacen = almacen
+
+    def respuesta(self, ttl: float, etiquetas: Iterable[str]):
+        """
+        Decorador para rutas GET de solo lectura.
+
+        La clave es la ruta con los parámetros ordenados y la fecha del día
+        (varias rutas dependen de hoy). Solo se guardan respuestas 200 no
+        streaming; las demás pasan sin tocar la caché.
+        """
+        etiquetas = tuple(etiquetas)
+
+        def decorar(vista):
+            @wraps(vista)
+            def envoltura(*args, **kwargs):
+                almacen = self.almacen
+                if almacen is None or request.method != 'GET':
+                    return vista(*args, **kwargs)
+
+                parametros = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+                clave = f'{request.path}?{parametros}|{date.today().isoformat()}'
+                entrada = almacen.obtener(clave)
+                if entrada is not None:
+                    estado, tipo, cabeceras, cuerpo = entrada
+                    respuesta = Response(cuerpo, status=estado, content_type=tipo, headers=cabeceras)
+                    respuesta.headers['X-Cache'] = 'HIT'
+                    return respuesta
+
+                epoca = almacen.epoca()
+                respuesta = make_response(vista(*args, **kwargs))
+                if respuesta.status_code == 200 and not respuesta.is_streamed:
+                    cabeceras = {
+                        nombre: valor for nombre, valor in respuesta.headers.items()
+                        if nombre.lower() not in _CABECERAS_OMITIDAS and nombre.lower() != 'content-type'
+                    }
+                    almacen.guardar(
+                        clave, (200, respuesta.content_type, cabeceras, respuesta.get_data()), ttl, etiquetas, epoca
+                    )
+                respuesta.headers['X-Cache'] = 'MISS'
+                return respuesta
+            return envoltura
+        return decorar
+
+    def invalidar(self, etiquetas: Iterable[str]) -> int:
+        if self.almacen is None:
+            return 0
+        etiquetas = list(etiquetas)
+        if not etiquetas:
+            return 0
+        return self.almacen.invalidar(etiquetas)
+
+    def limpiar(self):
+        if self.almacen is not None:
+            self.almacen.limpiar()
+
+    def metricas(self) -> dict:
+        if self.almacen is None:
+            return {'almacen': None}
+        return {
+            'almacen': self.almacen.nombre,
+            'entradas': len(self.almacen),
+            **self.almacen.metricas.to_dict()
+        }
+
+cache = CacheRespuestas(crear_almacen(os.environ.get('CACHE_RESPUESTAS', 'memoria')))
+
+# ============ INVALIDACIÓN ============
+
+def _tabla_de(objeto) -> Optional[str]:
+    tabla = getattr(objeto, '__table__', None)
+    return tabla.name if tabla is not None else None
+
+def instalar_invalidacion(db, cache: CacheRespuestas = cache):
+    """
+    Invalidar la caché con cada escritura confirmada.
+
+    - after_flush: tablas de los objetos nuevos, modificados y borrados.
+    - do_orm_execute: INSERT/UPDATE/DELETE masivos (recálculo, alertas,
+      importación) hechos con session.execute.
+    - after_commit: invalida las etiquetas juntadas; after_rollback las
+      descarta.
+    - create_all/drop_all: vacía la caché (la base es otra).
+
+    Las sentencias Core ejecutadas fuera de la sesión deben llamar a
+    `cache.invalidar` por su cuenta.
+    """
+    def pendientes(sesion) -> Set[str]:
+        return sesion.info.setdefault(_CLAVE_SESION, set())
+
+    @event.listens_for(Session, 'after_flush')
+    def _flush(sesion, contexto):
+        tablas = pendientes(sesion)
+        for objeto in (*sesion.new, *sesion.dirty, *sesion.deleted):
+            tabla = _tabla_de(objeto)
+            if tabla:
+                tablas.add(tabla)
+
+    @event.listens_for(Session, 'do_orm_execute')
+    def _masivo(estado):
+        if not (estado.is_insert or estado.is_update or estado.is_delete):
+            return
+        if estado.bind_mapper is not None:
+            pendientes(estado.session).add(estado.bind_mapper.local_table.name)
+        else:
+            tabla = getattr(estado.statement, 'table', None)
+            if tabla is not None and hasattr(tabla, 'name'):
+                pendientes(estado.session).add(tabla.name)
+
+    @event.listens_for(Session, 'after_commit')
+    def _commit(sesion):
+        tablas = sesion.info.pop(_CLAVE_SESION, None)
+        if tablas:
+            cache.invalidar(tablas)
+
+    @event.listens_for(Session, 'after_rollback')
+    def _rollback(sesion):
+        sesion.info.pop(_CLAVE_SESION, None)
+
+    for evento in ('after_create', 'after_drop'):
+        event.listen(db.metadata, evento, lambda *args, **kwargs: cache.limpiar())
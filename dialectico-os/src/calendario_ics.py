@@ -0,0 +1,300 @@
+# Dialéctico OS - Feeds de Calendario (iCalendar)
+# ===============================================
+
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import os
+import threading
+
+from sqlalchemy import func, select
+
+from .models import db, Cliente, Caso, Plazo
+
+PRODID = '-//Dialectico OS//Plazos//ES'
+DOMINIO_UID = os.environ.get('DOMINIO_CALENDARIO', 'dialectico-os')
+
+# Plazos ya vencidos que siguen en el feed
+DIAS_HISTORIA = 90
+
+# Intervalo de actualización sugerido a los clientes de calendario
+INTERVALO_REFRESCO = 'PT15M'
+
+# Eventos renderizados en memoria (uno por plazo) y feeds completos
+TAMAÑO_CACHE_EVENTOS = int(os.environ.get('CACHE_EVENTOS_ICS', 100000))
+TAMAÑO_CACHE_FEEDS = 64
+
+# Plazos cargados por consulta al renderizar eventos nuevos
+LOTE_CARGA = 5000
+
+# ============ FORMATO ============
+
+def escapar(texto: Optional[str]) -> str:
+    """Escapar un valor TEXT según RFC 5545"""
+    return (
+        (texto or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+def plegar(linea: str) -> str:
+    """Partir una línea en tramos de 75 octetos (RFC 5545, 3.1)"""
+    datos = linea.encode('utf-8')
+    if len(datos) <= 75:
+        return linea + '\r\n'
+    partes, inicio, limite = [], 0, 75
+    while inicio < len(datos):
+        fin = min(inicio + limite, len(datos))
+        # No cortar un carácter UTF-8 a la mitad
+        while fin < len(datos) and (datos[fin] & 0xC0) == 0x80:
+            fin -= 1
+        partes.append(datos[inicio:fin].decode('utf-8'))
+        inicio, limite = fin, 74  # las continuaciones empiezan con un espacio
+    return '\r\n '.join(partes) + '\r\n'
+
+def _fecha_ics(fecha: date) -> str:
+    return fecha.strftime('%Y%m%d')
+
+def _instante_ics(momento: datetime) -> str:
+    """Hora local guardada en la base -> UTC"""
+    return momento.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+def renderizar_evento(fila) -> str:
+    """
+    VEVENT de día completo para un plazo.
+
+    `fila` trae las columnas de `_columnas_evento`. Solo depende de esos
+    datos, así que el texto se puede guardar mientras no cambien.
+    """
+    titulo = f"{fila.titulo} · {fila.materia}"
+    if fila.suspendido:
+        titulo = f"[Suspendido] {titulo}"
+    detalle = [f"Cliente: {fila.cliente}"]
+    if fila.numero_expediente:
+        detalle.append(f"Expediente: {fila.numero_expediente}")
+    if fila.tribunal:
+        detalle.append(f"Tribunal: {fila.tribunal}")
+    detalle.append(
+        f"Plazo de {fila.dias} días {fila.tipo.value} desde el {fila.fecha_inicio.strftime('%d/%m/%Y')}"
+    )
+    if fila.descripcion:
+        detalle.append(fila.descripcion)
+
+    lineas = [
+        'BEGIN:VEVENT',
+        f'UID:plazo-{fila.id}@{DOMINIO_UID}',
+        f'DTSTAMP:{_instante_ics(fila.actualizado)}',
+        f'LAST-MODIFIED:{_instante_ics(fila.actualizado)}',
+        f'DTSTART;VALUE=DATE:{_fecha_ics(fila.fecha_vencimiento)}',
+        f'DTEND;VALUE=DATE:{_fecha_ics(fila.fecha_vencimiento + timedelta(days=1))}',
+        f'SUMMARY:{escapar(titulo)}',
+        f'DESCRIPTION:{escapar(chr(10).join(detalle))}',
+        f'CATEGORIES:Plazo,{escapar(fila.materia)}',
+        f"STATUS:{'TENTATIVE' if fila.suspendido else 'CONFIRMED'}",
+        'TRANSP:TRANSPARENT',
+        'BEGIN:VALARM',
+        'ACTION:DISPLAY',
+        f'DESCRIPTION:{escapar(titulo)}',
+        # 09:00 del día anterior (el evento empieza a medianoche)
+        'TRIGGER:-PT15H',
+        'END:VALARM',
+        'END:VEVENT',
+    ]
+    return ''.join(plegar(linea) for linea in lineas)
+
+# ============ CACHÉ ============
+
+class CacheLRU:
+    """
+    Diccionario LRU con versión por entrada, seguro entre hilos.
+
+    Una entrada solo se entrega si su versión coincide con la pedida: el
+    llamador no necesita invalidar, basta con que la versión cambie.
+    """
+
+    def __init__(self, tamaño: int):
+        self.tamaño = tamaño
+        self._datos: 'OrderedDict[object, Tuple[object, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def __len__(self):
+        return len(self._datos)
+
+    def obtener(self, clave, version) -> Optional[str]:
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None or entrada[0] != version:
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return entrada[1]
+
+    def guardar(self, clave, version, valor: str):
+        with self._lock:
+            self._datos[clave] = (version, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.tamaño:
+                self._datos.popitem(last=False)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self.aciertos = self.fallos = 0
+
+    def estadisticas(self) -> Dict[str, int]:
+        return {'entradas': len(self._datos), 'aciertos': self.aciertos, 'fallos': self.fallos}
+
+eventos = CacheLRU(TAMAÑO_CACHE_EVENTOS)
+feeds = CacheLRU(TAMAÑO_CACHE_FEEDS)
+
+# ============ FEEDS ============
+
+def _columnas_evento():
+    return (
+        Plazo.id, Plazo.titulo, Plazo.descripcion, Plazo.tipo, Plazo.dias,
+        Plazo.fecha_inicio, Plazo.fecha_vencimiento, Plazo.suspendido, Plazo.actualizado,
+        Caso.materia, Caso.numero_expediente, Caso.tribunal,
+        Cliente.nombre.label('cliente')
+    )
+
+class FeedCalendario:
+    """
+    Feed iCalendar de plazos: todos, los de un caso o los de un cliente.
+
+    `version()` resume el feed con una sola consulta de agregados (máximo
+    `actualizado` de plazos, casos y clientes, y cantidad de plazos); sirve
+    de ETag y Last-Modified para responder 304 sin generar nada.
+
+    `generar()` reutiliza el texto de cada evento mientras su plazo, caso y
+    cliente no cambien, y solo carga y renderiza los eventos nuevos o
+    modificados.
+    """
+
+    def __init__(self, caso_id: Optional[int] = None, cliente_id: Optional[int] = None,
+                 hoy: Optional[date] = None):
+        self.caso_id = caso_id
+        self.cliente_id = cliente_id
+        self.hoy = hoy or date.today()
+        self.nombre = 'Plazos'
+        if caso_id is not None:
+            caso = db.session.get(Caso, caso_id)
+            if caso is None:
+                raise LookupError(f"No existe el caso {caso_id}")
+            self.nombre = f"Plazos · {caso.materia}" + (f" ({caso.numero_expediente})" if caso.numero_expediente else '')
+        elif cliente_id is not None:
+            cliente = db.session.get(Cliente, cliente_id)
+            if cliente is None:
+                raise LookupError(f"No existe el cliente {cliente_id}")
+            self.nombre = f"Plazos · {cliente.nombre}"
+
+    @property
+    def clave(self) -> str:
+        if self.caso_id is not None:
+            return f'caso:{self.caso_id}'
+        if self.cliente_id is not None:
+            return f'cliente:{self.cliente_id}'
+        return 'todos'
+
+    def _filtrar(self, consulta):
+        consulta = (
+            consulta.select_from(Plazo)
+            .join(Caso, Plazo.caso_id == Caso.id)
+            .join(Cliente, Caso.cliente_id == Cliente.id)
+            .where(Plazo.fecha_vencimiento >= self.hoy - timedelta(days=DIAS_HISTORIA))
+        )
+        if self.caso_id is not None:
+            consulta = consulta.where(Plazo.caso_id == self.caso_id)
+        if self.cliente_id is not None:
+            consulta = consulta.where(Caso.cliente_id == self.cliente_id)
+        return consulta
+
+    def version(self) -> Tuple[str, Optional[datetime]]:
+        """
+        ETag y última modificación (UTC) del feed.
+
+        Incluye la cantidad de plazos para que un borrado también cambie el
+        ETag, y la fecha porque la ventana de historia avanza cada día.
+        """
+        if self.caso_id is None and self.cliente_id is None:
+            # Feed completo: máximos globales (ix_*_actualizado) en vez de
+            # agregar sobre el join; invalida de más, pero cada 304 es O(log n)
+            desde = self.hoy - timedelta(days=DIAS_HISTORIA)
+            consulta = select(
+                select(func.max(Plazo.actualizado)).scalar_subquery(),
+                select(func.max(Caso.actualizado)).scalar_subquery(),
+                select(func.max(Cliente.actualizado)).scalar_subquery(),
+                select(func.count()).select_from(Plazo)
+                .where(Plazo.fecha_vencimiento >= desde).scalar_subquery()
+            )
+        else:
+            consulta = self._filtrar(select(
+                func.max(Plazo.actualizado),
+                func.max(Caso.actualizado),
+                func.max(Cliente.actualizado),
+                func.count(Plazo.id)
+            ))
+        plazo, caso, cliente, cantidad = db.session.execute(consulta).one()
+        momentos = [m for m in (plazo, caso, cliente) if m is not None]
+        modificado = max(momentos).astimezone(timezone.utc).replace(microsecond=0) if momentos else None
+        firma = f'{self.clave}|{self.hoy}|{plazo}|{caso}|{cliente}|{cantidad}|{self.nombre}'
+        return hashlib.sha1(firma.encode('utf-8')).hexdigest()[:24], modificado
+
+    def generar(self, etag: Optional[str] = None) -> str:
+        """Texto del feed (con `etag`, reutiliza el feed completo si no cambió)"""
+        if etag is not None:
+            cuerpo = feeds.obtener(self.clave, etag)
+            if cuerpo is not None:
+                return cuerpo
+
+        filas = db.session.execute(self._filtrar(select(
+            Plazo.id, Plazo.actualizado, Caso.actualizado, Cliente.actualizado
+        )).order_by(Plazo.fecha_vencimiento, Plazo.id)).all()
+
+        fragmentos: List[Optional[str]] = []
+        faltantes: Dict[int, int] = {}
+        for posicion, (plazo_id, *version) in enumerate(filas):
+            fragmento = eventos.obtener(plazo_id, tuple(version))
+            if fragmento is None:
+                faltantes[plazo_id] = posicion
+            fragmentos.append(fragmento)
+
+        ids = list(faltantes)
+        for inicio in range(0, len(ids), LOTE_CARGA):
+            lote = db.session.execute(
+                select(*_columnas_evento(), Caso.actualizado.label('caso_actualizado'),
+                       Cliente.actualizado.label('cliente_actualizado'))
+                .join(Caso, Plazo.caso_id == Caso.id)
+                .join(Cliente, Caso.cliente_id == Cliente.id)
+                .where(Plazo.id.in_(ids[inicio:inicio + LOTE_CARGA]))
+            ).all()
+            for fila in lote:
+                fragmento = renderizar_evento(fila)
+                eventos.guardar(fila.id, (fila.actualizado, fila.caso_actualizado, fila.cliente_actualizado), fragmento)
+                fragmentos[faltantes[fila.id]] = fragmento
+
+        cabecera = ''.join(plegar(linea) for linea in (
+            'BEGIN:VCALENDAR',
+            'VERSION:2.0',
+            f'PRODID:{PRODID}',
+            'CALSCALE:GREGORIAN',
+            'METHOD:PUBLISH',
+            f'X-WR-CALNAME:{escapar(self.nombre)}',
+            f'REFRESH-INTERVAL;VALUE=DURATION:{INTERVALO_REFRESCO}',
+            f'X-PUBLISHED-TTL:{INTERVALO_REFRESCO}',
+        ))
+        # Un plazo borrado entre las dos consultas queda sin fragmento
+        cuerpo = cabecera + ''.join(f for f in fragmentos if f) + 'END:VCALENDAR\r\n'
+        if etag is not None:
+            feeds.guardar(self.clave, etag, cuerpo)
+        return cuerpo
+
+def estadisticas_cache() -> Dict[str, Dict[str, int]]:
+    """Aciertos y fallos de las cachés de eventos y feeds"""
+    return {'eventos': eventos.estadisticas(), 'feeds': feeds.estadisticas()}
@@ -0,0 +1,309 @@
+# Dialéctico OS - Registro de Cambios (CDC)
+# =========================================
+
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Iterable, List, Optional, Tuple
+import json
+import logging
+import os
+
+from sqlalchemy import delete, event, inspect, select
+from sqlalchemy.orm import Session
+
+from .models import db, Cliente, Caso, Tarea, Plazo, Cambio, Configuracion
+
+# Modelos auditados
+MODELOS = (Cliente, Caso, Tarea, Plazo)
+TABLAS = {modelo.__table__.name: modelo for modelo in MODELOS}
+
+# Columnas que no generan cambios: marcas de tiempo y estado derivado
+# (escaneo de alertas, recordatorios)
+COLUMNAS_IGNORADAS = {
+    'creado', 'actualizado', 'estado_alerta', 'alerta_calculada', 'notificado', 'notificado_estado',
+    'recordado_para'
+}
+
+# Opción de ejecución para sentencias masivas que no deben registrarse
+SIN_REGISTRO = 'registrar_cambios'
+
+LIMITE_LECTURA = 1000
+
+# Prefijo de Configuracion con el cursor de cada consumidor
+PREFIJO_CURSOR = 'cdc_cursor_'
+
+# Días que se conservan los cambios (ver `podar_cambios`)
+RETENCION_DIAS = int(os.environ.get('CAMBIOS_RETENCION_DIAS', '30'))
+TAMAÑO_LOTE_PODA = 5000
+
+# Clave de Configuracion con el último seq borrado por la poda
+CLAVE_PODADO = 'cambios_podado_hasta'
+
+logger = logging.getLogger(__name__)
+
+class CursorVencido(Exception):
+    """
+    El cursor es anterior a los cambios conservados: el lector perdió
+    cambios y debe resincronizar leyendo las tablas completas, y seguir
+    desde `ultimo_seq()` tomado antes de esa lectura.
+    """
+
+    def __init__(self, desde: int, podado_hasta: int):
+        super().__init__(f"Cursor {desde} anterior a los cambios conservados (podado hasta {podado_hasta})")
+        self.desde = desde
+        self.podado_hasta = podado_hasta
+
+# ============ SERIALIZACIÓN ============
+
+def _valor(valor):
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    if isinstance(valor, Enum):
+        return valor.value
+    return valor
+
+def _columnas(modelo) -> List[str]:
+    return [c.key for c in inspect(modelo).column_attrs if c.key not in COLUMNAS_IGNORADAS]
+
+def _fila(tabla: str, fila_id, operacion: str, nuevo=None, anterior=None) -> dict:
+    datos = {}
+    if nuevo:
+        datos['nuevo'] = {k: _valor(v) for k, v in nuevo.items()}
+    if anterior:
+        datos['anterior'] = {k: _valor(v) for k, v in anterior.items()}
+    return {
+        'tabla': tabla,
+        'fila_id': fila_id,
+        'operacion': operacion,
+        'datos': json.dumps(datos, ensure_ascii=False) if datos else None,
+        'momento': datetime.now()
+    }
+
+def _cambios_de_objeto(objeto, operacion: str) -> Optional[dict]:
+    """Fila de Cambio para un objeto del flush, o None si no cambió nada auditado"""
+    estado = inspect(objeto)
+    tabla = objeto.__table__.name
+    columnas = _columnas(type(objeto))
+    if operacion == 'insert':
+        return _fila(tabla, objeto.id, operacion, nuevo={c: getattr(objeto, c) for c in columnas})
+    if operacion == 'delete':
+        return _fila(tabla, objeto.id, operacion, anterior={c: getattr(objeto, c) for c in columnas})
+
+    nuevo, anterior = {}, {}
+    for columna in columnas:
+        historia = estado.attrs[columna].history
+        if historia.has_changes():
+            nuevo[columna] = historia.added[0] if historia.added else None
+            anterior[columna] = historia.deleted[0] if historia.deleted else None
+    if not nuevo:
+        return None
+    return _fila(tabla, objeto.id, operacion, nuevo=nuevo, anterior=anterior)
+
+def _escribir(sesion, filas: List[dict]):
+    """Un INSERT en lote en la misma transacción que los datos"""
+    if filas:
+        sesion.connection().execute(Cambio.__table__.insert(), filas)
+
+# ============ CAPTURA ============
+
+def instalar_registro():
+    """
+    Registrar en `Cambio` las escrituras sobre los modelos auditados.
+
+    - after_flush: objetos nuevos, modificados (solo columnas que cambiaron,
+      con valor anterior y nuevo) y borrados.
+    - do_orm_execute: INSERT masivos (con RETURNING para conocer los ids),
+      UPDATE masivos por clave primaria (una fila por id) y UPDATE/DELETE
+      con criterio (una fila 'masivo' con la sentencia). Las sentencias con
+      `execution_options={'registrar_cambios': False}` no se registran.
+
+    Los cambios se insertan en lote dentro de la transacción que los
+    produce: si hay rollback, desaparecen con ella.
+
+    Solo se captura lo que pasa por la sesión ORM: una sentencia Core
+    ejecutada con `sesion.connection().execute(...)` o sobre el motor no
+    dispara estos eventos y no queda registrada. Las escrituras sobre los
+    modelos auditados van por `db.session.execute(update(Modelo)...)`.
+    """
+
+    @event.listens_for(Session, 'after_flush')
+    def _flush(sesion, contexto):
+        filas = []
+        for coleccion, operacion in ((sesion.new, 'insert'), (sesion.dirty, 'update'), (sesion.deleted, 'delete')):
+            for objeto in coleccion:
+                if type(objeto) in MODELOS:
+                    fila = _cambios_de_objeto(objeto, operacion)
+                    if fila is not None:
+                        filas.append(fila)
+        _escribir(sesion, filas)
+
+    @event.listens_for(Session, 'do_orm_execute')
+    def _masivo(estado):
+        if not (estado.is_insert or estado.is_update or estado.is_delete):
+            return None
+        mapper = estado.bind_mapper
+        if mapper is None or mapper.class_ not in MODELOS:
+            return None
+        if estado.execution_options.get(SIN_REGISTRO, True) is False:
+            return None
+
+        tabla = mapper.local_table.name
+        parametros = estado.parameters
+        lote = isinstance(parametros, list) and parametros
+
+        # Sin accesor público para saber si la sentencia ya pide RETURNING
+        if estado.is_insert and lote and not getattr(estado.statement, '_returning', ()):
+            resultado = estado.invoke_statement(
+                statement=estado.statement.returning(mapper.class_.id, sort_by_parameter_order=True)
+            ).freeze()
+            ids = [fila[0] for fila in resultado().all()]
+            columnas = set(_columnas(mapper.class_))
+            _escribir(estado.session, [
+                _fila(tabla, fila_id, 'insert', nuevo={k: v for k, v in valores.items() if k in columnas})
+                for fila_id, valores in zip(ids, parametros)
+            ])
+            return resultado()
+
+        # Por clave primaria; un executemany con otros parámetros cae en 'masivo'
+        if estado.is_update and lote and all('id' in valores for valores in parametros):
+            filas = []
+            for valores in parametros:
+                nuevo = {k: v for k, v in valores.items() if k != 'id' and k not in COLUMNAS_IGNORADAS}
+                if nuevo:
+                    filas.append(_fila(tabla, valores['id'], 'update', nuevo=nuevo))
+            resultado = estado.invoke_statement()
+            _escribir(estado.session, filas)
+            return resultado
+
+        # Con criterio: no se sabe qué filas toca sin releerlas
+        resultado = estado.invoke_statement()
+        if resultado.rowcount:
+            _escribir(estado.session, [_fila(
+                tabla, None, 'masivo',
+                nuevo={'operacion': 'update' if estado.is_update else 'delete',
+                       'sentencia': str(estado.statement), 'filas': resultado.rowcount}
+            )])
+        return resultado
+
+# ============ LECTURA ============
+
+def leer_cambios(
+    desde: int = 0,
+    tablas: Optional[Iterable[str]] = None,
+    limite: int = LIMITE_LECTURA
+) -> Tuple[List[dict], int]:
+    """
+    Cambios con seq mayor que `desde`, en orden.
+
+    Args:
+        desde: Último seq ya procesado por el lector
+        tablas: Filtrar por tabla (cliente, caso, tarea, plazo)
+        limite: Máximo de cambios por lectura
+
+    Returns:
+        (cambios, cursor): el cursor es el seq del último cambio leído, o
+        `desde` si no hubo ninguno
+
+    Raises:
+        CursorVencido: `desde` es anterior a lo que dejó la poda
+    """
+    podado = podado_hasta()
+    if desde < podado:
+        raise CursorVencido(desde, podado)
+    consulta = select(Cambio).where(Cambio.seq > desde).order_by(Cambio.seq).limit(limite)
+    if tablas:
+        consulta = consulta.where(Cambio.tabla.in_(list(tablas)))
+    cambios = db.session.scalars(consulta).all()
+    return [c.to_dict() for c in cambios], (cambios[-1].seq if cambios else desde)
+
+def ultimo_seq() -> int:
+    """Seq del último cambio registrado (0 si no hay), aunque la poda lo haya borrado"""
+    return max(db.session.scalar(select(db.func.max(Cambio.seq))) or 0, podado_hasta())
+
+def podado_hasta() -> int:
+    """Último seq borrado por la poda (0 si nunca se podó)"""
+    return int(Configuracion.get(CLAVE_PODADO, 0))
+
+# ============ RETENCIÓN ============
+
+def podar_cambios(
+    dias: int = RETENCION_DIAS,
+    ahora: Optional[datetime] = None,
+    tamaño_lote: int = TAMAÑO_LOTE_PODA
+) -> int:
+    """
+    Borrar los cambios con más de `dias` días, de los más viejos a los más
+    nuevos y por lotes de seq (un commit por lote, sin bloquear a los
+    escritores por mucho tiempo).
+
+    El último seq borrado queda en Configuracion: un lector con un cursor
+    anterior recibe `CursorVencido` en vez de saltarse cambios sin saberlo.
+    Los consumidores deben confirmar su cursor con más frecuencia que la
+    retención.
+
+    Returns:
+        Filas borradas
+    """
+    corte = (ahora or datetime.now()) - timedelta(days=dias)
+    borrados = 0
+    while True:
+        # Por seq (clave primaria): momento crece con seq, no hace falta índice
+        filas = db.session.execute(
+            select(Cambio.seq, Cambio.momento).order_by(Cambio.seq).limit(tamaño_lote)
+        ).all()
+        viejas = [seq for seq, momento in filas if momento < corte]
+        if not viejas:
+            break
+        hasta = viejas[-1]
+        borrados += db.session.execute(
+            delete(Cambio).where(Cambio.seq <= hasta),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        # Configuracion.set hace commit junto con el DELETE
+        Configuracion.set(CLAVE_PODADO, str(hasta), 'Último seq del registro de cambios podado')
+        if len(viejas) < len(filas):
+            break
+
+    if borrados:
+        logger.info("Registro de cambios podado: %d filas anteriores a %s", borrados, corte)
+    return borrados
+
+class ConsumidorCambios:
+    """
+    Lector con cursor persistente en Configuracion ('cdc_cursor_<nombre>').
+
+        consumidor = ConsumidorCambios('busqueda', tablas=['cliente', 'caso'])
+        for cambio in consumidor.pendientes():
+            ...
+        consumidor.confirmar()
+
+    Entre `pendientes` y `confirmar` una caída repite los cambios: el
+    procesamiento debe ser idempotente. Si el consumidor estuvo detenido
+    más que la retención, `pendientes` lanza `CursorVencido`: se toma
+    `ultimo_seq()`, se reconstruye todo desde las tablas y se confirma
+    ese seq.
+    """
+
+    def __init__(self, nombre: str, tablas: Optional[Iterable[str]] = None, limite: int = LIMITE_LECTURA):
+        self.nombre = nombre
+        self.tablas = list(tablas) if tablas else None
+        self.limite = limite
+        self._leido: Optional[int] = None
+
+    @property
+    def clave(self) -> str:
+        return f'{PREFIJO_CURSOR}{self.nombre}'
+
+    def cursor(self) -> int:
+        return int(Configuracion.get(self.clave, 0))
+
+    def pendientes(self) -> List[dict]:
+        """Siguiente tanda de cambios sin confirmar"""
+        cambios, self._leido = leer_cambios(self.cursor(), self.tablas, self.limite)
+        return cambios
+
+    def confirmar(self, seq: Optional[int] = None):
+        """Avanzar el cursor hasta `seq` (por defecto, lo último leído)"""
+        seq = self._leido if seq is None else seq
+        if seq is not None and seq > self.cursor():
+            Configuracion.set(self.clave, str(seq), f'Cursor CDC de {self.nombre}')
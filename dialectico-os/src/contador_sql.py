@@ -0,0 +1,49 @@
+# Dialéctico OS - Contador de Consultas SQL
+# =========================================
+
+import time
+
+from flask import g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Cabeceras de respuesta con el resumen de la request
+CABECERA_CONSULTAS = 'X-SQL-Consultas'
+CABECERA_TIEMPO = 'X-SQL-Tiempo-Ms'
+
+def _contando() -> bool:
+    """Hay una request activa con el contador habilitado"""
+    return has_request_context() and 'sql_consultas' in g
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if _contando():
+        conn.info.setdefault('sql_inicio', []).append(time.perf_counter())
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    if _contando() and conn.info.get('sql_inicio'):
+        g.sql_segundos += time.perf_counter() - conn.info['sql_inicio'].pop()
+        g.sql_consultas += 1
+
+def instalar_contador(app):
+    """
+    Contar las sentencias SQL de cada request y su tiempo total.
+
+    Se activa con `CONTAR_CONSULTAS` (por defecto, en modo debug) y agrega
+    las cabeceras X-SQL-Consultas y X-SQL-Tiempo-Ms a la respuesta, para
+    detectar consultas N+1 en desarrollo y en tests.
+    """
+    event.listen(Engine, 'before_cursor_execute', _antes_de_ejecutar)
+    event.listen(Engine, 'after_cursor_execute', _despues_de_ejecutar)
+
+    @app.before_request
+    def _iniciar_contador():
+        if app.config.get('CONTAR_CONSULTAS', app.debug):
+            g.sql_consultas = 0
+            g.sql_segundos = 0.0
+
+    @app.after_request
+    def _cabeceras_contador(response):
+        if 'sql_consultas' in g:
+            response.headers[CABECERA_CONSULTAS] = str(g.sql_consultas)
+            response.headers[CABECERA_TIEMPO] = f'{g.sql_segundos * 1000:.2f}'
+        return response
@@ -3,8 +3,21 @@
 
 from datetime import date, datetime, timedelta
 from dateutil.relativedelta import relativedelta
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from functools import lru_cache
 import calendar
+import math
+import re
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usa el cálculo escalar
+    np = None
 
 # ============ CONSTANTES ============
 
@@ -51,7 +64,7 @@ FERIADOS_LEGALES = {
     date(2026, 4, 4): "Sábado Santo",
     date(2026, 5, 1): "Día del Trabajo",
     date(2026, 5, 21): "Glorias Navales",
-    date(2026, 6, 21): "Asunción de la Virgen",
+    date(2026, 6, 21): "Día de los Pueblos Indígenas",
     date(2026, 7, 16): "Virgen del Carmen",
     date(2026, 8, 15): "Asunción de la Virgen",
     date(2026, 9, 18): "Fiestas Patrias",
@@ -62,12 +75,444 @@ FERIADOS_LEGALES = {
     date(2026, 12, 25): "Navidad",
 }
 
-# Feriados con法律规定移动 (pactos administrativos)
+# La tabla anterior se suma a los feriados generados por regla (también en
+# sus años): sirve para feriados puntuales que las reglas no cubren
+
+# Feriados de fecha fija (mes, día, nombre)
+FECHAS_FIJAS = [
+    (ENERO, 1, "Año Nuevo"),
+    (MAYO, 1, "Día del Trabajo"),
+    (MAYO, 21, "Glorias Navales"),
+    (JULIO, 16, "Virgen del Carmen"),
+    (AGOSTO, 15, "Asunción de la Virgen"),
+    (SEPTIEMBRE, 18, "Fiestas Patrias"),
+    (SEPTIEMBRE, 19, "Glorias del Ejército"),
+    (NOVIEMBRE, 1, "Todos los Santos"),
+    (DICIEMBRE, 8, "Inmaculada Concepción"),
+    (DICIEMBRE, 25, "Navidad"),
+]
+
+# Feriados que se trasladan a lunes (Ley 19.668)
+# Regla: si cae martes, miércoles o jueves, se anticipa al lunes de esa semana
+# Si cae viernes, se posterga al lunes siguiente
 FECHAS_MOVIBLES = [
-    # Regla: Si cae martes, se anticipa al lunes
-    # Si cae miércoles o jueves, se posterga al lunes siguiente
+    (JUNIO, 29, "San Pedro y San Pablo"),
+    (OCTUBRE, 12, "Encuentro de Dos Mundos"),
 ]
 
+# ============ GENERADOR DE FERIADOS ============
+
+def domingo_de_pascua(año: int) -> date:
+    """Domingo de Pascua (algoritmo gregoriano anónimo)"""
+    a = año % 19
+    b, c = divmod(año, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(año, mes, dia + 1)
+
+def trasladar_a_lunes(fecha: date) -> date:
+    """Aplicar el traslado a lunes de la Ley 19.668"""
+    dia_semana = fecha.weekday()
+    if 1 <= dia_semana <= 3:  # martes a jueves -> lunes de esa semana
+        return fecha - timedelta(days=dia_semana)
+    if dia_semana == 4:  # viernes -> lunes siguiente
+        return fecha + timedelta(days=3)
+    return fecha
+
+def solsticio_de_invierno(año: int) -> date:
+    """
+    Día del solsticio de invierno austral en hora de Chile continental.
+    
+    Fórmula de Meeus para el solsticio de junio (error de minutos),
+    convertida a UTC-4.
+    """
+    y = (año - 2000) / 1000
+    jde = 2451716.56767 + 365241.62603 * y + 0.00325 * y ** 2 + 0.00888 * y ** 3 - 0.00030 * y ** 4
+    # Día juliano 2451544.5 = 2000-01-01 00:00 UTC
+    dias = jde - 2451544.5 - 4 / 24
+    return date(2000, ENERO, 1) + timedelta(days=math.floor(dias))
+
+@lru_cache(maxsize=None)
+def _feriados_generados(año: int) -> Tuple[Tuple[date, str], ...]:
+    """Feriados legales de un año (memoizado)"""
+    feriados = {date(año, mes, dia): nombre for mes, dia, nombre in FECHAS_FIJAS}
+    
+    pascua = domingo_de_pascua(año)
+    feriados[pascua - timedelta(days=2)] = "Viernes Santo"
+    feriados[pascua - timedelta(days=1)] = "Sábado Santo"
+    
+    for mes, dia, nombre in FECHAS_MOVIBLES:
+        feriados[trasladar_a_lunes(date(año, mes, dia))] = nombre
+    
+    if año >= 2021:  # Ley 21.357 (en 2021 la ley fijó el lunes 21 de junio)
+        indigenas = date(2021, JUNIO, 21) if año == 2021 else solsticio_de_invierno(año)
+        feriados[indigenas] = "Día de los Pueblos Indígenas"
+    
+    # Iglesias Evangélicas (Ley 20.299): martes -> viernes anterior, miércoles -> viernes siguiente
+    evangelicas = date(año, OCTUBRE, 31)
+    if evangelicas.weekday() == 1:
+        evangelicas -= timedelta(days=4)
+    elif evangelicas.weekday() == 2:
+        evangelicas += timedelta(days=2)
+    feriados[evangelicas] = "Día de las Iglesias Evangélicas"
+    
+    # Días "sándwich" fijados por ley
+    if date(año, ENERO, 2).weekday() == 0:
+        feriados[date(año, ENERO, 2)] = "Feriado adicional Año Nuevo"
+    if date(año, SEPTIEMBRE, 17).weekday() == 0:
+        feriados[date(año, SEPTIEMBRE, 17)] = "Feriado adicional Fiestas Patrias"
+    if date(año, SEPTIEMBRE, 20).weekday() == 4:
+        feriados[date(año, SEPTIEMBRE, 20)] = "Feriado adicional Fiestas Patrias"
+    
+    return tuple(sorted(feriados.items()))
+
+def feriados_del_año(año: int) -> Dict[date, str]:
+    """
+    Feriados legales chilenos de cualquier año, calculados por reglas.
+    
+    Args:
+        año: Año a calcular
+        
+    Returns:
+        Dict {fecha: nombre} (copia nueva, se puede modificar)
+    """
+    return dict(_feriados_generados(año))
+
+# ============ FERIADOS REGIONALES ============
+
+# Feriados de una región o comuna: (mes, día, nombre, desde el año)
+FERIADOS_REGIONALES = {
+    # Ley 20.663
+    'Arica y Parinacota': [(JUNIO, 7, "Asalto y Toma del Morro de Arica", 2013)],
+    # Ley 20.768 (comunas de Chillán y Chillán Viejo)
+    'Chillán': [(AGOSTO, 20, "Nacimiento del Prócer de la Independencia", 2014)],
+}
+
+# Localidades que identifican la región en el nombre de un tribunal
+LOCALIDADES_REGION = {
+    'Arica y Parinacota': ('arica', 'putre', 'camarones', 'general lagos', 'parinacota'),
+    'Chillán': ('chillán', 'chillan'),
+}
+
+@lru_cache(maxsize=1024)
+def region_de_tribunal(tribunal: Optional[str]) -> Optional[str]:
+    """
+    Región con feriados propios que corresponde a un tribunal, según las
+    localidades de su nombre (p.ej. "Juzgado de Letras de Arica").
+    """
+    if not tribunal:
+        return None
+    nombre = tribunal.lower()
+    for region, localidades in LOCALIDADES_REGION.items():
+        if any(re.search(rf'\b{localidad}\b', nombre) for localidad in localidades):
+            return region
+    return None
+
+def feriados_regionales(region: str, año: int) -> List[Tuple[date, str]]:
+    """Feriados propios de una región en un año"""
+    return [
+        (date(año, mes, dia), nombre)
+        for mes, dia, nombre, desde_año in FERIADOS_REGIONALES.get(region, ())
+        if año >= desde_año
+    ]
+
+# ============ CAPAS DE FERIADOS ============
+
+class CapaFeriados(MutableMapping):
+    """
+    Feriados de una capa sobre una base de solo lectura (copy-on-write).
+    
+    Las lecturas consultan primero la capa y luego la base; las escrituras
+    solo tocan la capa, así una capa nueva no copia la base y pesa lo que
+    sus propios cambios.
+    """
+    
+    __slots__ = ('base', 'agregados', 'removidos')
+    
+    def __init__(self, base: Mapping):
+        self.base = base
+        self.agregados: Dict[date, str] = {}
+        self.removidos = set()
+    
+    def __contains__(self, fecha) -> bool:
+        if fecha in self.agregados:
+            return True
+        return fecha in self.base and fecha not in self.removidos
+    
+    def __getitem__(self, fecha) -> str:
+        if fecha in self.agregados:
+            return self.agregados[fecha]
+        if fecha in self.removidos:
+            raise KeyError(fecha)
+        return self.base[fecha]
+    
+    def __setitem__(self, fecha, nombre: str):
+        self.agregados[fecha] = nombre
+        self.removidos.discard(fecha)
+    
+    def __delitem__(self, fecha):
+        if fecha not in self:
+            raise KeyError(fecha)
+        self.agregados.pop(fecha, None)
+        if fecha in self.base:
+            self.removidos.add(fecha)
+    
+    def __iter__(self):
+        yield from self.agregados
+        for fecha in self.base:
+            if fecha not in self.agregados and fecha not in self.removidos:
+                yield fecha
+    
+    def __len__(self):
+        return sum(1 for _ in self)
+    
+    def propia(self) -> bool:
+        """La capa difiere de la base"""
+        return bool(self.agregados or self.removidos)
+
+# ============ ÍNDICE DE DÍAS HÁBILES ============
+
+# Días de la semana que cuentan en cada tipo de plazo (0=lunes, 6=domingo)
+SEMANA_HABIL = frozenset({0, 1, 2, 3, 4})
+SEMANA_JUDICIAL = frozenset({0, 1, 2, 3, 4, 5})  # Solo excluye domingos
+
+# Tamaño de lote desde el cual `calcular_vencimientos` usa NumPy
+UMBRAL_NUMPY = 256
+
+# Rango por defecto del índice de días hábiles (relativo al año actual)
+AÑOS_INDICE_ATRAS = 5
+AÑOS_INDICE_ADELANTE = 10
+
+# Extensión máxima del índice; más allá se cuenta día a día
+MAX_AÑOS_INDICE = 200
+
+class IndiceDiasHabiles:
+    """
+    Índice de conteo acumulado de días hábiles para un rango de años.
+    
+    `conteo[i]` es el número de días hábiles en [inicio, inicio + i días),
+    guardado en un `array` compacto. Contar días entre dos fechas es una
+    resta y sumar N días hábiles es una búsqueda binaria sobre el arreglo.
+    
+    Los cambios de feriados se registran con `invalidar(fecha)`: solo se
+    recalcula el tramo posterior a la fecha más temprana modificada, y
+    recién en la siguiente consulta.
+    """
+    
+    def __init__(
+        self,
+        desde_año: int,
+        hasta_año: int,
+        feriados: dict,
+        dias_laborales: Iterable[int] = SEMANA_HABIL,
+        lock: Optional[threading.RLock] = None
+    ):
+        """
+        Args:
+            desde_año: Primer año cubierto por el índice
+            hasta_año: Último año cubierto (inclusive)
+            feriados: Dict de feriados {fecha: nombre}, compartido con el calendario
+            dias_laborales: Días de la semana que cuentan (0=lunes)
+            lock: Lock del calendario que escribe en `feriados`
+        """
+        if hasta_año < desde_año:
+            raise ValueError(f"Rango de años inválido: {desde_año}-{hasta_año}")
+        self.inicio = date(desde_año, ENERO, 1)
+        self.fin = date(hasta_año, DICIEMBRE, 31)
+        self.feriados = feriados
+        self.dias_laborales = frozenset(dias_laborales)
+        self._total = (self.fin - self.inicio).days + 1
+        self._conteo = array('l', bytes(array('l').itemsize * (self._total + 1)))
+        self._sucio_desde: Optional[int] = 0
+        self._lock = lock or threading.RLock()
+    
+    def contiene(self, fecha: date) -> bool:
+        """Verificar si la fecha está dentro del rango indexado"""
+        return self.inicio <= fecha <= self.fin
+    
+    def invalidar(self, fecha: date):
+        """Marcar el índice como desactualizado desde una fecha"""
+        if fecha > self.fin:
+            return
+        posicion = max((fecha - self.inicio).days, 0)
+        if self._sucio_desde is None or posicion < self._sucio_desde:
+            self._sucio_desde = posicion
+    
+    def _reconstruir(self):
+        """Recalcular el conteo acumulado desde la primera posición sucia"""
+        if self._sucio_desde is None:
+            return
+        # Con el lock del calendario: `feriados` no cambia mientras se copia
+        with self._lock:
+            desde = self._sucio_desde
+            if desde is None:
+                return  # Otro hilo ya reconstruyó
+            conteo = self._conteo
+            # Conjunto plano: las capas de feriados resuelven `in` en Python
+            feriados = set(self.feriados)
+            laborales = self.dias_laborales
+            actual = self.inicio + timedelta(days=desde)
+            acumulado = conteo[desde]
+            un_dia = timedelta(days=1)
+            for i in range(desde, self._total):
+                if actual.weekday() in laborales and actual not in feriados:
+                    acumulado += 1
+                conteo[i + 1] = acumulado
+                actual += un_dia
+            self._sucio_desde = None
+    
+    def contar(self, inicio: date, fin: date) -> int:
+        """Días hábiles en [inicio, fin], ambas fechas dentro del rango"""
+        if inicio > fin:
+            return 0
+        self._reconstruir()
+        i = (inicio - self.inicio).days
+        j = (fin - self.inicio).days
+        return self._conteo[j + 1] - self._conteo[i]
+    
+    def sumar(self, inicio: date, dias: int) -> Optional[date]:
+        """
+        Fecha del N-ésimo día hábil posterior a `inicio`.
+        
+        Returns:
+            La fecha, o None si cae fuera del rango indexado
+        """
+        if dias <= 0:
+            return inicio
+        self._reconstruir()
+        i = (inicio - self.inicio).days
+        objetivo = self._conteo[i + 1] + dias
+        j = bisect_left(self._conteo, objetivo, i + 1)
+        if j > self._total:
+            return None
+        return self.inicio + timedelta(days=j - 1)
+
+# ============ SUSPENSIONES ============
+
+class IndiceSuspensiones:
+    """
+    Períodos de suspensión de plazos como intervalos [inicio, fin]
+    disjuntos y ordenados.
+    
+    Los períodos que se superponen o son contiguos se fusionan al
+    agregarse, de modo que encontrar los que tocan un rango es una
+    búsqueda binaria más el recorrido de los que caen dentro.
+    """
+    
+    def __init__(self, periodos: Iterable[Tuple[date, date]] = ()):
+        self._inicios: List[date] = []
+        self._fines: List[date] = []
+        for inicio, fin in periodos:
+            self.agregar(inicio, fin)
+    
+    @classmethod
+    def unir(cls, *indices: 'IndiceSuspensiones') -> 'IndiceSuspensiones':
+        """Índice con los períodos de todos los índices dados"""
+        return cls(periodo for indice in indices for periodo in indice.periodos())
+    
+    def agregar(self, inicio: date, fin: date):
+        """Agregar un período, fusionándolo con los que toca"""
+        if fin < inicio:
+            raise ValueError(f"Suspensión con fin {fin} anterior al inicio {inicio}")
+        # Intervalos [i, j) que se superponen o son contiguos con [inicio, fin]
+        i = bisect_left(self._fines, inicio - timedelta(days=1))
+        j = bisect_right(self._inicios, fin + timedelta(days=1))
+        if i < j:
+            inicio = min(inicio, self._inicios[i])
+            fin = max(fin, self._fines[j - 1])
+        self._inicios[i:j] = [inicio]
+        self._fines[i:j] = [fin]
+    
+    def contiene(self, fecha: date) -> bool:
+        """La fecha está dentro de algún período"""
+        i = bisect_right(self._inicios, fecha) - 1
+        return i >= 0 and self._fines[i] >= fecha
+    
+    def superpuestos(self, desde: date, hasta: date) -> Iterator[Tuple[date, date]]:
+        """Tramos de los períodos que caen en [desde, hasta], recortados"""
+        i = bisect_left(self._fines, desde)
+        while i < len(self._inicios) and self._inicios[i] <= hasta:
+            yield max(self._inicios[i], desde), min(self._fines[i], hasta)
+            i += 1
+    
+    def periodos(self) -> List[Tuple[date, date]]:
+        """Períodos fusionados, ordenados"""
+        return list(zip(self._inicios, self._fines))
+    
+    def __len__(self):
+        return len(self._inicios)
+
+# ============ CACHÉ DE VENCIMIENTOS ============
+
+# Entradas por defecto de la caché de vencimientos de cada calendario
+TAMAÑO_CACHE = 4096
+
+# Días de inicio que precalienta `CalendarioChileno.precalentar`
+DIAS_PRECALENTAR = 90
+
+class CacheVencimientos:
+    """
+    Caché LRU de vencimientos calculados.
+    
+    Las claves incluyen la versión de feriados del calendario, de modo que
+    un cambio de feriados deja inalcanzables las entradas anteriores, que
+    salen por desalojo. Segura entre hilos.
+    """
+    
+    def __init__(self, capacidad: int = TAMAÑO_CACHE):
+        self.capacidad = capacidad
+        self._entradas: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+    
+    def obtener(self, clave) -> Optional[date]:
+        """Vencimiento guardado para la clave, o None"""
+        with self._lock:
+            valor = self._entradas.get(clave)
+            if valor is None:
+                self.fallos += 1
+            else:
+                self.aciertos += 1
+                self._entradas.move_to_end(clave)
+            return valor
+    
+    def guardar(self, clave, valor: date):
+        """Guardar un vencimiento, desalojando el menos usado si está llena"""
+        with self._lock:
+            self._entradas[clave] = valor
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+                self.desalojos += 1
+    
+    def limpiar(self):
+        """Vaciar la caché (las estadísticas se conservan)"""
+        with self._lock:
+            self._entradas.clear()
+    
+    def __len__(self):
+        return len(self._entradas)
+    
+    def estadisticas(self) -> dict:
+        """Aciertos, fallos, desalojos y ocupación"""
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'desalojos': self.desalojos,
+            'entradas': len(self._entradas),
+            'capacidad': self.capacidad,
+            'tasa_aciertos': round(self.aciertos / consultas, 4) if consultas else 0.0
+        }
+
 # ============ CLASE PRINCIPAL ============
 
 class CalendarioChileno:
@@ -81,19 +526,154 @@ class CalendarioChileno:
     - Compensación de fines de semana
     """
     
-    def __init__(self, feriados: dict = None, incluir_regionales: bool = True):
+    def __init__(
+        self,
+        feriados: dict = None,
+        incluir_regionales: bool = True,
+        rango_indice: Tuple[int, int] = None,
+        generar_feriados: bool = True,
+        tamaño_cache: int = TAMAÑO_CACHE
+    ):
         """
         Inicializar calendario.
         
         Args:
-            feriados: Dict de feriados {fecha: nombre}
-            incluir_regionales: Incluir feriados regionales
+            feriados: Dict de feriados {fecha: nombre}. Por defecto, una
+                capa sobre FERIADOS_LEGALES (sin copiarlos)
+            incluir_regionales: Usar capas con los feriados regionales para
+                los tribunales de esas regiones (ver `para_tribunal`)
+            rango_indice: Años (desde, hasta) cubiertos inicialmente por el
+                índice de días hábiles. Se extiende solo si hace falta.
+            generar_feriados: Completar con `feriados_del_año` los años que
+                no están en FERIADOS_LEGALES, a medida que se consultan
+            tamaño_cache: Entradas de la caché de vencimientos (0 = sin caché)
         """
-        self.feriados = feriados or FERIADOS_LEGALES.copy()
+        self.feriados = feriados or CapaFeriados(FERIADOS_LEGALES)
         self.incluir_regionales = incluir_regionales
+        if rango_indice is None:
+            año = date.today().year
+            rango_indice = (año - AÑOS_INDICE_ATRAS, año + AÑOS_INDICE_ADELANTE)
+        self.rango_indice = rango_indice
+        self.generar_feriados = generar_feriados
+        self._años_cargados = set()
+        self._indices = {}
+        self._calendarios_np = {}
+        # Sube con agregar/remover_feriado y forma parte de la clave de la
+        # caché (cargar feriados generados de un año no cambia resultados ya
+        # calculados: el cálculo carga los años que recorre)
+        self.version_feriados = 0
+        self.cache = CacheVencimientos(tamaño_cache) if tamaño_cache > 0 else None
+        # Suspensiones por tribunal (None = nacionales) y su unión por tribunal
+        self.suspensiones: Dict[Optional[str], IndiceSuspensiones] = {}
+        self._suspensiones_efectivas: Dict[Optional[str], Optional[IndiceSuspensiones]] = {}
+        # Capas: calendario del que deriva, su región y las capas derivadas
+        self.base: Optional['CalendarioChileno'] = None
+        self.region: Optional[str] = None
+        self._capas: Dict[str, 'CalendarioChileno'] = {}
+        # Semanas laborales cuyo índice se toma prestado de la base
+        self._indices_base = set()
+        # Carga perezosa de años e índices (compartido con las capas derivadas):
+        # las lecturas sobre años ya cargados no lo toman
+        self._lock = threading.RLock()
+    
+    def _cargar_año(self, año: int):
+        """Agregar los feriados generados de un año, la primera vez que se usa"""
+        if año in self._años_cargados:
+            return
+        with self._lock:
+            if año in self._años_cargados:
+                return
+            if self.base is not None:
+                # Los feriados nacionales los carga la base; la capa, los regionales
+                self.base._cargar_año(año)
+                if self.region and self.incluir_regionales:
+                    for fecha, nombre in feriados_regionales(self.region, año):
+                        self.feriados.setdefault(fecha, nombre)
+                self._invalidar_indices(date(año, ENERO, 1))
+            elif self.generar_feriados:
+                for fecha, nombre in _feriados_generados(año):
+                    # Los feriados explícitos del calendario tienen prioridad
+                    self.feriados.setdefault(fecha, nombre)
+                self._invalidar_indices(date(año, ENERO, 1))
+            # Recién ahora: otro hilo que lo vea cargado ya encuentra sus feriados
+            self._años_cargados.add(año)
+    
+    def precargar(self):
+        """
+        Cargar los años de `rango_indice` y construir los índices de días
+        hábiles y judiciales. Para publicar el calendario ya listo antes de
+        compartirlo entre hilos: las consultas dentro del rango no escriben.
+        """
+        with self._lock:
+            self._cargar_años(*self.rango_indice)
+            for dias_laborales in (SEMANA_HABIL, SEMANA_JUDICIAL):
+                self._indice(dias_laborales)._reconstruir()
+    
+    def _cargar_años(self, desde_año: int, hasta_año: int):
+        """Cargar los feriados generados de un rango de años"""
+        for año in range(desde_año, hasta_año + 1):
+            self._cargar_año(año)
+    
+    def _indice(self, dias_laborales: frozenset) -> IndiceDiasHabiles:
+        """Índice de días hábiles para una semana laboral (se construye al primer uso)"""
+        indice = self._indices.get(dias_laborales)
+        if indice is not None:
+            return indice
+        with self._lock:
+            indice = self._indices.get(dias_laborales)
+            if indice is not None:
+                return indice
+            self._cargar_años(*self.rango_indice)
+            if (
+                self.base is not None
+                and not self.feriados.propia()
+                and tuple(self.base.rango_indice) == tuple(self.rango_indice)
+            ):
+                # Capa sin feriados propios: el índice de la base sirve tal cual
+                indice = self.base._indice(dias_laborales)
+                self._indices_base.add(dias_laborales)
+            else:
+                indice = IndiceDiasHabiles(*self.rango_indice, self.feriados, dias_laborales, self._lock)
+            self._indices[dias_laborales] = indice
+            return indice
+    
+    def _extender_indice(self, desde: date, hasta: date) -> bool:
+        """
+        Ampliar el rango indexado para cubrir [desde, hasta].
+        
+        Returns:
+            False si el rango resultante supera MAX_AÑOS_INDICE
+        """
+        with self._lock:
+            desde_año = min(self.rango_indice[0], desde.year)
+            hasta_año = max(self.rango_indice[1], hasta.year)
+            if hasta_año - desde_año + 1 > MAX_AÑOS_INDICE:
+                return False
+            if (desde_año, hasta_año) != tuple(self.rango_indice):
+                self.rango_indice = (desde_año, hasta_año)
+                self._indices.clear()
+                self._indices_base.clear()
+            return True
+    
+    def _sumar_indexado(self, inicio: date, dias: int, dias_laborales: frozenset) -> Optional[date]:
+        """Sumar días con el índice, extendiéndolo si el plazo sale del rango"""
+        indice = self._indice(dias_laborales)
+        if not indice.contiene(inicio):
+            if not self._extender_indice(inicio, inicio):
+                return None
+            indice = self._indice(dias_laborales)
+        vencimiento = indice.sumar(inicio, dias)
+        if vencimiento is None:
+            # Cota holgada: menos de 2 días corridos por día hábil, más feriados
+            horizonte = inicio + timedelta(days=2 * dias + 60)
+            if self._extender_indice(inicio, horizonte):
+                vencimiento = self._indice(dias_laborales).sumar(inicio, dias)
+        return vencimiento
     
     def es_feriado(self, fecha: date) -> bool:
         """Verificar si una fecha es feriado"""
+        if fecha.year not in self._años_cargados:
+            self._cargar_año(fecha.year)
         return fecha in self.feriados
     
     def es_fin_de_semana(self, fecha: date) -> bool:
@@ -132,6 +712,9 @@ class CalendarioChileno:
         if inicio > fin:
             return 0
         
+        if self._extender_indice(inicio, fin):
+            return self._indice(SEMANA_HABIL).contar(inicio, fin)
+        
         dias = 0
         actual = inicio
         while actual <= fin:
@@ -146,41 +729,278 @@ class CalendarioChileno:
         dias: int,
         tipo: str = 'habil',
         suspendido: bool = False,
-        dias_suspension: int = 0
+        dias_suspension: int = 0,
+        tribunal: str = None
     ) -> date:
         """
         Calcular fecha de vencimiento de un plazo.
         
+        Los días dentro de períodos de suspensión (nacionales o del
+        tribunal) no se cuentan, y si el tribunal está en una región con
+        feriados propios se usa la capa de esa región.
+        
         Args:
             fecha_inicio: Fecha de inicio del plazo
             dias: Número de días del plazo
             tipo: 'corrido' | 'habil' | 'judicial'
             suspendido: Si el plazo está suspendido
             dias_suspension: Días de suspensión
+            tribunal: Tribunal del caso, para sus suspensiones propias
             
         Returns:
             Fecha de vencimiento
         """
+        if tribunal is not None and self.base is None:
+            calendario = self.para_tribunal(tribunal)
+            if calendario is not self:
+                return calendario.calcular_vencimiento(
+                    fecha_inicio, dias, tipo, suspendido, dias_suspension, tribunal
+                )
+        
         if suspendido:
             dias += dias_suspension
         
-        if tipo == 'corrido':
+        if tipo not in ('corrido', 'habil', 'judicial'):
+            raise ValueError(f"Tipo de plazo desconocido: {tipo}")
+        
+        tribunal, suspensiones = self._suspensiones_para(tribunal)
+        if tipo == 'corrido' and suspensiones is None:
             # Días corridos: todos los días cuentan
             return fecha_inicio + timedelta(days=dias)
         
-        elif tipo == 'habil':
+        if self.cache is None:
+            return self._calcular_sin_cache(fecha_inicio, dias, tipo, suspensiones)
+        clave = (fecha_inicio, dias, tipo, tribunal, self.version_feriados)
+        vencimiento = self.cache.obtener(clave)
+        if vencimiento is None:
+            vencimiento = self._calcular_sin_cache(fecha_inicio, dias, tipo, suspensiones)
+            self.cache.guardar(clave, vencimiento)
+        return vencimiento
+    
+    def _calcular_base(self, fecha_inicio: date, dias: int, tipo: str) -> date:
+        """Vencimiento sin considerar suspensiones"""
+        if tipo == 'corrido':
+            return fecha_inicio + timedelta(days=dias)
+        if tipo == 'habil':
             # Días hábiles: solo días no festivos ni fines de semana
             return self._calcular_dias_habiles(fecha_inicio, dias)
+        # Días judiciales: como hábiles pero excluye más días
+        return self._calcular_dias_judiciales(fecha_inicio, dias)
+    
+    def _calcular_sin_cache(
+        self,
+        fecha_inicio: date,
+        dias: int,
+        tipo: str,
+        suspensiones: Optional[IndiceSuspensiones] = None
+    ) -> date:
+        """
+        Vencimiento saltando los días suspendidos.
         
-        elif tipo == 'judicial':
-            # Días judiciales: como hábiles pero excluye más días
-            return self._calcular_dias_judiciales(fecha_inicio, dias)
+        Se suman `dias` más los días del tipo perdidos en suspensiones
+        dentro de (inicio, vencimiento], hasta que ese conteo no cambia.
+        Cada vuelta incorpora al menos un período nuevo, así que son tantas
+        como períodos toca el plazo (normalmente ninguna o una).
+        """
+        vencimiento = self._calcular_base(fecha_inicio, dias, tipo)
+        if suspensiones is None:
+            return vencimiento
+        perdidos = 0
+        while True:
+            nuevos = sum(
+                self._contar_dias(desde, hasta, tipo)
+                for desde, hasta in suspensiones.superpuestos(fecha_inicio + timedelta(days=1), vencimiento)
+            )
+            if nuevos == perdidos:
+                return vencimiento
+            perdidos = nuevos
+            vencimiento = self._calcular_base(fecha_inicio, dias + perdidos, tipo)
+    
+    def _contar_dias(self, inicio: date, fin: date, tipo: str) -> int:
+        """Días del tipo de plazo en [inicio, fin]"""
+        if tipo == 'corrido':
+            return (fin - inicio).days + 1
+        if tipo == 'habil':
+            return self.dias_habiles_entre(inicio, fin)
+        if self._extender_indice(inicio, fin):
+            return self._indice(SEMANA_JUDICIAL).contar(inicio, fin)
+        return sum(
+            1 for i in range((fin - inicio).days + 1)
+            if (inicio + timedelta(days=i)).weekday() != 6
+            and not self.es_feriado(inicio + timedelta(days=i))
+        )
+    
+    def agregar_suspension(self, inicio: date, fin: date, tribunal: str = None):
+        """
+        Registrar un período [inicio, fin] en que no corren los plazos.
         
-        else:
-            raise ValueError(f"Tipo de plazo desconocido: {tipo}")
+        Args:
+            inicio: Primer día suspendido
+            fin: Último día suspendido
+            tribunal: Tribunal afectado (None = todos)
+        """
+        if self.base is not None and self.suspensiones is self.base.suspensiones:
+            self.suspensiones = dict(self.suspensiones)
+        # Índice nuevo en vez de modificar uno que puede compartir una capa
+        self.suspensiones[tribunal] = IndiceSuspensiones.unir(
+            self.suspensiones.get(tribunal, IndiceSuspensiones()),
+            IndiceSuspensiones([(inicio, fin)])
+        )
+        self._suspensiones_efectivas.clear()
+        self.version_feriados += 1
+        self._propagar_cambio()
+    
+    def esta_suspendido(self, fecha: date, tribunal: str = None) -> bool:
+        """La fecha cae en una suspensión nacional o del tribunal"""
+        _, suspensiones = self._suspensiones_para(tribunal)
+        return suspensiones is not None and suspensiones.contiene(fecha)
+    
+    def _suspensiones_para(self, tribunal: Optional[str]) -> Tuple[Optional[str], Optional[IndiceSuspensiones]]:
+        """
+        Suspensiones que aplican a un tribunal (nacionales + propias).
+        
+        Returns:
+            (tribunal con suspensiones propias o None, índice o None si no hay)
+        """
+        if tribunal not in self.suspensiones:
+            tribunal = None
+        if tribunal not in self._suspensiones_efectivas:
+            indices = [self.suspensiones[t] for t in {None, tribunal} if t in self.suspensiones]
+            unidas = IndiceSuspensiones.unir(*indices) if indices else None
+            self._suspensiones_efectivas[tribunal] = unidas if unidas is not None and len(unidas) else None
+        return tribunal, self._suspensiones_efectivas[tribunal]
+    
+    def estadisticas_cache(self) -> dict:
+        """Estadísticas de la caché de vencimientos y versión de feriados"""
+        estadisticas = self.cache.estadisticas() if self.cache is not None else {}
+        return {**estadisticas, 'version_feriados': self.version_feriados}
+    
+    def precalentar(self, desde: date = None, dias: int = DIAS_PRECALENTAR) -> int:
+        """
+        Precalcular los plazos de `PlazosEspeciales` para cada fecha de
+        inicio de los próximos `dias` días, en días hábiles y judiciales.
+        
+        Args:
+            desde: Primera fecha de inicio (por defecto, hoy)
+            dias: Cantidad de fechas de inicio
+            
+        Returns:
+            Cantidad de vencimientos calculados
+        """
+        if self.cache is None:
+            return 0
+        desde = desde or date.today()
+        duraciones = sorted(set(PlazosEspeciales.terminos().values()))
+        calculados = 0
+        for i in range(dias):
+            inicio = desde + timedelta(days=i)
+            for duracion in duraciones:
+                for tipo in ('habil', 'judicial'):
+                    self.calcular_vencimiento(inicio, duracion, tipo)
+                    calculados += 1
+        return calculados
+    
+    def calcular_vencimientos(
+        self,
+        plazos: Iterable[Tuple[date, int, str]]
+    ) -> List[date]:
+        """
+        Calcular vencimientos en lote.
+        
+        Los índices se reconstruyen una sola vez y cada plazo se resuelve
+        con una búsqueda binaria, sin recorrer el calendario por elemento.
+        
+        Con NumPy instalado, lotes de al menos `UMBRAL_NUMPY` plazos y sin
+        suspensiones registradas se delega en `calcular_vencimientos_np`.
+        
+        Args:
+            plazos: Iterable de (fecha_inicio, dias, tipo) o
+                (fecha_inicio, dias, tipo, tribunal)
+            
+        Returns:
+            Lista de fechas de vencimiento, en el mismo orden
+        """
+        plazos = list(plazos)
+        if (
+            np is not None
+            and len(plazos) >= UMBRAL_NUMPY
+            and not self.suspensiones
+            and all(len(plazo) < 4 or self.para_tribunal(plazo[3]) is self for plazo in plazos)
+        ):
+            fechas, dias, tipos = zip(*(plazo[:3] for plazo in plazos))
+            return self.calcular_vencimientos_np(fechas, dias, tipos).astype(object).tolist()
+        return [
+            self.calcular_vencimiento(fecha_inicio, dias, tipo, tribunal=resto[0] if resto else None)
+            for fecha_inicio, dias, tipo, *resto in plazos
+        ]
+    
+    def calcular_vencimientos_np(self, fechas_inicio, dias, tipos) -> 'np.ndarray':
+        """
+        Calcular vencimientos para arreglos completos con NumPy.
+        
+        Usa `numpy.busday_offset` con una máscara semanal por tipo de plazo
+        (lunes a viernes para 'habil', lunes a sábado para 'judicial') y el
+        arreglo de feriados del calendario. Entrega las mismas fechas que
+        `calcular_vencimiento`.
+        
+        Args:
+            fechas_inicio: Secuencia de fechas de inicio
+            dias: Secuencia de días de cada plazo
+            tipos: Secuencia de tipos ('corrido' | 'habil' | 'judicial')
+            
+        Returns:
+            Arreglo datetime64[D] con los vencimientos
+        """
+        if np is None:
+            raise RuntimeError("NumPy no está instalado")
+        
+        inicio = np.asarray(fechas_inicio, dtype='datetime64[D]')
+        dias = np.asarray(dias, dtype=np.int64)
+        tipos = np.asarray(tipos, dtype=str)
+        
+        desconocidos = ~np.isin(tipos, ('corrido', 'habil', 'judicial'))
+        if desconocidos.any():
+            raise ValueError(f"Tipo de plazo desconocido: {tipos[desconocidos][0]}")
+        
+        if inicio.size:
+            # Cargar los feriados generados de todo el horizonte del lote
+            primero = inicio.min().astype(object)
+            ultimo = (inicio.max() + 2 * max(int(dias.max()), 0) + 60).astype(object)
+            self._cargar_años(primero.year, min(ultimo.year, primero.year + MAX_AÑOS_INDICE))
+        
+        # Días corridos (y plazos sin días hábiles que sumar)
+        resultado = inicio + dias
+        positivos = dias > 0
+        
+        for tipo, laborales in (('habil', SEMANA_HABIL), ('judicial', SEMANA_JUDICIAL)):
+            seleccion = (tipos == tipo) & positivos
+            if seleccion.any():
+                # roll='backward' hace que un inicio inhábil no cuente como día
+                resultado[seleccion] = np.busday_offset(
+                    inicio[seleccion], dias[seleccion],
+                    roll='backward', busdaycal=self._calendario_np(laborales)
+                )
+            resultado[(tipos == tipo) & ~positivos] = inicio[(tipos == tipo) & ~positivos]
+        
+        return resultado
+    
+    def _calendario_np(self, dias_laborales: frozenset) -> 'np.busdaycalendar':
+        """Calendario NumPy para una semana laboral (cacheado hasta cambiar feriados)"""
+        calendario_np = self._calendarios_np.get(dias_laborales)
+        if calendario_np is None:
+            with self._lock:
+                mascara = [d in dias_laborales for d in range(7)]
+                feriados = np.array(sorted(self.feriados), dtype='datetime64[D]')
+                calendario_np = np.busdaycalendar(weekmask=mascara, holidays=feriados)
+                self._calendarios_np[dias_laborales] = calendario_np
+        return calendario_np
     
     def _calcular_dias_habiles(self, inicio: date, dias: int) -> date:
         """Calcular fecha sumando días hábiles"""
+        vencimiento = self._sumar_indexado(inicio, dias, SEMANA_HABIL)
+        if vencimiento is not None:
+            return vencimiento
+        
         actual = inicio
         dias_restantes = dias
         
@@ -196,6 +1016,10 @@ class CalendarioChileno:
         Calcular fecha sumando días judiciales.
         Incluye sábados en algunos casos según legislación.
         """
+        vencimiento = self._sumar_indexado(inicio, dias, SEMANA_JUDICIAL)
+        if vencimiento is not None:
+            return vencimiento
+        
         actual = inicio
         dias_restantes = dias
         
@@ -209,15 +1033,90 @@ class CalendarioChileno:
     
     def agregar_feriado(self, fecha: date, nombre: str, tipo: str = 'nacional'):
         """Agregar un feriado personalizado"""
-        self.feriados[fecha] = nombre
+        with self._lock:
+            self._cargar_año(fecha.year)
+            self.feriados[fecha] = nombre
+            self._invalidar_indices(fecha)
+            self.version_feriados += 1
+            self._propagar_cambio(fecha)
     
     def remover_feriado(self, fecha: date):
         """Remover un feriado"""
-        if fecha in self.feriados:
-            del self.feriados[fecha]
+        with self._lock:
+            self._cargar_año(fecha.year)
+            if fecha in self.feriados:
+                del self.feriados[fecha]
+                self._invalidar_indices(fecha)
+                self.version_feriados += 1
+                self._propagar_cambio(fecha)
+    
+    def _invalidar_indices(self, fecha: date):
+        """Marcar los índices para recalcular desde la fecha modificada"""
+        # Los prestados por la base se sueltan: la capa pudo dejar de ser igual
+        for dias_laborales in self._indices_base:
+            del self._indices[dias_laborales]
+        self._indices_base.clear()
+        for indice in self._indices.values():
+            indice.invalidar(fecha)
+        self._calendarios_np.clear()
+    
+    def _propagar_cambio(self, fecha: Optional[date] = None):
+        """Avisar a las capas derivadas que cambió un feriado o suspensión de la base"""
+        for capa in self._capas.values():
+            if fecha is not None:
+                capa._invalidar_indices(fecha)
+            capa._suspensiones_efectivas.clear()
+            capa.version_feriados += 1
+            capa._propagar_cambio(fecha)
+    
+    def derivar(self, feriados: dict = None, region: str = None) -> 'CalendarioChileno':
+        """
+        Calendario en capa sobre este: ve sus feriados y suspensiones sin
+        copiarlos y guarda aparte los propios.
+        
+        Args:
+            feriados: Feriados adicionales de la capa {fecha: nombre}
+            region: Región cuyos feriados (FERIADOS_REGIONALES) agrega la capa
+            
+        Returns:
+            CalendarioChileno con su propio índice de días hábiles (prestado
+            de este mientras la capa no tenga feriados propios)
+        """
+        capa = CalendarioChileno(
+            CapaFeriados(self.feriados),
+            self.incluir_regionales,
+            self.rango_indice,
+            self.generar_feriados,
+            self.cache.capacidad if self.cache is not None else 0
+        )
+        capa.base = self
+        capa.region = region
+        # Un solo lock por familia: la capa escribe en la base al cargar años
+        capa._lock = self._lock
+        capa.suspensiones = self.suspensiones
+        for fecha, nombre in (feriados or {}).items():
+            capa.feriados[fecha] = nombre
+        return capa
+    
+    def para_tribunal(self, tribunal: Optional[str]) -> 'CalendarioChileno':
+        """
+        Calendario que corresponde a un tribunal: la capa de su región si
+        tiene feriados regionales, o este mismo. Las capas se crean una vez
+        y quedan guardadas en la base.
+        """
+        if self.base is not None or not self.incluir_regionales:
+            return self
+        region = region_de_tribunal(tribunal)
+        if region is None:
+            return self
+        capa = self._capas.get(region)
+        if capa is None:
+            capa = self._capas.setdefault(region, self.derivar(region=region))
+        return capa
     
     def listar_feriados(self, año: int) -> List[Tuple[date, str]]:
         """Listar feriados de un año"""
+        self._cargar_año(año)
         return [
             (f, n) for f, n in self.feriados.items()
             if f.year == año
@@ -226,6 +1125,7 @@ class CalendarioChileno:
     def proximo_feriado(self, desde: date = None) -> Optional[Tuple[date, str]]:
         """Obtener el próximo feriado"""
         desde = desde or date.today()
+        self._cargar_años(desde.year, desde.year + 1)
         feriados_futuros = [
             (f, n) for f, n in self.feriados.items()
             if f >= desde
@@ -237,6 +1137,7 @@ class CalendarioChileno:
     def dias_hasta_feriado(self, nombre: str = None) -> Optional[int]:
         """Días hasta el próximo feriado o uno específico"""
         desde = date.today()
+        self._cargar_años(desde.year, desde.year + 1)
         if nombre:
             for f, n in self.feriados.items():
                 if n == nombre and f >= desde:
@@ -253,6 +1154,17 @@ class CalendarioChileno:
 class PlazosEspeciales:
     """Plazos especiales del derecho chileno"""
     
+    @classmethod
+    def terminos(cls) -> Dict[str, int]:
+        """Plazos con duración legal fija: {nombre: días}"""
+        terminos = {}
+        for nombre, valor in vars(cls).items():
+            if nombre.startswith('plazo_') and isinstance(valor, staticmethod):
+                dias = getattr(cls, nombre)()
+                if dias is not None:
+                    terminos[nombre] = dias
+        return terminos
+    
     @staticmethod
     def plazo_demanda_familia(dias: int = None) -> int:
         """Plazo para interponer demanda de familia (art. 55 LPF)"""
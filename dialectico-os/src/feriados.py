@@ -0,0 +1,185 @@
+# Dialéctico OS - Fuente de Feriados
+# ==================================
+
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import chain
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+import hashlib
+import os
+import threading
+import time
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from .models import db, Feriado, Suspension
+from .deadlines import CalendarioChileno, FERIADOS_LEGALES, feriados_del_año
+
+# ============ VERSIÓN DE LA TABLA ============
+
+# Segundos que el snapshot se usa sin volver a mirar la base de datos:
+# cota de lo que tarda un proceso en ver cambios hechos por otro (otros
+# workers de gunicorn, run.py --importar, sentencias Core o SQL directo)
+INTERVALO_VERIFICACION = float(os.environ.get('FERIADOS_VERIFICACION', '1'))
+
+# Commits de este proceso que tocaron Feriado o Suspension: obligan a
+# verificar en la siguiente lectura sin esperar el intervalo
+_commits_locales = 0
+
+_MODELOS = (Feriado, Suspension)
+_MARCA = 'feriados_modificados'
+
+@event.listens_for(Session, 'after_flush')
+def _marcar_flush(sesion, contexto):
+    if any(isinstance(o, _MODELOS) for o in chain(sesion.new, sesion.dirty, sesion.deleted)):
+        sesion.info[_MARCA] = True
+
+@event.listens_for(Session, 'do_orm_execute')
+def _marcar_masivo(estado):
+    mapper = estado.bind_mapper
+    if (estado.is_insert or estado.is_update or estado.is_delete) and mapper is not None \
+            and mapper.class_ in _MODELOS:
+        estado.session.info[_MARCA] = True
+
+@event.listens_for(Session, 'after_commit')
+def _marcar_commit(sesion):
+    global _commits_locales
+    if sesion.info.pop(_MARCA, False):
+        _commits_locales += 1
+
+@event.listens_for(Session, 'after_rollback')
+def _descartar_marca(sesion):
+    sesion.info.pop(_MARCA, None)
+
+def leer_tablas() -> Tuple[tuple, tuple]:
+    """Filas activas de Feriado (fecha, nombre) y Suspension (inicio, fin, tribunal)"""
+    feriados = db.session.execute(
+        select(Feriado.fecha, Feriado.nombre).where(Feriado.activo == True).order_by(Feriado.id)
+    ).tuples().all()
+    suspensiones = db.session.execute(
+        select(Suspension.fecha_inicio, Suspension.fecha_fin, Suspension.tribunal)
+        .where(Suspension.activo == True).order_by(Suspension.id)
+    ).tuples().all()
+    return tuple(feriados), tuple(suspensiones)
+
+def firmar(filas: tuple, suspensiones: tuple) -> int:
+    """
+    Firma estable del contenido: SHA-256 de su repr (hash() de str cambia
+    entre procesos con PYTHONHASHSEED)
+    """
+    digesto = hashlib.sha256(repr((filas, suspensiones)).encode('utf-8')).digest()
+    return int.from_bytes(digesto[:8], 'big')
+
+def version_tabla() -> int:
+    """
+    Versión del contenido vigente de Feriado y Suspension, leída de la base
+    de datos: la misma en todos los procesos, y solo cambia con datos ya
+    confirmados. Las tablas son pequeñas, así que se firma el contenido
+    completo (un conteo o max(id) no detectaría una fecha editada).
+    """
+    return firmar(*leer_tablas())
+
+# ============ SNAPSHOT ============
+
+@dataclass(frozen=True)
+class SnapshotFeriados:
+    """Feriados vigentes en un momento dado (inmutable)"""
+    version: int
+    feriados: Mapping[date, str] = field(default_factory=lambda: MappingProxyType({}))
+    # Listas por año ya calculadas: el snapshot no cambia, basta una vez
+    _por_año: dict = field(default_factory=dict, compare=False, repr=False)
+
+    def listar(self, año: int):
+        """Feriados de un año ordenados por fecha: los generados más los de la tabla"""
+        lista = self._por_año.get(año)
+        if lista is None:
+            feriados = feriados_del_año(año)
+            feriados.update((f, n) for f, n in self.feriados.items() if f.year == año)
+            lista = self._por_año[año] = sorted(feriados.items())
+        return list(lista)
+
+# ============ PROVEEDOR ============
+
+class ProveedorFeriados:
+    """
+    Une los feriados legales con las filas activas de `Feriado` en un
+    snapshot inmutable, junto a un `CalendarioChileno` ya indexado que
+    incluye las filas activas de `Suspension`.
+
+    La versión del snapshot se deriva de la base de datos (`version_tabla`)
+    y se verifica en la lectura: de inmediato tras un commit de este
+    proceso sobre esas tablas, y en todo caso cada `intervalo` segundos,
+    así los cambios de otros procesos se ven con ese retraso como máximo.
+    Entre verificaciones las lecturas no toman locks ni consultan la base
+    de datos; si el contenido no cambió se conserva el mismo snapshot.
+    """
+
+    def __init__(self, base: dict = None, intervalo: float = INTERVALO_VERIFICACION):
+        """
+        Args:
+            base: Feriados por defecto {fecha: nombre} (FERIADOS_LEGALES)
+            intervalo: Segundos entre verificaciones de la versión
+                (0 = verificar en cada lectura)
+        """
+        self.base = dict(FERIADOS_LEGALES if base is None else base)
+        self.intervalo = intervalo
+        self._snapshot: Optional[SnapshotFeriados] = None
+        self._calendario: Optional[CalendarioChileno] = None
+        self._verificado = 0.0
+        self._commits = -1
+        self._lock = threading.Lock()
+
+    def _vigente(self) -> bool:
+        return (
+            self._snapshot is not None
+            and self._commits == _commits_locales
+            and time.monotonic() - self._verificado < self.intervalo
+        )
+
+    def snapshot(self) -> SnapshotFeriados:
+        """Snapshot vigente, recargado si la tabla cambió"""
+        if self._vigente():
+            return self._snapshot
+        return self._recargar()
+
+    def calendario(self) -> CalendarioChileno:
+        """Calendario construido sobre el snapshot vigente"""
+        self.snapshot()
+        return self._calendario
+
+    def invalidar(self):
+        """Forzar la verificación en la próxima lectura"""
+        with self._lock:
+            self._verificado = 0.0
+
+    def _recargar(self) -> SnapshotFeriados:
+        """Verificar la versión y, si cambió, publicar un nuevo snapshot y calendario"""
+        with self._lock:
+            if self._vigente():
+                return self._snapshot  # Otro hilo ya verificó
+
+            commits = _commits_locales
+            # Versión y contenido salen de la misma lectura: nunca se guarda
+            # una versión nueva con datos viejos
+            filas, suspensiones = leer_tablas()
+            version = firmar(filas, suspensiones)
+
+            if self._snapshot is None or self._snapshot.version != version:
+                feriados = dict(self.base)
+                feriados.update(filas)
+
+                calendario = CalendarioChileno(dict(feriados))
+                for inicio, fin, tribunal in suspensiones:
+                    calendario.agregar_suspension(inicio, fin, tribunal)
+                # Se comparte entre hilos: años e índices listos antes de publicarlo
+                calendario.precargar()
+
+                # Publicar primero el calendario para que nunca quede detrás del snapshot
+                self._calendario = calendario
+                self._snapshot = SnapshotFeriados(version, MappingProxyType(feriados))
+
+            self._commits = commits
+            self._verificado = time.monotonic()
+            return self._snapshot
@@ -0,0 +1,416 @@
+# Dialéctico OS - Importación Masiva desde CSV/Excel
+# ==================================================
+
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from enum import Enum
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+import csv
+import io
+import logging
+import re
+import time
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from .models import (
+    db, Cliente, Caso, Plazo,
+    EstadoCliente, EstadoCaso, Prioridad, TipoPlazo
+)
+from .deadlines import CalendarioChileno
+
+try:
+    import openpyxl
+except ImportError:  # XLSX opcional
+    openpyxl = None
+
+logger = logging.getLogger(__name__)
+
+# Filas validadas e insertadas por transacción
+TAMAÑO_LOTE = 2000
+
+# Errores incluidos en el reporte (el total se informa aparte)
+MAX_ERRORES_REPORTE = 1000
+
+TIPOS_IMPORTACION = ('clientes', 'casos', 'plazos')
+
+# ============ RESULTADO ============
+
+@dataclass
+class ErrorFila:
+    """Error de validación de una fila (numerada desde 2: la 1 es el encabezado)"""
+    fila: int
+    mensaje: str
+
+    def to_dict(self):
+        return {'fila': self.fila, 'mensaje': self.mensaje}
+
+@dataclass
+class ResultadoImportacion:
+    """Resumen de una importación"""
+    tipo: str
+    leidas: int = 0
+    insertadas: int = 0
+    errores: List[ErrorFila] = field(default_factory=list)
+    segundos: float = 0.0
+
+    def to_dict(self):
+        return {
+            'tipo': self.tipo,
+            'leidas': self.leidas,
+            'insertadas': self.insertadas,
+            'total_errores': len(self.errores),
+            'errores': [e.to_dict() for e in self.errores[:MAX_ERRORES_REPORTE]],
+            'segundos': round(self.segundos, 3)
+        }
+
+class ErrorFilaInvalida(ValueError):
+    """Valor inválido en una fila"""
+
+# ============ LECTURA ============
+
+def _normalizar_encabezado(nombre) -> str:
+    return str(nombre or '').strip().lower().replace(' ', '_')
+
+def leer_csv(archivo) -> Iterator[dict]:
+    """
+    Filas de un CSV como dicts, leídas de a una.
+
+    Acepta archivos binarios o de texto, separados por coma o punto y coma
+    (Excel en español exporta con ';').
+    """
+    if not isinstance(archivo, io.TextIOBase):
+        archivo = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    muestra = archivo.read(4096)
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+    lector = csv.reader(_lineas(muestra, archivo), dialecto)
+    encabezado = [_normalizar_encabezado(c) for c in next(lector, [])]
+    for fila in lector:
+        yield dict(zip(encabezado, fila))
+
+def _lineas(muestra: str, resto) -> Iterator[str]:
+    """Líneas de la muestra ya leída seguidas del resto del archivo"""
+    # La muestra puede cortar una línea a la mitad: completarla con el resto
+    yield from io.StringIO(muestra + resto.readline())
+    yield from resto
+
+def leer_xlsx(archivo) -> Iterator[dict]:
+    """Filas de la primera hoja de un XLSX como dicts (modo solo lectura)"""
+    if openpyxl is None:
+        raise RuntimeError("Importar XLSX requiere openpyxl (pip install openpyxl)")
+    libro = openpyxl.load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezado = [_normalizar_encabezado(c) for c in next(filas, ())]
+        for fila in filas:
+            if any(valor not in (None, '') for valor in fila):
+                yield dict(zip(encabezado, fila))
+    finally:
+        libro.close()
+
+def leer_archivo(archivo, nombre: str) -> Iterator[dict]:
+    """Elegir el lector según la extensión del nombre de archivo"""
+    if nombre.lower().endswith('.xlsx'):
+        return leer_xlsx(archivo)
+    if nombre.lower().endswith(('.csv', '.txt')):
+        return leer_csv(archivo)
+    raise ValueError(f"Formato no soportado: {nombre} (usar .csv o .xlsx)")
+
+# ============ VALIDACIÓN ============
+
+def digito_verificador(cuerpo: int) -> str:
+    """Dígito verificador de un RUT (módulo 11)"""
+    suma, factor = 0, 2
+    while cuerpo:
+        cuerpo, digito = divmod(cuerpo, 10)
+        suma += digito * factor
+        factor = 2 if factor == 7 else factor + 1
+    resto = 11 - suma % 11
+    return {11: '0', 10: 'K'}.get(resto, str(resto))
+
+def normalizar_rut(rut) -> Optional[str]:
+    """
+    RUT en formato 12345678-9 si es válido, o None.
+
+    Acepta puntos, espacios y guion opcional ("12.345.678-5", "123456785").
+    """
+    limpio = re.sub(r'[.\s-]', '', str(rut or '')).upper()
+    if not re.fullmatch(r'\d{1,8}[\dK]', limpio):
+        return None
+    cuerpo, dv = int(limpio[:-1]), limpio[-1]
+    if cuerpo == 0 or digito_verificador(cuerpo) != dv:
+        return None
+    return f'{cuerpo}-{dv}'
+
+def variantes_rut(rut: str) -> Tuple[str, str]:
+    """Formas en que puede estar guardado un RUT normalizado (sin y con puntos)"""
+    cuerpo, dv = rut.split('-')
+    return rut, f'{int(cuerpo):,}'.replace(',', '.') + f'-{dv}'
+
+def _clientes_por_rut(ruts) -> dict:
+    """RUT normalizado -> id de cliente, con una consulta para todo el lote"""
+    variantes = {variante for rut in ruts for variante in variantes_rut(rut)}
+    if not variantes:
+        return {}
+    filas = db.session.execute(select(Cliente.rut, Cliente.id).where(Cliente.rut.in_(variantes)))
+    return {normalizar_rut(rut): cliente_id for rut, cliente_id in filas}
+
+def _texto(fila: dict, campo: str, requerido: bool = False, largo: int = None) -> Optional[str]:
+    valor = fila.get(campo)
+    valor = str(valor).strip() if valor is not None else ''
+    if not valor:
+        if requerido:
+            raise ErrorFilaInvalida(f"Falta {campo}")
+        return None
+    if largo and len(valor) > largo:
+        raise ErrorFilaInvalida(f"{campo} excede {largo} caracteres")
+    return valor
+
+def _fecha(fila: dict, campo: str, requerido: bool = False) -> Optional[date]:
+    valor = fila.get(campo)
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = _texto(fila, campo, requerido)
+    if texto is None:
+        return None
+    for formato in ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y'):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ErrorFilaInvalida(f"{campo} no es una fecha válida: {texto}")
+
+def _entero(fila: dict, campo: str) -> int:
+    texto = _texto(fila, campo, requerido=True)
+    try:
+        return int(float(texto))
+    except ValueError:
+        raise ErrorFilaInvalida(f"{campo} no es un número: {texto}")
+
+def _opcion(fila: dict, campo: str, enum, defecto: Enum) -> Enum:
+    texto = _texto(fila, campo)
+    if texto is None:
+        return defecto
+    try:
+        return enum(texto.lower())
+    except ValueError:
+        opciones = ', '.join(e.value for e in enum)
+        raise ErrorFilaInvalida(f"{campo} inválido: {texto} (opciones: {opciones})")
+
+# ============ IMPORTADORES ============
+
+def _lotes(filas: Iterable[dict], tamaño: int) -> Iterator[List[Tuple[int, dict]]]:
+    """Lotes de (número de fila, fila); la fila 1 es el encabezado"""
+    numeradas = enumerate(filas, start=2)
+    while True:
+        lote = list(islice(numeradas, tamaño))
+        if not lote:
+            return
+        yield lote
+
+def _validar_clientes(lote, resultado, vistos: set) -> List[Tuple[int, dict]]:
+    """Validar un lote de clientes; RUTs repetidos en el archivo o ya existentes son error"""
+    candidatos = []
+    for numero, fila in lote:
+        try:
+            rut = normalizar_rut(fila.get('rut'))
+            if rut is None:
+                raise ErrorFilaInvalida(f"RUT inválido: {fila.get('rut')}")
+            if rut in vistos:
+                raise ErrorFilaInvalida(f"RUT {rut} repetido en el archivo")
+            candidatos.append((numero, {
+                'nombre': _texto(fila, 'nombre', requerido=True, largo=200),
+                'rut': rut,
+                'email': _texto(fila, 'email', largo=200),
+                'telefono': _texto(fila, 'telefono', largo=20),
+                'direccion': _texto(fila, 'direccion', largo=500),
+                'notas': _texto(fila, 'notas'),
+                'estado': _opcion(fila, 'estado', EstadoCliente, EstadoCliente.ACTIVO),
+            }))
+            vistos.add(rut)
+        except ErrorFilaInvalida as e:
+            resultado.errores.append(ErrorFila(numero, str(e)))
+
+    existentes = _clientes_por_rut(datos['rut'] for _, datos in candidatos)
+    validas = []
+    for numero, datos in candidatos:
+        if datos['rut'] in existentes:
+            resultado.errores.append(ErrorFila(numero, f"Ya existe un cliente con RUT {datos['rut']}"))
+        else:
+            validas.append((numero, datos))
+    return validas
+
+def _validar_casos(lote, resultado) -> List[Tuple[int, dict]]:
+    """Validar un lote de casos; el cliente se busca por RUT"""
+    candidatos = []
+    for numero, fila in lote:
+        try:
+            rut = normalizar_rut(fila.get('rut_cliente'))
+            if rut is None:
+                raise ErrorFilaInvalida(f"RUT de cliente inválido: {fila.get('rut_cliente')}")
+            candidatos.append((numero, rut, {
+                'numero_expediente': _texto(fila, 'numero_expediente', largo=100),
+                'materia': _texto(fila, 'materia', requerido=True, largo=100),
+                'tipo_proceso': _texto(fila, 'tipo_proceso', largo=100),
+                'tribunal': _texto(fila, 'tribunal', largo=200),
+                'estado': _opcion(fila, 'estado', EstadoCaso, EstadoCaso.ACTIVO),
+                'prioridad': _opcion(fila, 'prioridad', Prioridad, Prioridad.MEDIA),
+                'fecha_inicio': _fecha(fila, 'fecha_inicio') or date.today(),
+                'observaciones': _texto(fila, 'observaciones'),
+            }))
+        except ErrorFilaInvalida as e:
+            resultado.errores.append(ErrorFila(numero, str(e)))
+
+    clientes = _clientes_por_rut(rut for _, rut, _ in candidatos)
+    validas = []
+    for numero, rut, datos in candidatos:
+        if rut not in clientes:
+            resultado.errores.append(ErrorFila(numero, f"No existe un cliente con RUT {rut}"))
+            continue
+        validas.append((numero, {**datos, 'cliente_id': clientes[rut]}))
+    return validas
+
+def _validar_plazos(lote, resultado, calendario: CalendarioChileno) -> List[Tuple[int, dict]]:
+    """Validar un lote de plazos y calcular todos sus vencimientos en una llamada"""
+    candidatos = []
+    for numero, fila in lote:
+        try:
+            dias = _entero(fila, 'dias')
+            if dias < 0:
+                raise ErrorFilaInvalida("dias no puede ser negativo")
+            candidatos.append((numero, _texto(fila, 'numero_expediente', requerido=True), {
+                'titulo': _texto(fila, 'titulo', requerido=True, largo=200),
+                'descripcion': _texto(fila, 'descripcion'),
+                'tipo': _opcion(fila, 'tipo', TipoPlazo, TipoPlazo.HABIL),
+                'dias': dias,
+                'fecha_inicio': _fecha(fila, 'fecha_inicio', requerido=True),
+            }))
+        except ErrorFilaInvalida as e:
+            resultado.errores.append(ErrorFila(numero, str(e)))
+
+    if not candidatos:
+        return []
+    # numero_expediente no es único: con más de un caso no se adivina cuál
+    casos = {}
+    for expediente, caso_id, tribunal in db.session.execute(
+        select(Caso.numero_expediente, Caso.id, Caso.tribunal)
+        .where(Caso.numero_expediente.in_({exp for _, exp, _ in candidatos}))
+    ):
+        casos.setdefault(expediente, []).append((caso_id, tribunal))
+    validas = []
+    for numero, expediente, datos in candidatos:
+        if expediente not in casos:
+            resultado.errores.append(ErrorFila(numero, f"No existe un caso con expediente {expediente}"))
+            continue
+        if len(casos[expediente]) > 1:
+            ids = ', '.join(str(caso_id) for caso_id, _ in casos[expediente])
+            resultado.errores.append(ErrorFila(numero, f"Expediente ambiguo {expediente}: casos {ids}"))
+            continue
+        caso_id, tribunal = casos[expediente][0]
+        validas.append((numero, {**datos, 'caso_id': caso_id, '_tribunal': tribunal}))
+
+    vencimientos = calendario.calcular_vencimientos(
+        (datos['fecha_inicio'], datos['dias'], datos['tipo'].value, datos['_tribunal'])
+        for _, datos in validas
+    )
+    for (_, datos), vencimiento in zip(validas, vencimientos):
+        del datos['_tribunal']
+        datos['fecha_vencimiento'] = vencimiento
+    return validas
+
+MODELOS = {'clientes': Cliente, 'casos': Caso, 'plazos': Plazo}
+
+def _insertar(modelo, validas: List[Tuple[int, dict]], resultado: ResultadoImportacion):
+    """
+    INSERT masivo de (número de fila, datos) en una transacción.
+
+    Si la base rechaza el lote (restricción UNIQUE, NOT NULL, largo), se
+    parte en mitades y se reintenta cada una: las filas buenas entran y
+    cada fila rechazada se reporta con su número. Con k filas malas son
+    unos k·log2(n) INSERT extra, no uno por fila.
+    """
+    try:
+        db.session.execute(insert(modelo), [datos for _, datos in validas])
+        db.session.commit()
+        resultado.insertadas += len(validas)
+        return
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        if len(validas) == 1:
+            numero = validas[0][0]
+            logger.warning("Fila %d de %s rechazada: %s", numero, resultado.tipo, e)
+            detalle = getattr(e, 'orig', None) or e
+            resultado.errores.append(ErrorFila(numero, f"Rechazada por la base: {e.__class__.__name__} ({detalle})"))
+            return
+    mitad = len(validas) // 2
+    _insertar(modelo, validas[:mitad], resultado)
+    _insertar(modelo, validas[mitad:], resultado)
+
+def importar(
+    tipo: str,
+    filas: Iterable[dict],
+    calendario: CalendarioChileno = None,
+    tamaño_lote: int = TAMAÑO_LOTE
+) -> ResultadoImportacion:
+    """
+    Importar clientes, casos o plazos desde filas ya leídas.
+
+    Cada lote se valida completo (RUT, fechas, opciones y referencias con
+    una consulta por lote) y las filas válidas entran con un INSERT masivo
+    en su propia transacción. Las filas inválidas se reportan y no detienen
+    la importación; si la base rechaza un lote, se aísla la fila culpable
+    (ver `_insertar`) y el resto entra igual.
+
+    Columnas:
+        clientes: nombre, rut, email, telefono, direccion, notas, estado
+        casos: rut_cliente, materia, numero_expediente, tipo_proceso,
+            tribunal, estado, prioridad, fecha_inicio, observaciones
+        plazos: numero_expediente, titulo, dias, fecha_inicio, tipo, descripcion
+
+    Args:
+        tipo: 'clientes' | 'casos' | 'plazos'
+        filas: Dicts con encabezados normalizados (ver leer_archivo)
+        calendario: Calendario para los vencimientos (requerido en plazos)
+        tamaño_lote: Filas por transacción
+
+    Returns:
+        ResultadoImportacion con filas leídas, insertadas y errores por fila
+    """
+    if tipo not in TIPOS_IMPORTACION:
+        raise ValueError(f"Tipo de importación desconocido: {tipo}")
+    inicio_reloj = time.perf_counter()
+    resultado = ResultadoImportacion(tipo)
+    modelo = MODELOS[tipo]
+    calendario = calendario or CalendarioChileno()
+    vistos = set()
+    ahora = datetime.now()
+
+    for lote in _lotes(filas, tamaño_lote):
+        resultado.leidas += len(lote)
+        if tipo == 'clientes':
+            validas = _validar_clientes(lote, resultado, vistos)
+        elif tipo == 'casos':
+            validas = _validar_casos(lote, resultado)
+        else:
+            validas = _validar_plazos(lote, resultado, calendario)
+        if not validas:
+            continue
+        for _, datos in validas:
+            datos.setdefault('creado', ahora)
+            datos.setdefault('actualizado', ahora)
+        _insertar(modelo, validas, resultado)
+
+    resultado.errores.sort(key=lambda error: error.fila)
+    resultado.segundos = time.perf_counter() - inicio_reloj
+    logger.info(
+        "Importación de %s: %d leídas, %d insertadas, %d errores en %.2fs",
+        tipo, resultado.leidas, resultado.insertadas, len(resultado.errores), resultado.segundos
+    )
+    return resultado
@@ -0,0 +1,116 @@
+# Dialéctico OS - Migraciones de Esquema
+# ======================================
+
+from datetime import date
+from typing import Callable, List, Tuple
+import logging
+
+from sqlalchemy import inspect, text
+
+from .models import db, Caso, Tarea, Plazo, Configuracion
+from .busqueda import instalar_busqueda
+
+logger = logging.getLogger(__name__)
+
+# Clave de Configuracion con la última migración aplicada
+CLAVE_VERSION = 'version_esquema'
+
+# Migraciones registradas: (versión, descripción, función(conexion))
+MIGRACIONES: List[Tuple[int, str, Callable]] = []
+
+# ============ REGISTRO ============
+
+def migracion(version: int, descripcion: str):
+    """Registrar una migración de esquema"""
+    def registrar(funcion):
+        MIGRACIONES.append((version, descripcion, funcion))
+        MIGRACIONES.sort(key=lambda m: m[0])
+        return funcion
+    return registrar
+
+def version_actual() -> int:
+    """Última migración aplicada en la base de datos"""
+    return int(Configuracion.get(CLAVE_VERSION, '0'))
+
+def migrar() -> List[int]:
+    """
+    Aplicar las migraciones pendientes, cada una en su propia transacción.
+
+    Las tablas nuevas las crea `db.create_all()`; las migraciones cubren
+    lo que `create_all` no toca en bases existentes (índices, triggers,
+    tablas virtuales).
+
+    Returns:
+        Versiones aplicadas
+    """
+    actual = version_actual()
+    aplicadas = []
+    for version, descripcion, funcion in MIGRACIONES:
+        if version <= actual:
+            continue
+        funcion(db.session.connection())
+        # Configuracion.set hace commit junto con la migración
+        Configuracion.set(CLAVE_VERSION, str(version), 'Versión del esquema de base de datos')
+        aplicadas.append(version)
+        logger.info("Migración %d aplicada: %s", version, descripcion)
+    return aplicadas
+
+def crear_indices(conexion, modelo, *nombres):
+    """Crear índices declarados en un modelo, si no existen"""
+    for indice in modelo.__table__.indexes:
+        if indice.name in nombres:
+            indice.create(conexion, checkfirst=True)
+
+# ============ MIGRACIONES ============
+
+@migracion(1, "Índices de dashboard y listas")
+def _indices_dashboard(conexion):
+    crear_indices(conexion, Caso, 'ix_caso_estado')
+    crear_indices(conexion, Tarea, 'ix_tarea_pendientes')
+    crear_indices(conexion, Plazo, 'ix_plazo_vigentes')
+
+@migracion(2, "Estado de alerta precalculado en plazos")
+def _alertas_plazo(conexion):
+    existentes = {c['name'] for c in inspect(conexion).get_columns('plazo')}
+    if 'estado_alerta' not in existentes:
+        conexion.execute(text('ALTER TABLE plazo ADD COLUMN estado_alerta VARCHAR(20)'))
+    if 'alerta_calculada' not in existentes:
+        conexion.execute(text('ALTER TABLE plazo ADD COLUMN alerta_calculada DATE'))
+    crear_indices(conexion, Plazo, 'ix_plazo_vencimiento')
+
+@migracion(3, "Índice de casos por tribunal")
+def _indice_tribunal(conexion):
+    # La tabla suspension la crea db.create_all()
+    crear_indices(conexion, Caso, 'ix_caso_tribunal')
+
+@migracion(4, "Búsqueda de texto completo (FTS5)")
+def _busqueda(conexion):
+    instalar_busqueda(conexion)
+
+@migracion(5, "Índices de feeds de calendario por caso y cliente")
+def _indices_calendario(conexion):
+    crear_indices(conexion, Caso, 'ix_caso_cliente', 'ix_caso_actualizado')
+    crear_indices(conexion, Plazo, 'ix_plazo_caso', 'ix_plazo_actualizado')
+
+@migracion(6, "Responsable y recordatorios de tareas")
+def _recordatorios_tarea(conexion):
+    existentes = {c['name'] for c in inspect(conexion).get_columns('tarea')}
+    if 'responsable' not in existentes:
+        conexion.execute(text('ALTER TABLE tarea ADD COLUMN responsable VARCHAR(100)'))
+    if 'recordado_para' not in existentes:
+        conexion.execute(text('ALTER TABLE tarea ADD COLUMN recordado_para DATE'))
+    crear_indices(conexion, Tarea, 'ix_tarea_recordatorio')
+
+@migracion(7, "Estado notificado de cada plazo")
+def _notificado_estado(conexion):
+    existentes = {c['name'] for c in inspect(conexion).get_columns('plazo')}
+    if 'notificado_estado' not in existentes:
+        conexion.execute(text('ALTER TABLE plazo ADD COLUMN notificado_estado VARCHAR(20)'))
+        # Los ya notificados no se repiten hasta que su estado escale
+        conexion.execute(text(
+            'UPDATE plazo SET notificado_estado = estado_alerta WHERE notificado = 1'
+        ))
+        # Los ya vencidos se dan por avisados: el primer escaneo no repasa el historial
+        conexion.execute(text(
+            "UPDATE plazo SET notificado_estado = 'vencido' WHERE fecha_vencimiento < :hoy"
+        ), {'hoy': date.today().isoformat()})
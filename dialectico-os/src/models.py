@@ -3,7 +3,9 @@
 
 from datetime import datetime, date
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 from enum import Enum
+import json
 
 db = SQLAlchemy()
 
@@ -83,6 +85,13 @@ class Caso(db.Model):
     tareas = db.relationship('Tarea', backref='caso', lazy=True)
     plazos = db.relationship('Plazo', backref='caso', lazy=True)
     
+    __table_args__ = (
+        db.Index('ix_caso_estado', 'estado'),
+        db.Index('ix_caso_tribunal', 'tribunal'),
+        db.Index('ix_caso_cliente', 'cliente_id'),
+        db.Index('ix_caso_actualizado', 'actualizado'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -106,9 +115,16 @@ class Tarea(db.Model):
     fecha_vencimiento = db.Column(db.Date)
     completado = db.Column(db.Boolean, default=False)
     fecha_completado = db.Column(db.Date)
+    responsable = db.Column(db.String(100))
+    recordado_para = db.Column(db.Date)  # Vencimiento ya recordado al responsable
     creado = db.Column(db.DateTime, default=datetime.now)
     actualizado = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
     
+    __table_args__ = (
+        db.Index('ix_tarea_pendientes', 'completado', 'prioridad', 'fecha_vencimiento'),
+        db.Index('ix_tarea_recordatorio', 'completado', 'fecha_vencimiento'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -116,9 +132,40 @@ class Tarea(db.Model):
             'titulo': self.titulo,
             'estado': self.estado,
             'prioridad': self.prioridad.value,
+            'responsable': self.responsable,
             'vencimiento': self.fecha_vencimiento.isoformat() if self.fecha_vencimiento else None
         }
 
+# ============ ESTADO DE PLAZOS ============
+
+# Días de anticipación de las alertas (Configuracion 'dias_alerta_plazo')
+CLAVE_DIAS_ALERTA = 'dias_alerta_plazo'
+DIAS_ALERTA_DEFECTO = 7
+DIAS_CRITICO = 3
+
+def dias_alerta() -> int:
+    """Días de anticipación de las alertas configurados"""
+    try:
+        return int(Configuracion.get(CLAVE_DIAS_ALERTA, DIAS_ALERTA_DEFECTO))
+    except ValueError:
+        return DIAS_ALERTA_DEFECTO
+
+def rangos_estado(dias_alerta: int):
+    """
+    (estado, máximo de días restantes) del más urgente al menos; más allá
+    del último, 'normal'. Lo usan `Plazo.estado_plazo` y el CASE del
+    escaneo de alertas, así ambos clasifican igual.
+    """
+    return [('vencido', -1), ('hoy', 0), ('critico', DIAS_CRITICO), ('alerta', dias_alerta)]
+
+def estado_vencimiento(fecha_vencimiento: date, hoy: date, dias_alerta: int) -> str:
+    """Estado de un plazo según los días que faltan para su vencimiento"""
+    dias = (fecha_vencimiento - hoy).days
+    for estado, maximo in rangos_estado(dias_alerta):
+        if dias <= maximo:
+            return estado
+    return 'normal'
+
 class Plazo(db.Model):
     """Plazo legal de un caso"""
     id = db.Column(db.Integer, primary_key=True)
@@ -133,29 +180,51 @@ class Plazo(db.Model):
     dias_suspension = db.Column(db.Integer, default=0)
     observaciones = db.Column(db.Text)
     notificado = db.Column(db.Boolean, default=False)
+    # Último estado notificado (alerta, critico, hoy, vencido): se vuelve a
+    # notificar cuando el estado escala o el vencimiento cambia
+    notificado_estado = db.Column(db.String(20))
+    # Estado precalculado por el escaneo diario de alertas (ver alertas.py)
+    estado_alerta = db.Column(db.String(20))
+    alerta_calculada = db.Column(db.Date)  # Día para el que vale estado_alerta
     creado = db.Column(db.DateTime, default=datetime.now)
     actualizado = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
     
+    __table_args__ = (
+        db.Index('ix_plazo_vigentes', 'suspendido', 'fecha_vencimiento'),
+        db.Index('ix_plazo_vencimiento', 'fecha_vencimiento'),
+        db.Index('ix_plazo_caso', 'caso_id', 'fecha_vencimiento'),
+        db.Index('ix_plazo_actualizado', 'actualizado'),
+    )
+    
     def dias_pendientes(self):
         """Días restantes para el vencimiento"""
         from datetime import timedelta
         return (self.fecha_vencimiento - date.today()).days
     
-    def estado_plazo(self):
-        """Estado del plazo"""
-        dias = self.dias_pendientes()
-        if dias < 0:
-            return 'vencido'
-        elif dias == 0:
-            return 'hoy'
-        elif dias <= 3:
-            return 'critico'
-        elif dias <= 7:
-            return 'alerta'
-        else:
-            return 'normal'
+    def estado_plazo(self, hoy=None, ventana=None):
+        """
+        Estado del plazo (vencido, hoy, critico, alerta, normal).
+        
+        Args:
+            hoy: Fecha de referencia (por defecto, hoy)
+            ventana: Días de alerta (por defecto, los configurados)
+        """
+        if ventana is None:
+            ventana = dias_alerta()
+        return estado_vencimiento(self.fecha_vencimiento, hoy or date.today(), ventana)
     
-    def to_dict(self):
+    def to_dict(self, hoy=None, ventana=None):
+        """
+        Args:
+            hoy: Fecha de referencia (las listas la calculan una vez y la pasan)
+            ventana: Días de alerta (ídem, para no leer la configuración por fila)
+        """
+        hoy = hoy or date.today()
+        # Usar el estado del escaneo diario si corresponde a hoy
+        if self.alerta_calculada == hoy and self.estado_alerta:
+            estado = self.estado_alerta
+        else:
+            estado = self.estado_plazo(hoy, ventana)
         return {
             'id': self.id,
             'titulo': self.titulo,
@@ -163,10 +232,18 @@ class Plazo(db.Model):
             'dias': self.dias,
             'inicio': self.fecha_inicio.isoformat(),
             'vencimiento': self.fecha_vencimiento.isoformat(),
-            'pendientes': self.dias_pendientes(),
-            'estado': self.estado_plazo()
+            'pendientes': (self.fecha_vencimiento - hoy).days,
+            'estado': estado
         }
 
+@event.listens_for(Plazo.fecha_vencimiento, 'set')
+def _invalidar_alerta(plazo, valor, anterior, iniciador):
+    """Un vencimiento nuevo deja obsoleto el estado precalculado y las notificaciones"""
+    if valor != anterior:
+        plazo.alerta_calculada = None
+        plazo.notificado = False
+        plazo.notificado_estado = None
+
 class Feriado(db.Model):
     """Feriados chilenos configurables"""
     id = db.Column(db.Integer, primary_key=True)
@@ -184,6 +261,55 @@ class Feriado(db.Model):
             'tipo': self.tipo
         }
 
+class Suspension(db.Model):
+    """Período en que no corren los plazos (feriado judicial, cierre de un tribunal)"""
+    id = db.Column(db.Integer, primary_key=True)
+    tribunal = db.Column(db.String(200))  # None = suspensión nacional
+    fecha_inicio = db.Column(db.Date, nullable=False)
+    fecha_fin = db.Column(db.Date, nullable=False)
+    motivo = db.Column(db.String(200), nullable=False)
+    activo = db.Column(db.Boolean, default=True)
+    creado = db.Column(db.DateTime, default=datetime.now)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tribunal': self.tribunal,
+            'inicio': self.fecha_inicio.isoformat(),
+            'fin': self.fecha_fin.isoformat(),
+            'motivo': self.motivo,
+            'activo': self.activo
+        }
+
+class Cambio(db.Model):
+    """
+    Registro de cambios de clientes, casos, tareas y plazos (solo se
+    agregan filas). `seq` es el cursor de los lectores: SQLite tiene un solo
+    escritor a la vez, así que el orden de seq es el orden de commit.
+    """
+    seq = db.Column(db.Integer, primary_key=True)
+    tabla = db.Column(db.String(30), nullable=False)
+    fila_id = db.Column(db.Integer)  # None = cambio masivo sin filas identificables
+    operacion = db.Column(db.String(10), nullable=False)  # insert, update, delete, masivo
+    datos = db.Column(db.Text)  # JSON: {'nuevo': {...}, 'anterior': {...}}
+    momento = db.Column(db.DateTime, default=datetime.now)
+    
+    __table_args__ = (
+        db.Index('ix_cambio_tabla', 'tabla', 'seq'),
+        # Sin reutilizar seq aunque se borren las últimas filas
+        {'sqlite_autoincrement': True},
+    )
+    
+    def to_dict(self):
+        return {
+            'seq': self.seq,
+            'tabla': self.tabla,
+            'id': self.fila_id,
+            'operacion': self.operacion,
+            **json.loads(self.datos or '{}'),
+            'momento': self.momento.isoformat()
+        }
+
 class Configuracion(db.Model):
     """Configuración del sistema"""
     id = db.Column(db.Integer, primary_key=True)
@@ -223,19 +349,60 @@ def contar_casos(estado=None):
         query = query.filter_by(estado=estado)
     return query.count()
 
-def plazos_criticos():
-    """Plazos que vencen en los próximos 7 días"""
+# Plazos críticos listados en el dashboard (el total sale de metricas_dashboard)
+LIMITE_PLAZOS_DASHBOARD = 20
+
+def _filtro_plazos_criticos():
+    """No suspendidos que vencen en los próximos 7 días (ix_plazo_vigentes)"""
     from datetime import timedelta
-    limite = date.today() + timedelta(days=7)
-    return Plazo.query.filter(
-        Plazo.fecha_vencimiento <= limite,
-        Plazo.fecha_vencimiento >= date.today(),
-        Plazo.suspendido == False
-    ).order_by(Plazo.fecha_vencimiento).all()
+    hoy = date.today()
+    return (
+        Plazo.suspendido == False,
+        Plazo.fecha_vencimiento >= hoy,
+        Plazo.fecha_vencimiento <= hoy + timedelta(days=7)
+    )
+
+def metricas_dashboard():
+    """
+    Métricas del dashboard en una sola consulta.
+    
+    Returns:
+        Dict con total_clientes, casos_activos, tareas_pendientes y
+        total_plazos_criticos
+    """
+    contar = db.func.count()
+    # Activos = total - archivados: ambas partes se resuelven con ix_caso_estado
+    casos_activos = (
+        db.select(contar).select_from(Caso).scalar_subquery()
+        - db.select(contar).select_from(Caso).where(
+            Caso.estado == EstadoCaso.ARCHIVADO
+        ).scalar_subquery()
+    )
+    fila = db.session.execute(db.select(
+        db.select(contar).select_from(Cliente).scalar_subquery().label('total_clientes'),
+        casos_activos.label('casos_activos'),
+        db.select(contar).select_from(Tarea).where(
+            Tarea.completado == False
+        ).scalar_subquery().label('tareas_pendientes'),
+        db.select(contar).select_from(Plazo).where(
+            *_filtro_plazos_criticos()
+        ).scalar_subquery().label('total_plazos_criticos')
+    )).one()
+    return dict(fila._mapping)
+
+def plazos_criticos(limite=LIMITE_PLAZOS_DASHBOARD):
+    """Primeros `limite` plazos que vencen en los próximos 7 días (None = todos)"""
+    return Plazo.query.options(
+        db.joinedload(Plazo.caso).joinedload(Caso.cliente)
+    ).filter(
+        *_filtro_plazos_criticos()
+    ).order_by(Plazo.fecha_vencimiento, Plazo.id).limit(limite).all()
 
 def tareas_pendientes():
     """Tareas pendientes ordenadas por prioridad"""
-    return Tarea.query.filter(
+    return Tarea.query.options(
+        db.joinedload(Tarea.caso).joinedload(Caso.cliente)
+    ).filter(
         Tarea.completado == False
     ).order_by(
         Tarea.prioridad,
@@ -0,0 +1,72 @@
+# Dialéctico OS - Configuración del Motor SQLite
+# ==============================================
+
+import os
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# ============ PARÁMETROS ============
+
+# Espera ante un lock de escritura antes de fallar con "database is locked"
+BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+
+# Pool de conexiones por proceso
+POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '5'))
+MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '10'))
+POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', '30'))
+
+# PRAGMAs aplicados a cada conexión nueva
+PRAGMAS = {
+    # WAL: los lectores no bloquean al escritor ni el escritor a los lectores
+    'journal_mode': 'WAL',
+    # Seguro con WAL: solo se pierde la última transacción ante un corte de luz
+    'synchronous': 'NORMAL',
+    'busy_timeout': BUSY_TIMEOUT_MS,
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    # Negativo = KiB (64 MB por conexión)
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', '-64000')),
+    'temp_store': 'MEMORY',
+}
+
+# ============ MOTOR ============
+
+def es_memoria(uri: str) -> bool:
+    """La URI apunta a una base SQLite en memoria"""
+    return uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri
+
+def opciones_motor(uri: str) -> dict:
+    """
+    Opciones para SQLALCHEMY_ENGINE_OPTIONS según la URI.
+
+    Las bases en archivo usan un pool dimensionado y el timeout de busy del
+    driver; las en memoria conservan el pool por defecto (una conexión).
+    """
+    if not uri.startswith('sqlite') or es_memoria(uri):
+        return {}
+    return {
+        'pool_size': POOL_SIZE,
+        'max_overflow': MAX_OVERFLOW,
+        'pool_timeout': POOL_TIMEOUT,
+        'pool_pre_ping': False,
+        'connect_args': {
+            'timeout': BUSY_TIMEOUT_MS / 1000,
+            'check_same_thread': False,
+        },
+    }
+
+def _aplicar_pragmas(dbapi_connection, connection_record):
+    """Aplicar PRAGMAS a cada conexión sqlite3 nueva"""
+    if type(dbapi_connection).__module__.split('.')[0] not in ('sqlite3', 'pysqlite2'):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for nombre, valor in PRAGMAS.items():
+            cursor.execute(f'PRAGMA {nombre}={valor}')
+    finally:
+        cursor.close()
+
+def instalar_pragmas():
+    """Registrar la aplicación de PRAGMAS en las conexiones nuevas (idempotente)"""
+    if not event.contains(Engine, 'connect', _aplicar_pragmas):
+        event.listen(Engine, 'connect', _aplicar_pragmas)
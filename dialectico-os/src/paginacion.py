@@ -0,0 +1,142 @@
+# Dialéctico OS - Paginación por Cursor y Respuestas JSON Lines
+# ==============================================================
+
+from datetime import date, datetime
+from enum import Enum
+from typing import List, Optional, Tuple
+import base64
+import binascii
+import json
+
+from flask import Response, abort, request, stream_with_context, url_for
+from sqlalchemy import literal, tuple_
+
+# Filas por página por defecto y máximo aceptado en ?limite=
+LIMITE_PAGINA = 100
+LIMITE_MAXIMO = 1000
+
+# Filas que se traen por vuelta al transmitir JSON Lines
+LOTE_STREAMING = 500
+
+# ============ CURSOR ============
+
+def _a_json(valor):
+    """Valor de una clave de orden a algo serializable"""
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    if isinstance(valor, Enum):
+        return valor.name
+    return valor
+
+def _desde_json(valor, tipo):
+    """Reconstruir el valor de una clave según el tipo de su columna"""
+    if valor is None:
+        return None
+    python_type = tipo.python_type
+    if issubclass(python_type, datetime):
+        return datetime.fromisoformat(valor)
+    if issubclass(python_type, date):
+        return date.fromisoformat(valor)
+    if issubclass(python_type, Enum):
+        return python_type[valor]
+    return python_type(valor)
+
+def codificar_cursor(valores) -> str:
+    """Cursor opaco a partir de los valores de las claves de la última fila"""
+    datos = json.dumps([_a_json(v) for v in valores], separators=(',', ':'))
+    return base64.urlsafe_b64encode(datos.encode()).decode().rstrip('=')
+
+def decodificar_cursor(cursor: str, claves) -> list:
+    """
+    Valores de las claves guardados en un cursor.
+
+    Raises:
+        ValueError: Si el cursor no corresponde a las claves
+    """
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if len(valores) != len(claves):
+            raise ValueError("Cursor con claves distintas")
+        return [_desde_json(v, clave.type) for v, clave in zip(valores, claves)]
+    except (TypeError, KeyError, json.JSONDecodeError, UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError(f"Cursor inválido: {e}")
+
+# ============ PAGINACIÓN ============
+
+def paginar(
+    consulta,
+    claves,
+    cursor: Optional[str] = None,
+    limite: int = LIMITE_PAGINA,
+    descendente: bool = False
+) -> Tuple[List, Optional[str]]:
+    """
+    Paginar una consulta por clave (keyset) en vez de OFFSET.
+
+    La consulta se ordena por `claves` (la última debe ser única, p.ej. el
+    id) y cada página continúa desde la tupla de claves de la anterior, así
+    el costo no crece con el número de página.
+
+    Args:
+        consulta: Query del modelo
+        claves: Columnas o expresiones de orden
+        cursor: Cursor devuelto por la página anterior
+        limite: Filas por página
+        descendente: Orden descendente
+
+    Returns:
+        (filas, cursor de la página siguiente o None)
+    """
+    if cursor:
+        valores = decodificar_cursor(cursor, claves)
+        desde = tuple_(*[literal(v, clave.type) for v, clave in zip(valores, claves)])
+        consulta = consulta.filter(
+            tuple_(*claves) < desde if descendente else tuple_(*claves) > desde
+        )
+
+    orden = [clave.desc() for clave in claves] if descendente else list(claves)
+    filas = consulta.add_columns(*claves).order_by(*orden).limit(limite + 1).all()
+
+    siguiente = None
+    if len(filas) > limite:
+        filas = filas[:limite]
+        siguiente = codificar_cursor(filas[-1][1:])
+    return [fila[0] for fila in filas], siguiente
+
+def parametros_pagina() -> Tuple[Optional[str], int]:
+    """Leer ?cursor= y ?limite= de la request"""
+    limite = request.args.get('limite', LIMITE_PAGINA, type=int)
+    return request.args.get('cursor'), max(1, min(limite, LIMITE_MAXIMO))
+
+def paginar_request(consulta, claves, descendente: bool = False) -> Tuple[List, Optional[str]]:
+    """Paginar con los parámetros de la request (400 si el cursor es inválido)"""
+    cursor, limite = parametros_pagina()
+    try:
+        return paginar(consulta, claves, cursor, limite, descendente)
+    except ValueError:
+        abort(400, description="Cursor inválido")
+
+def url_siguiente(cursor: Optional[str]) -> Optional[str]:
+    """URL de la página siguiente, conservando los filtros actuales"""
+    if cursor is None:
+        return None
+    return url_for(request.endpoint, **{**request.args.to_dict(), 'cursor': cursor})
+
+# ============ JSON LINES ============
+
+def pide_jsonl() -> bool:
+    """La request pidió ?formato=jsonl"""
+    return request.args.get('formato') == 'jsonl'
+
+def respuesta_jsonl(consulta, serializar=lambda obj: obj.to_dict()) -> Response:
+    """
+    Transmitir una consulta como JSON Lines, una fila por línea.
+
+    Las filas se leen de a `LOTE_STREAMING` con `yield_per`, de modo que la
+    memoria usada no depende del tamaño del resultado.
+    """
+    def generar():
+        for obj in consulta.yield_per(LOTE_STREAMING):
+            yield json.dumps(serializar(obj), ensure_ascii=False, default=str) + '\n'
+    return Response(stream_with_context(generar()), mimetype='application/x-ndjson')
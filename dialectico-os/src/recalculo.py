@@ -0,0 +1,149 @@
+# Dialéctico OS - Recálculo Masivo de Plazos
+# ==========================================
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional
+import logging
+import time
+
+from sqlalchemy import select, update
+
+from .models import db, Caso, Plazo, TipoPlazo
+from .deadlines import CalendarioChileno
+
+logger = logging.getLogger(__name__)
+
+# Filas leídas y actualizadas por transacción
+TAMAÑO_LOTE = 5000
+
+# ============ RESULTADO ============
+
+@dataclass
+class ResultadoRecalculo:
+    """Resumen de una pasada de recálculo"""
+    revisados: int = 0
+    actualizados: int = 0
+    segundos: float = 0.0
+
+    def to_dict(self):
+        return {
+            'revisados': self.revisados,
+            'actualizados': self.actualizados,
+            'segundos': round(self.segundos, 3)
+        }
+
+# ============ RECÁLCULO ============
+
+def recalcular_plazos(
+    calendario: CalendarioChileno,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    tamaño_lote: int = TAMAÑO_LOTE,
+    tribunal: Optional[str] = None,
+    incluir_corridos: bool = False
+) -> ResultadoRecalculo:
+    """
+    Recalcular `fecha_vencimiento` de los plazos afectados por un cambio
+    de feriados o suspensiones en [desde, hasta].
+
+    Solo se leen los plazos hábiles/judiciales cuya ventana
+    (fecha_inicio, fecha_vencimiento] toca el rango modificado. Las filas
+    se recorren por lotes ordenados por id, se recalculan en una pasada
+    sobre el calendario y se escriben con un UPDATE masivo por lote.
+
+    Args:
+        calendario: Calendario con los feriados ya actualizados
+        desde: Primera fecha modificada (None = sin límite)
+        hasta: Última fecha modificada (None = igual a `desde`)
+        tamaño_lote: Filas por transacción
+        tribunal: Solo los plazos de casos de este tribunal
+        incluir_corridos: Revisar también los plazos de días corridos
+            (las suspensiones los afectan; los feriados no)
+
+    Returns:
+        ResultadoRecalculo con filas revisadas, actualizadas y duración
+    """
+    inicio_reloj = time.perf_counter()
+    resultado = ResultadoRecalculo()
+    if desde is not None and hasta is None:
+        hasta = desde
+
+    consulta = select(
+        Plazo.id,
+        Plazo.fecha_inicio,
+        Plazo.dias,
+        Plazo.tipo,
+        Plazo.suspendido,
+        Plazo.dias_suspension,
+        Plazo.fecha_vencimiento,
+        Caso.tribunal
+    ).join(Caso, Plazo.caso_id == Caso.id)
+    if not incluir_corridos:
+        consulta = consulta.where(Plazo.tipo != TipoPlazo.CORRIDO)
+    if tribunal is not None:
+        consulta = consulta.where(Caso.tribunal == tribunal)
+    if desde is not None:
+        consulta = consulta.where(
+            Plazo.fecha_inicio < hasta,
+            Plazo.fecha_vencimiento >= desde
+        )
+
+    ultimo_id = 0
+    while True:
+        filas = db.session.execute(
+            consulta.where(Plazo.id > ultimo_id).order_by(Plazo.id).limit(tamaño_lote)
+        ).all()
+        if not filas:
+            break
+        ultimo_id = filas[-1].id
+        resultado.revisados += len(filas)
+
+        vencimientos = calendario.calcular_vencimientos(
+            (
+                fila.fecha_inicio,
+                fila.dias + ((fila.dias_suspension or 0) if fila.suspendido else 0),
+                fila.tipo.value,
+                fila.tribunal
+            )
+            for fila in filas
+        )
+
+        ahora = datetime.now()
+        cambios = [
+            # Con el vencimiento cambia el estado: se recalcula y se vuelve a notificar
+            {'id': fila.id, 'fecha_vencimiento': nuevo, 'actualizado': ahora, 'alerta_calculada': None,
+             'notificado': False, 'notificado_estado': None}
+            for fila, nuevo in zip(filas, vencimientos)
+            if nuevo != fila.fecha_vencimiento
+        ]
+        if cambios:
+            db.session.execute(update(Plazo), cambios)
+            resultado.actualizados += len(cambios)
+        db.session.commit()
+
+    resultado.segundos = time.perf_counter() - inicio_reloj
+    logger.info(
+        "Recálculo de plazos: %d revisados, %d actualizados en %.2fs",
+        resultado.revisados, resultado.actualizados, resultado.segundos
+    )
+    return resultado
+
+
+def recalcular_por_feriado(calendario: CalendarioChileno, fecha: date) -> ResultadoRecalculo:
+    """Recalcular los plazos afectados por agregar o remover un feriado"""
+    return recalcular_plazos(calendario, fecha, fecha)
+
+
+def recalcular_por_suspension(
+    calendario: CalendarioChileno,
+    inicio: date,
+    fin: date,
+    tribunal: Optional[str] = None
+) -> ResultadoRecalculo:
+    """
+    Recalcular los plazos afectados por agregar o quitar una suspensión:
+    los que corren durante [inicio, fin], de cualquier tipo, y solo los del
+    tribunal si la suspensión no es nacional.
+    """
+    return recalcular_plazos(calendario, inicio, fin, tribunal=tribunal, incluir_corridos=True)
@@ -0,0 +1,380 @@
+# Dialéctico OS - Recordatorios de Tareas
+# =======================================
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+from sqlalchemy import bindparam, or_, select, update
+
+from .models import db, Caso, Tarea, Configuracion
+from .alertas import notificador_polab
+from .cambios import SIN_REGISTRO
+
+logger = logging.getLogger(__name__)
+
+# Claves de Configuracion
+CLAVE_DIAS_RECORDATORIO = 'dias_recordatorio_tarea'
+
+DIAS_RECORDATORIO_DEFECTO = 2
+
+# Resúmenes para tareas sin responsable
+SIN_RESPONSABLE = 'Sin asignar'
+
+# Envíos simultáneos y reintentos por resumen
+WORKERS = 4
+REINTENTOS = 4
+ESPERA_BASE = 0.5  # segundos; se duplica en cada reintento
+
+# Minutos entre revisiones del programador
+INTERVALO_MINUTOS = int(os.environ.get('INTERVALO_RECORDATORIOS', 15))
+
+# Cola de mensajes salientes de whatsapp_notifier (POLAB)
+RUTA_WHATSAPP = Path(os.environ.get(
+    'POLAB_WHATSAPP_PENDIENTES',
+    '~/.openclaw/workspace/proyectos-paulo/polab/pending_messages.json'
+)).expanduser()
+
+# ============ RESUMEN ============
+
+@dataclass
+class Resumen:
+    """Tareas próximas a vencer de un responsable"""
+    responsable: str
+    tareas: list  # filas con id, titulo, fecha_vencimiento, prioridad, materia
+
+    @property
+    def clave(self) -> str:
+        """
+        Identificador estable del envío: mismo responsable, mismas tareas y
+        vencimientos. Los destinos lo usan para no duplicar tras un reinicio.
+        """
+        firma = '|'.join(f'{t.id}:{t.fecha_vencimiento}' for t in self.tareas)
+        return hashlib.sha1(f'{self.responsable}|{firma}'.encode('utf-8')).hexdigest()[:16]
+
+    @property
+    def titulo(self) -> str:
+        return f"Tareas por vencer · {self.responsable} ({len(self.tareas)})"
+
+    def mensaje(self) -> str:
+        """Una línea por tarea: vencimiento, título y caso"""
+        return '\n'.join(
+            f"{t.fecha_vencimiento.strftime('%d/%m/%Y')} · {t.titulo} · {t.materia}"
+            for t in self.tareas
+        )
+
+@dataclass
+class ResultadoRecordatorios:
+    """Resumen de una revisión de recordatorios"""
+    fecha: Optional[date] = None
+    tareas: int = 0
+    enviados: int = 0
+    fallidos: List[str] = field(default_factory=list)
+    intentos: int = 0
+    segundos: float = 0.0
+
+    def to_dict(self):
+        return {
+            'fecha': self.fecha.isoformat() if self.fecha else None,
+            'tareas': self.tareas,
+            'enviados': self.enviados,
+            'fallidos': self.fallidos,
+            'intentos': self.intentos,
+            'segundos': round(self.segundos, 3)
+        }
+
+# ============ DESTINOS ============
+
+class Destino(ABC):
+    """
+    Destino de los resúmenes: las subclases implementan la corrutina
+    `enviar`, o heredan de DestinoBloqueante. Un error cuenta como intento
+    fallido y se reintenta.
+    """
+
+    nombre = 'destino'
+
+    @abstractmethod
+    async def enviar(self, resumen: Resumen):
+        """Entregar un resumen"""
+
+class DestinoBloqueante(Destino):
+    """Destino con `entregar` bloqueante, que corre en un hilo"""
+
+    @abstractmethod
+    def entregar(self, resumen: Resumen):
+        """Entregar un resumen (bloqueante)"""
+
+    async def enviar(self, resumen: Resumen):
+        await asyncio.to_thread(self.entregar, resumen)
+
+class DestinoNotificaciones(DestinoBloqueante):
+    """Almacén JSON de notificaciones de POLAB"""
+
+    nombre = 'notificaciones'
+
+    def __init__(self, workspace: Optional[str] = None):
+        self.notificar = notificador_polab(workspace)
+
+    def entregar(self, resumen: Resumen):
+        self.notificar(resumen.titulo, resumen.mensaje(), 'tarea', 'normal')
+
+class DestinoWhatsApp(DestinoBloqueante):
+    """
+    Cola de mensajes pendientes que despacha whatsapp_notifier de POLAB.
+
+    El archivo es una lista JSON compartida: se reescribe completo bajo un
+    lock y se omiten los resúmenes cuya clave ya está encolada.
+    """
+
+    nombre = 'whatsapp'
+    _lock = threading.Lock()
+
+    def __init__(self, telefono: str, telefonos: Optional[Dict[str, str]] = None,
+                 ruta: Path = RUTA_WHATSAPP):
+        self.telefono = telefono
+        self.telefonos = telefonos or {}
+        self.ruta = Path(ruta)
+
+    def entregar(self, resumen: Resumen):
+        with self._lock:
+            mensajes = json.loads(self.ruta.read_text()) if self.ruta.exists() else []
+            if any(m.get('clave') == resumen.clave for m in mensajes):
+                return
+            mensajes.append({
+                'to': self.telefonos.get(resumen.responsable, self.telefono),
+                'message': f"{resumen.titulo}\n{resumen.mensaje()}",
+                'timestamp': datetime.now().isoformat(),
+                'clave': resumen.clave
+            })
+            self.ruta.parent.mkdir(parents=True, exist_ok=True)
+            temporal = self.ruta.with_suffix('.tmp')
+            temporal.write_text(json.dumps(mensajes, ensure_ascii=False))
+            os.replace(temporal, self.ruta)
+
+class DestinoCorreo(DestinoBloqueante):
+    """
+    Correo de prueba: escribe cada resumen como .eml en un directorio, sin
+    SMTP. El nombre del archivo es la clave del resumen.
+    """
+
+    nombre = 'correo'
+
+    def __init__(self, directorio: str, remitente: str = 'dialectico-os@localhost',
+                 correos: Optional[Dict[str, str]] = None):
+        self.directorio = Path(directorio).expanduser()
+        self.remitente = remitente
+        self.correos = correos or {}
+
+    def entregar(self, resumen: Resumen):
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        ruta = self.directorio / f'{resumen.clave}.eml'
+        if ruta.exists():
+            return
+        correo = EmailMessage()
+        correo['From'] = self.remitente
+        correo['To'] = self.correos.get(resumen.responsable, self.remitente)
+        correo['Subject'] = resumen.titulo
+        correo.set_content(resumen.mensaje())
+        ruta.write_bytes(bytes(correo))
+
+DESTINOS = ('notificaciones', 'whatsapp', 'correo')
+
+def crear_destino(nombre: str) -> Destino:
+    """
+    Destino por nombre, configurado por entorno: WHATSAPP_RECORDATORIOS
+    (teléfono) para whatsapp y DIRECTORIO_CORREOS para correo.
+    """
+    if nombre == 'notificaciones':
+        return DestinoNotificaciones()
+    if nombre == 'whatsapp':
+        telefono = os.environ.get('WHATSAPP_RECORDATORIOS')
+        if not telefono:
+            raise ValueError("Definir WHATSAPP_RECORDATORIOS con el teléfono de destino")
+        return DestinoWhatsApp(telefono)
+    if nombre == 'correo':
+        return DestinoCorreo(os.environ.get('DIRECTORIO_CORREOS', '~/.dialectico/correos'))
+    raise ValueError(f"Destino desconocido: {nombre} (usar {', '.join(DESTINOS)})")
+
+# ============ DESPACHO ============
+
+async def _enviar_con_reintentos(destino: Destino, resumen: Resumen, reintentos: int,
+                                 espera_base: float) -> Tuple[bool, int]:
+    """(entregado, intentos): espera exponencial con jitter entre intentos"""
+    for intento in range(1, reintentos + 1):
+        try:
+            await destino.enviar(resumen)
+            return True, intento
+        except Exception as e:
+            logger.warning(
+                "Recordatorio para %s falló en %s (intento %d/%d): %s",
+                resumen.responsable, destino.nombre, intento, reintentos, e
+            )
+            if intento < reintentos:
+                await asyncio.sleep(espera_base * 2 ** (intento - 1) * (1 + random.random() / 4))
+    return False, reintentos
+
+async def despachar(
+    resumenes: Sequence[Resumen],
+    destino: Destino,
+    workers: int = WORKERS,
+    reintentos: int = REINTENTOS,
+    espera_base: float = ESPERA_BASE
+) -> List[Tuple[Resumen, bool, int]]:
+    """
+    Enviar los resúmenes con un pool de `workers` tareas asyncio.
+
+    Returns:
+        (resumen, entregado, intentos) por resumen, en el orden recibido
+    """
+    cola: asyncio.Queue = asyncio.Queue()
+    for posicion, resumen in enumerate(resumenes):
+        cola.put_nowait((posicion, resumen))
+    resultados: List[Optional[Tuple[Resumen, bool, int]]] = [None] * len(resumenes)
+
+    async def trabajar():
+        while not cola.empty():
+            posicion, resumen = cola.get_nowait()
+            entregado, intentos = await _enviar_con_reintentos(destino, resumen, reintentos, espera_base)
+            resultados[posicion] = (resumen, entregado, intentos)
+
+    await asyncio.gather(*(trabajar() for _ in range(max(1, min(workers, len(resumenes))))))
+    return resultados
+
+# ============ REVISIÓN ============
+
+def dias_recordatorio() -> int:
+    """Días de anticipación (Configuracion 'dias_recordatorio_tarea')"""
+    try:
+        return int(Configuracion.get(CLAVE_DIAS_RECORDATORIO, DIAS_RECORDATORIO_DEFECTO))
+    except ValueError:
+        return DIAS_RECORDATORIO_DEFECTO
+
+def resumenes_pendientes(hoy: Optional[date] = None) -> List[Resumen]:
+    """
+    Tareas abiertas que vencen entre hoy y la ventana de aviso y aún no se
+    recordaron para su vencimiento actual, agrupadas por responsable.
+
+    Una sola consulta sobre ix_tarea_recordatorio (completado, vencimiento).
+    """
+    hoy = hoy or date.today()
+    filas = db.session.execute(
+        select(
+            Tarea.id,
+            Tarea.titulo,
+            Tarea.fecha_vencimiento,
+            Tarea.prioridad,
+            Tarea.responsable,
+            Caso.materia
+        ).join(Caso, Tarea.caso_id == Caso.id)
+        .where(
+            Tarea.completado == False,
+            Tarea.fecha_vencimiento.between(hoy, hoy + timedelta(days=dias_recordatorio())),
+            or_(Tarea.recordado_para.is_(None), Tarea.recordado_para != Tarea.fecha_vencimiento)
+        )
+        .order_by(Tarea.responsable, Tarea.fecha_vencimiento, Tarea.id)
+    ).all()
+
+    grupos: Dict[str, list] = {}
+    for fila in filas:
+        grupos.setdefault(fila.responsable or SIN_RESPONSABLE, []).append(fila)
+    return [Resumen(responsable, tareas) for responsable, tareas in grupos.items()]
+
+def enviar_recordatorios(
+    destino: Destino,
+    hoy: Optional[date] = None,
+    workers: int = WORKERS,
+    reintentos: int = REINTENTOS,
+    espera_base: float = ESPERA_BASE
+) -> ResultadoRecordatorios:
+    """
+    Revisar las tareas por vencer y enviar un resumen por responsable.
+
+    Los resúmenes salen en paralelo (`despachar`); cada tarea de un resumen
+    entregado queda con `recordado_para` = su vencimiento, así una nueva
+    revisión, aunque sea después de reiniciar, no la repite. Si la tarea
+    cambia de vencimiento vuelve a recordarse. Los resúmenes que agotan los
+    reintentos quedan para la revisión siguiente.
+
+    Returns:
+        ResultadoRecordatorios con tareas, resúmenes enviados y fallidos
+    """
+    inicio_reloj = time.perf_counter()
+    hoy = hoy or date.today()
+    resultado = ResultadoRecordatorios(fecha=hoy)
+
+    resumenes = resumenes_pendientes(hoy)
+    resultado.tareas = sum(len(r.tareas) for r in resumenes)
+    if resumenes:
+        # La sesión no cruza al event loop: solo viajan filas ya leídas
+        db.session.commit()
+        envios = asyncio.run(despachar(resumenes, destino, workers, reintentos, espera_base))
+        marcar = []
+        for resumen, entregado, intentos in envios:
+            resultado.intentos += intentos
+            if not entregado:
+                resultado.fallidos.append(resumen.responsable)
+                continue
+            resultado.enviados += 1
+            marcar.extend(
+                {'tarea_id': tarea.id, 'vencimiento': tarea.fecha_vencimiento}
+                for tarea in resumen.tareas
+            )
+        if marcar:
+            # Condición sobre el vencimiento leído: si cambió entretanto, queda
+            # pendiente. Por la sesión (executemany 'core_only'), no por la conexión,
+            # para que pase por los eventos ORM; recordado_para es estado
+            # derivado y no va al registro de cambios.
+            db.session.execute(
+                update(Tarea)
+                .where(Tarea.id == bindparam('tarea_id'), Tarea.fecha_vencimiento == bindparam('vencimiento'))
+                .values(recordado_para=bindparam('vencimiento'), actualizado=Tarea.actualizado),
+                marcar,
+                execution_options={'dml_strategy': 'core_only', 'synchronize_session': False, SIN_REGISTRO: False}
+            )
+        db.session.commit()
+
+    resultado.segundos = time.perf_counter() - inicio_reloj
+    logger.info(
+        "Recordatorios %s: %d tareas, %d resúmenes enviados, %d fallidos en %.2fs",
+        hoy, resultado.tareas, resultado.enviados, len(resultado.fallidos), resultado.segundos
+    )
+    return resultado
+
+# ============ PROGRAMADOR ============
+
+class ProgramadorRecordatorios(threading.Thread):
+    """Hilo que ejecuta `enviar_recordatorios` cada `intervalo` minutos"""
+
+    def __init__(self, app, destino: Destino, intervalo: int = INTERVALO_MINUTOS):
+        super().__init__(name='programador-recordatorios', daemon=True)
+        self.app = app
+        self.destino = destino
+        self.intervalo = intervalo
+        self._detener = threading.Event()
+
+    def _revisar(self):
+        with self.app.app_context():
+            try:
+                enviar_recordatorios(self.destino)
+            except Exception:
+                logger.exception("Falló la revisión de recordatorios")
+
+    def run(self):
+        self._revisar()
+        while not self._detener.wait(self.intervalo * 60):
+            self._revisar()
+
+    def detener(self):
+        self._detener.set()
@@ -0,0 +1,275 @@
+# Dialéctico OS - Tests de Alertas de Plazos
+# ==========================================
+
+import json
+import pytest
+from datetime import date, datetime, time, timedelta
+from src.app import app, db
+from src.models import Cliente, Caso, Plazo, Configuracion, EstadoCaso, CLAVE_DIAS_ALERTA
+from src.alertas import escanear_alertas, notificador_polab, segundos_hasta, CLAVE_ULTIMO_ESCANEO
+
+HOY = date(2025, 6, 2)
+
+# ============ FIXTURES ============
+
+@pytest.fixture
+def client():
+    """Cliente de test para Flask"""
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+        # Soltar la transacción que un test haya dejado abierta antes de borrar
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture
+def sample_caso(client):
+    """Caso de prueba"""
+    cliente = Cliente(nombre="Alertas", rut="55555555-5")
+    db.session.add(cliente)
+    db.session.commit()
+    caso = Caso(cliente_id=cliente.id, materia="Laboral")
+    db.session.add(caso)
+    db.session.commit()
+    return caso
+
+@pytest.fixture
+def enviados():
+    """Notificador que guarda los envíos"""
+    lista = []
+    def notificar(titulo, mensaje, tipo, prioridad):
+        lista.append((titulo, mensaje, tipo, prioridad))
+    notificar.lista = lista
+    return notificar
+
+def crear_plazo(caso, dias_restantes, hoy=HOY, **campos):
+    """Plazo que vence `dias_restantes` días después de `hoy`"""
+    plazo = Plazo(
+        caso_id=caso.id,
+        titulo=f"Vence en {dias_restantes}",
+        dias=10,
+        fecha_inicio=hoy - timedelta(days=10),
+        fecha_vencimiento=hoy + timedelta(days=dias_restantes),
+        **campos
+    )
+    db.session.add(plazo)
+    db.session.commit()
+    return plazo
+
+def estados():
+    """Estado precalculado por título"""
+    return {p.titulo: p.estado_alerta for p in Plazo.query.all()}
+
+# ============ TESTS ============
+
+class TestEscaneo:
+
+    def test_asigna_estados(self, sample_caso):
+        """Cada plazo queda con el mismo estado que calcula estado_plazo"""
+        for dias in (-2, 0, 2, 5, 20):
+            crear_plazo(sample_caso, dias)
+
+        resultado = escanear_alertas(hoy=HOY)
+
+        assert resultado.recalculados == 5
+        assert estados() == {
+            'Vence en -2': 'vencido',
+            'Vence en 0': 'hoy',
+            'Vence en 2': 'critico',
+            'Vence en 5': 'alerta',
+            'Vence en 20': 'normal',
+        }
+        assert all(p.alerta_calculada == HOY for p in Plazo.query.all())
+
+    def test_notifica_una_vez_por_estado(self, sample_caso, enviados):
+        """Un envío por estado y cada plazo se notifica una sola vez"""
+        crear_plazo(sample_caso, 0)
+        crear_plazo(sample_caso, 1)
+        crear_plazo(sample_caso, 2)
+        crear_plazo(sample_caso, 30)
+
+        resultado = escanear_alertas(hoy=HOY, notificar=enviados)
+
+        assert resultado.notificados == 3
+        assert resultado.por_estado == {'hoy': 1, 'critico': 2}
+        assert [e[0] for e in enviados.lista] == ['Plazos que vencen hoy (1)', 'Plazos críticos (2)']
+        assert Plazo.query.filter_by(notificado=True).count() == 3
+
+        enviados.lista.clear()
+        assert escanear_alertas(hoy=HOY, notificar=enviados).notificados == 0
+        assert enviados.lista == []
+
+    def test_escalar_vuelve_a_notificar(self, sample_caso, enviados):
+        """Un plazo notificado en alerta se notifica de nuevo al pasar a critico, hoy y vencido"""
+        plazo = crear_plazo(sample_caso, 5)
+        escanear_alertas(hoy=HOY, notificar=enviados)
+
+        for dias, estado in ((2, 'critico'), (5, 'hoy'), (6, 'vencido')):
+            enviados.lista.clear()
+            resultado = escanear_alertas(hoy=HOY + timedelta(days=dias), notificar=enviados)
+            assert resultado.por_estado == {estado: 1}
+            # Mismo estado al día siguiente: no se repite
+            if estado != 'hoy':
+                assert escanear_alertas(hoy=HOY + timedelta(days=dias), notificar=enviados).notificados == 0
+        db.session.refresh(plazo)
+        assert plazo.notificado_estado == 'vencido'
+
+    def test_nuevo_vencimiento_vuelve_a_notificar(self, sample_caso, enviados):
+        """Recalcular el vencimiento borra la marca y el plazo se notifica otra vez"""
+        plazo = crear_plazo(sample_caso, 2)
+        escanear_alertas(hoy=HOY, notificar=enviados)
+        assert plazo.notificado_estado == 'critico'
+
+        plazo.fecha_vencimiento = HOY + timedelta(days=3)
+        db.session.commit()
+        assert plazo.notificado_estado is None
+
+        enviados.lista.clear()
+        assert escanear_alertas(hoy=HOY, notificar=enviados).por_estado == {'critico': 1}
+
+    def test_vencidos_historicos_no_se_notifican(self, sample_caso, enviados):
+        """En el primer escaneo solo se avisa lo vencido ayer; después, lo vencido desde el último"""
+        crear_plazo(sample_caso, -400)
+        crear_plazo(sample_caso, -1)
+
+        assert escanear_alertas(hoy=HOY, notificar=enviados).por_estado == {'vencido': 1}
+        assert 'Vence en -1' in enviados.lista[0][1]
+
+        crear_plazo(sample_caso, 1)
+        crear_plazo(sample_caso, -30)
+        enviados.lista.clear()
+        # Tres días sin escanear: el plazo que vencía mañana se avisa, el de hace un mes no
+        assert escanear_alertas(hoy=HOY + timedelta(days=3), notificar=enviados).por_estado == {'vencido': 1}
+        assert 'Vence en 1 ' in enviados.lista[0][1]
+
+    def test_casos_cerrados_no_se_notifican(self, sample_caso, enviados):
+        """Los plazos de casos terminados o archivados no generan alerta"""
+        crear_plazo(sample_caso, 1)
+        sample_caso.estado = EstadoCaso.ARCHIVADO
+        db.session.commit()
+
+        assert escanear_alertas(hoy=HOY, notificar=enviados).notificados == 0
+
+        sample_caso.estado = EstadoCaso.EN_CURSO
+        db.session.commit()
+        assert escanear_alertas(hoy=HOY, notificar=enviados).por_estado == {'critico': 1}
+
+    def test_suspendidos_no_se_notifican(self, sample_caso, enviados):
+        """Los plazos suspendidos tienen estado pero no generan alerta"""
+        crear_plazo(sample_caso, 1, suspendido=True)
+
+        resultado = escanear_alertas(hoy=HOY, notificar=enviados)
+
+        assert resultado.notificados == 0
+        assert estados() == {'Vence en 1': 'critico'}
+
+    def test_dias_alerta_configurable(self, sample_caso, enviados):
+        """La ventana de alerta sale de Configuracion"""
+        Configuracion.set(CLAVE_DIAS_ALERTA, '15')
+        crear_plazo(sample_caso, 12)
+
+        resultado = escanear_alertas(hoy=HOY, notificar=enviados)
+
+        assert resultado.por_estado == {'alerta': 1}
+
+    def test_escaneo_siguiente_solo_revisa_ventana(self, sample_caso):
+        """Al día siguiente solo se recalculan los plazos que pueden cambiar"""
+        for dias in (-30, 0, 5, 8, 60):
+            crear_plazo(sample_caso, dias)
+        escanear_alertas(hoy=HOY)
+
+        manana = HOY + timedelta(days=1)
+        resultado = escanear_alertas(hoy=manana)
+
+        # Entre el último escaneo y manana + 7: vencen en 0, 5 y 8
+        assert resultado.recalculados == 3
+        assert estados()['Vence en 0'] == 'vencido'
+        assert estados()['Vence en 8'] == 'alerta'
+        assert estados()['Vence en -30'] == 'vencido'
+        assert Configuracion.get(CLAVE_ULTIMO_ESCANEO) == manana.isoformat()
+
+    def test_cambio_de_vencimiento_invalida_estado(self, sample_caso):
+        """Editar el vencimiento obliga a recalcular el estado"""
+        plazo = crear_plazo(sample_caso, 60)
+        escanear_alertas(hoy=HOY)
+
+        plazo.fecha_vencimiento = HOY + timedelta(days=1)
+        db.session.commit()
+        assert plazo.alerta_calculada is None
+
+        escanear_alertas(hoy=HOY)
+        assert estados() == {'Vence en 60': 'critico'}
+
+    def test_no_modifica_actualizado(self, sample_caso, enviados):
+        """El estado derivado no cuenta como modificación del plazo"""
+        plazo = crear_plazo(sample_caso, 1)
+        antes = plazo.actualizado
+
+        escanear_alertas(hoy=HOY, notificar=enviados)
+        db.session.refresh(plazo)
+
+        assert plazo.actualizado == antes
+
+    def test_falla_de_envio_no_marca(self, sample_caso):
+        """Si el envío falla, los plazos quedan para el próximo escaneo"""
+        crear_plazo(sample_caso, 1)
+
+        def fallar(*args):
+            raise OSError("sin disco")
+
+        with pytest.raises(OSError):
+            escanear_alertas(hoy=HOY, notificar=fallar)
+        assert Plazo.query.filter_by(notificado=True).count() == 0
+
+
+class TestEstadoPrecalculado:
+
+    def test_to_dict_usa_estado_del_dia(self, sample_caso):
+        """to_dict lee el estado precalculado si corresponde a hoy"""
+        plazo = crear_plazo(sample_caso, 5, hoy=date.today())
+        plazo.estado_alerta = 'critico'
+        plazo.alerta_calculada = date.today()
+
+        assert plazo.to_dict()['estado'] == 'critico'
+
+    def test_to_dict_ignora_estado_viejo(self, sample_caso):
+        """Un estado de otro día se recalcula"""
+        plazo = crear_plazo(sample_caso, 5, hoy=date.today())
+        plazo.estado_alerta = 'critico'
+        plazo.alerta_calculada = date.today() - timedelta(days=1)
+
+        assert plazo.to_dict()['estado'] == 'alerta'
+
+    def test_misma_ventana_que_el_escaneo(self, sample_caso):
+        """Sin estado precalculado, to_dict clasifica con los días de alerta configurados"""
+        Configuracion.set(CLAVE_DIAS_ALERTA, '15')
+        plazo = crear_plazo(sample_caso, 12, hoy=date.today())
+        assert plazo.to_dict()['estado'] == 'alerta'
+        assert plazo.to_dict(ventana=7)['estado'] == 'normal'
+
+        escanear_alertas()
+        db.session.refresh(plazo)
+        assert plazo.estado_alerta == plazo.estado_plazo() == 'alerta'
+
+
+class TestNotificador:
+
+    def test_encola_en_polab(self, tmp_path):
+        """El notificador escribe en el sistema de notificaciones de POLAB"""
+        notificar = notificador_polab(str(tmp_path))
+        notificar("Plazos críticos (1)", "detalle", 'plazo', 'high')
+        notificar("Plazos vencidos (1)", "detalle", 'plazo', 'high')
+
+        archivos = list(tmp_path.glob('projects/polab/data/notifications/*.json'))
+        assert len(archivos) == 2
+        datos = json.loads(archivos[0].read_text())
+        assert datos['type'] == 'plazo'
+
+    def test_segundos_hasta(self):
+        """La próxima ejecución es hoy o mañana a la hora indicada"""
+        ahora = datetime(2025, 6, 2, 5, 0)
+        assert segundos_hasta(time(6, 0), ahora) == 3600
+        assert segundos_hasta(time(4, 0), ahora) == 23 * 3600
@@ -2,8 +2,9 @@
 # ===========================================
 
 import pytest
-from datetime import date
+from datetime import date, timedelta
 from src.app import app, db
+from src.contador_sql import CABECERA_CONSULTAS
 from src.models import Cliente, Caso, Tarea, Plazo, EstadoCliente, EstadoCaso, Prioridad, TipoPlazo
 
 # ============ FIXTURE ============
@@ -62,8 +63,8 @@ class TestRutasClientes:
         assert b'Test Cliente' in response.data
     
     def test_nuevo_cliente_get(self, client):
-        """Test formulario nuevo = client.get('/cliente/nuevo cliente"""
-        response')
+        """Test formulario nuevo cliente"""
+        response = client.get('/cliente/nuevo')
         assert response.status_code == 200
         assert b'Nuevo Cliente' in response.data
     
@@ -182,6 +183,143 @@ class TestRutasAPI:
         response = client.get('/api/calendario/feriados?año=2025')
         assert response.status_code == 200
 
+class TestSuspensiones:
+    
+    def test_crear_suspension_recalcula(self, client, test_data):
+        """Registrar una suspensión posterga los plazos del tribunal"""
+        plazo = Plazo(
+            caso_id=Caso.query.filter_by(tribunal='Juzgado Test').one().id,
+            titulo='Contestación',
+            tipo=TipoPlazo.HABIL,
+            dias=5,
+            fecha_inicio=date(2025, 3, 3),
+            fecha_vencimiento=date(2025, 3, 10)
+        )
+        db.session.add(plazo)
+        db.session.commit()
+        
+        response = client.post('/api/suspensiones', json={
+            'inicio': '2025-03-05', 'fin': '2025-03-07',
+            'tribunal': 'Juzgado Test', 'motivo': 'Cierre por obras'
+        })
+        assert response.status_code == 201
+        assert response.get_json()['recalculo']['actualizados'] == 1
+        db.session.expire_all()
+        assert db.session.get(Plazo, plazo.id).fecha_vencimiento == date(2025, 3, 13)
+        
+        listado = client.get('/api/suspensiones').get_json()
+        assert listado[0]['tribunal'] == 'Juzgado Test'
+    
+    def test_suspension_invalida(self, client):
+        """Fechas faltantes o invertidas responden 400"""
+        assert client.post('/api/suspensiones', json={'inicio': '2025-03-05'}).status_code == 400
+        assert client.post('/api/suspensiones', json={
+            'inicio': '2025-03-07', 'fin': '2025-03-05', 'motivo': 'x'
+        }).status_code == 400
+
+class TestFeriadosApi:
+    
+    def test_agregar_y_quitar_feriado_recalcula(self, client, test_data):
+        """Agregar un feriado posterga los plazos que lo cruzan; quitarlo los devuelve"""
+        plazo = Plazo(
+            caso_id=Caso.query.filter_by(tribunal='Juzgado Test').one().id,
+            titulo='Contestación',
+            tipo=TipoPlazo.HABIL,
+            dias=5,
+            fecha_inicio=date(2025, 3, 3),
+            fecha_vencimiento=date(2025, 3, 10)
+        )
+        db.session.add(plazo)
+        db.session.commit()
+        
+        response = client.post('/api/calendario/feriados', json={'fecha': '2025-03-05', 'nombre': 'Feriado local'})
+        assert response.status_code == 201
+        assert response.get_json()['recalculo']['actualizados'] == 1
+        db.session.expire_all()
+        assert db.session.get(Plazo, plazo.id).fecha_vencimiento == date(2025, 3, 11)
+        assert 'Feriado local' in [n for _, n in client.get('/api/calendario/feriados?año=2025').get_json()]
+        
+        feriado_id = response.get_json()['feriado']['id']
+        response = client.delete(f'/api/calendario/feriados/{feriado_id}')
+        assert response.status_code == 200
+        assert response.get_json()['recalculo']['actualizados'] == 1
+        db.session.expire_all()
+        assert db.session.get(Plazo, plazo.id).fecha_vencimiento == date(2025, 3, 10)
+    
+    def test_feriado_invalido(self, client):
+        """Datos faltantes responden 400; un id inexistente, 404"""
+        assert client.post('/api/calendario/feriados', json={'fecha': '2025-03-05'}).status_code == 400
+        assert client.delete('/api/calendario/feriados/999').status_code == 404
+
+class TestProduccion:
+    
+    def test_cache_compartida_por_defecto(self, monkeypatch):
+        """--produccion arranca gunicorn con la caché SQLite salvo que se pida otra"""
+        import run
+        llamadas = []
+        monkeypatch.setattr(run.os, 'execvpe', lambda ejecutable, args, entorno: llamadas.append(entorno))
+        monkeypatch.delenv('CACHE_RESPUESTAS', raising=False)
+        run.servir_produccion(8080, 2)
+        monkeypatch.setenv('CACHE_RESPUESTAS', 'memoria')
+        run.servir_produccion(8080, 2)
+        assert [entorno['CACHE_RESPUESTAS'] for entorno in llamadas] == ['sqlite', 'memoria']
+
+class TestConsultasN1:
+    """El número de consultas por página no depende del número de filas"""
+    
+    @pytest.fixture(autouse=True)
+    def contar_consultas(self, client):
+        app.config['CONTAR_CONSULTAS'] = True
+        yield
+        app.config.pop('CONTAR_CONSULTAS')
+    
+    @staticmethod
+    def crear_casos(n, rut_base):
+        """Crear n casos, cada uno con su cliente, un plazo y una tarea"""
+        casos = []
+        for i in range(n):
+            cliente = Cliente(nombre=f"Cliente {rut_base}-{i}", rut=f"{rut_base}{i}-0")
+            caso = Caso(cliente=cliente, materia="Civil")
+            db.session.add(Plazo(
+                caso=caso, titulo=f"Plazo {i}", tipo=TipoPlazo.HABIL, dias=5,
+                fecha_inicio=date.today(), fecha_vencimiento=date.today() + timedelta(days=2)
+            ))
+            db.session.add(Tarea(caso=caso, titulo=f"Tarea {i}"))
+            casos.append(caso)
+        db.session.commit()
+        return casos
+    
+    @staticmethod
+    def consultas(client, url):
+        response = client.get(url)
+        assert response.status_code == 200
+        return int(response.headers[CABECERA_CONSULTAS])
+    
+    def test_dashboard(self, client):
+        self.crear_casos(1, 1)
+        pocas = self.consultas(client, '/')
+        self.crear_casos(10, 2)
+        assert self.consultas(client, '/') == pocas
+    
+    def test_tareas(self, client):
+        self.crear_casos(1, 1)
+        pocas = self.consultas(client, '/tareas')
+        self.crear_casos(10, 2)
+        assert self.consultas(client, '/tareas') == pocas
+    
+    def test_detalle_caso(self, client):
+        caso = self.crear_casos(1, 1)[0]
+        pocas = self.consultas(client, f'/caso/{caso.id}')
+        for i in range(10):
+            db.session.add(Tarea(caso_id=caso.id, titulo=f"Extra {i}"))
+        db.session.commit()
+        assert self.consultas(client, f'/caso/{caso.id}') == pocas
+    
+    def test_sin_contador_no_hay_cabecera(self, client):
+        app.config['CONTAR_CONSULTAS'] = False
+        response = client.get('/')
+        assert CABECERA_CONSULTAS not in response.headers
+
 # ============ TESTS FILTROS ============
 
 class TestFiltrosTemplate:
@@ -0,0 +1,126 @@
+# Dialéctico OS - Tests de Búsqueda de Texto Completo
+# ===================================================
+
+import pytest
+from datetime import date
+from src.app import app, db
+from src.models import Cliente, Caso, Tarea, Plazo
+from src.busqueda import buscar, consulta_fts, instalar_busqueda, resaltar
+
+# ============ FIXTURES ============
+
+@pytest.fixture
+def client():
+    """Cliente de test para Flask, con las tablas FTS5 instaladas"""
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+
+    with app.app_context():
+        db.create_all()
+        instalar_busqueda(db.session.connection())
+        db.session.commit()
+        yield app.test_client()
+        db.drop_all()
+
+@pytest.fixture
+def datos(client):
+    """Un cliente con un caso, una tarea y un plazo"""
+    cliente = Cliente(nombre="María Pérez Soto", rut="12345678-5", notas="Derivada por <b>colega</b>")
+    db.session.add(cliente)
+    db.session.commit()
+    caso = Caso(
+        cliente_id=cliente.id, materia="Familia", numero_expediente="C-1234-2025",
+        tribunal="2° Juzgado de Familia de Santiago",
+        observaciones="Contraparte: Pedro Gómez. Demanda de alimentos."
+    )
+    db.session.add(caso)
+    db.session.commit()
+    db.session.add(Tarea(caso_id=caso.id, titulo="Redactar demanda", descripcion="Pedir liquidación"))
+    db.session.add(Plazo(
+        caso_id=caso.id, titulo="Contestación", dias=10,
+        fecha_inicio=date(2025, 3, 3), fecha_vencimiento=date(2025, 3, 17)
+    ))
+    db.session.commit()
+    return {'cliente_id': cliente.id, 'caso_id': caso.id}
+
+# ============ TESTS ============
+
+class TestConsulta:
+
+    def test_palabras_como_prefijo(self):
+        """Cada palabra se busca entre comillas y como prefijo"""
+        assert consulta_fts("juan pér") == '"juan"* "pér"*'
+
+    def test_sintaxis_fts_neutralizada(self):
+        """Operadores y comillas del usuario no rompen la consulta"""
+        assert consulta_fts('"OR" NEAR(') == '"OR"* "NEAR"*'
+        assert consulta_fts('  -- ') is None
+
+    def test_resaltar_escapa_html(self):
+        """El texto se escapa y solo las marcas se convierten en <mark>"""
+        assert str(resaltar("<b>\x02Pérez\x03</b>")) == '&lt;b&gt;<mark>Pérez</mark>&lt;/b&gt;'
+
+
+class TestBusqueda:
+
+    def test_encuentra_por_contraparte(self, datos):
+        """El texto de observaciones encuentra el caso"""
+        resultados = buscar("gomez")
+        assert [(r['tipo'], r['id']) for r in resultados] == [('caso', datos['caso_id'])]
+        assert '<mark>Gómez</mark>' in str(resultados[0]['fragmento'])
+
+    def test_prefijo_y_acentos(self, datos):
+        """'per' encuentra a Pérez sin escribir el acento completo"""
+        resultados = buscar("maria per", tipos=['cliente'])
+        assert resultados[0]['id'] == datos['cliente_id']
+        assert str(resultados[0]['titulo']) == '<mark>María</mark> <mark>Pérez</mark> Soto'
+
+    def test_expediente(self, datos):
+        """El número de expediente se encuentra por sus partes"""
+        assert buscar("C-1234")[0]['id'] == datos['caso_id']
+
+    def test_tareas_y_plazos_enlazan_al_caso(self, datos):
+        """Las tareas y plazos traen el caso al que pertenecen"""
+        resultados = buscar("demanda")
+        tipos = {r['tipo']: r for r in resultados}
+        assert tipos['tarea']['caso_id'] == datos['caso_id']
+        # El título pesa más que las observaciones
+        assert resultados[0]['tipo'] == 'tarea'
+
+    def test_triggers_sincronizan(self, datos):
+        """Editar y borrar filas actualiza el índice"""
+        cliente = db.session.get(Cliente, datos['cliente_id'])
+        cliente.nombre = "María Fuentes"
+        db.session.commit()
+        assert buscar("perez", tipos=['cliente']) == []
+        assert buscar("fuentes", tipos=['cliente'])[0]['id'] == cliente.id
+
+        tarea = Tarea.query.first()
+        db.session.delete(tarea)
+        db.session.commit()
+        assert buscar("redactar") == []
+
+    def test_sin_texto(self, datos):
+        """Una búsqueda vacía no consulta nada"""
+        assert buscar("") == []
+
+
+class TestRutas:
+
+    def test_api(self, client, datos):
+        """La API devuelve resultados resaltados con su URL"""
+        response = client.get('/api/buscar?q=gomez')
+        assert response.status_code == 200
+        resultado = response.get_json()[0]
+        assert resultado['url'] == f"/caso/{datos['caso_id']}"
+        assert '<mark>' in resultado['fragmento']
+
+    def test_pagina(self, client, datos):
+        """La página de búsqueda lista los resultados"""
+        response = client.get('/buscar?q=pedro&tipo=')
+        assert response.status_code == 200
+        assert '<mark>Pedro</mark>' in response.get_data(as_text=True)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
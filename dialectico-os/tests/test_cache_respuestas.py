@@ -0,0 +1,164 @@
+# Dialéctico OS - Tests de Caché de Respuestas
+# ============================================
+
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import update
+from src.app import app, db
+from src.models import Cliente, Caso, Plazo, Feriado
+from src.cache_respuestas import cache, AlmacenMemoria, AlmacenSQLite, crear_almacen
+
+# ============ FIXTURES ============
+
+@pytest.fixture(params=['memoria', 'sqlite'])
+def client(request, tmp_path):
+    """Cliente de test para Flask, con cada almacén"""
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    anterior = cache.almacen
+    cache.almacen = AlmacenMemoria() if request.param == 'memoria' else AlmacenSQLite(str(tmp_path / 'cache.db'))
+
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+        db.drop_all()
+    cache.almacen = anterior
+
+@pytest.fixture
+def sample_caso(client):
+    cliente = Cliente(nombre="Caché", rut="77777777-7")
+    db.session.add(cliente)
+    db.session.commit()
+    caso = Caso(cliente_id=cliente.id, materia="Civil")
+    db.session.add(caso)
+    db.session.commit()
+    return caso
+
+def agregar_plazo(caso, titulo):
+    hoy = date.today()
+    db.session.add(Plazo(caso_id=caso.id, titulo=titulo, dias=3,
+                         fecha_inicio=hoy, fecha_vencimiento=hoy + timedelta(days=3)))
+    db.session.commit()
+
+# ============ TESTS ============
+
+class TestDecorador:
+
+    def test_hit_y_miss(self, client, sample_caso):
+        agregar_plazo(sample_caso, 'Uno')
+
+        primera = client.get('/api/plazos')
+        segunda = client.get('/api/plazos')
+
+        assert primera.headers['X-Cache'] == 'MISS'
+        assert segunda.headers['X-Cache'] == 'HIT'
+        assert segunda.get_json() == primera.get_json()
+        assert segunda.mimetype == 'application/json'
+        metricas = client.get('/api/cache').get_json()
+        assert metricas['aciertos'] == 1
+        assert metricas['fallos'] == 1
+
+    def test_parametros_en_la_clave(self, client):
+        client.get('/api/calendario/feriados?año=2025')
+        assert client.get('/api/calendario/feriados?año=2026').headers['X-Cache'] == 'MISS'
+        assert client.get('/api/calendario/feriados?año=2025').headers['X-Cache'] == 'HIT'
+
+    def test_streaming_no_se_guarda(self, client, sample_caso):
+        agregar_plazo(sample_caso, 'Uno')
+        client.get('/api/plazos?formato=jsonl')
+        assert client.get('/api/plazos?formato=jsonl').headers['X-Cache'] == 'MISS'
+
+    def test_cabeceras_guardadas(self, client, sample_caso):
+        """La paginación viaja en cabeceras: también se guardan"""
+        for i in range(3):
+            agregar_plazo(sample_caso, f'P{i}')
+        primera = client.get('/api/plazos?limite=2')
+        segunda = client.get('/api/plazos?limite=2')
+        assert segunda.headers['X-Cache'] == 'HIT'
+        assert segunda.headers['X-Siguiente-Cursor'] == primera.headers['X-Siguiente-Cursor']
+
+
+class TestInvalidacion:
+
+    def test_commit_invalida(self, client, sample_caso):
+        agregar_plazo(sample_caso, 'Uno')
+        client.get('/api/plazos')
+
+        agregar_plazo(sample_caso, 'Dos')
+
+        respuesta = client.get('/api/plazos')
+        assert respuesta.headers['X-Cache'] == 'MISS'
+        assert [p['titulo'] for p in respuesta.get_json()] == ['Uno', 'Dos']
+
+    def test_update_masivo_invalida(self, client, sample_caso):
+        agregar_plazo(sample_caso, 'Uno')
+        client.get('/api/plazos')
+
+        db.session.execute(update(Plazo).values(titulo='Renombrado'))
+        db.session.commit()
+
+        assert client.get('/api/plazos').get_json()[0]['titulo'] == 'Renombrado'
+
+    def test_otra_tabla_no_invalida(self, client, sample_caso):
+        client.get('/api/calendario/feriados')
+        agregar_plazo(sample_caso, 'Uno')
+        assert client.get('/api/calendario/feriados').headers['X-Cache'] == 'HIT'
+
+        db.session.add(Feriado(fecha=date(date.today().year, 12, 24), nombre='Nochebuena'))
+        db.session.commit()
+        respuesta = client.get('/api/calendario/feriados')
+        assert respuesta.headers['X-Cache'] == 'MISS'
+        assert 'Nochebuena' in [nombre for _, nombre in respuesta.get_json()]
+
+    def test_rollback_no_invalida(self, client, sample_caso):
+        agregar_plazo(sample_caso, 'Uno')
+        client.get('/api/plazos')
+
+        plazo = Plazo.query.one()
+        plazo.titulo = 'Descartado'
+        db.session.flush()
+        db.session.rollback()
+
+        assert client.get('/api/plazos').headers['X-Cache'] == 'HIT'
+
+    def test_invalidacion_durante_generacion(self, client):
+        """Una respuesta generada antes de invalidar no se guarda"""
+        almacen = cache.almacen
+        epoca = almacen.epoca()
+        almacen.invalidar(['plazo'])
+        almacen.guardar('clave', (200, 'application/json', {}, b'[]'), 60, ('plazo',), epoca)
+        assert almacen.obtener('clave') is None
+
+
+class TestAlmacenes:
+
+    def test_lru(self):
+        almacen = AlmacenMemoria(tamaño=2)
+        for clave in 'abc':
+            almacen.guardar(clave, (200, 'text/plain', {}, clave.encode()), 60, ('t',), almacen.epoca())
+        assert almacen.obtener('a') is None
+        assert almacen.obtener('c')[3] == b'c'
+        assert almacen.metricas.desalojados == 1
+
+    def test_ttl(self):
+        almacen = AlmacenMemoria()
+        almacen.guardar('a', (200, 'text/plain', {}, b'a'), 0, ('t',), almacen.epoca())
+        assert almacen.obtener('a') is None
+        assert almacen.metricas.expirados == 1
+
+    def test_sqlite_compartido(self, tmp_path):
+        """Dos procesos (dos instancias) ven las escrituras e invalidaciones del otro"""
+        ruta = str(tmp_path / 'compartido.db')
+        uno, otro = AlmacenSQLite(ruta), AlmacenSQLite(ruta)
+        uno.guardar('a', (200, 'text/plain', {'X-Uno': '1'}, b'a'), 60, ('plazo',), uno.epoca())
+        assert otro.obtener('a') == (200, 'text/plain', {'X-Uno': '1'}, b'a')
+
+        assert otro.invalidar(['plazo']) == 1
+        assert uno.obtener('a') is None
+
+    def test_configuracion(self, tmp_path):
+        assert crear_almacen('no') is None
+        assert isinstance(crear_almacen('memoria'), AlmacenMemoria)
+        assert isinstance(crear_almacen(f'sqlite:{tmp_path}/c.db'), AlmacenSQLite)
+        with pytest.raises(ValueError):
+            crear_almacen('redis')
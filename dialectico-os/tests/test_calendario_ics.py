@@ -0,0 +1,148 @@
+# Dialéctico OS - Tests de Feeds de Calendario
+# ============================================
+
+import pytest
+from datetime import date, timedelta
+from src.app import app, db
+from src.models import Cliente, Caso, Plazo
+from src.calendario_ics import escapar, plegar, eventos, feeds, estadisticas_cache
+
+# ============ FIXTURES ============
+
+@pytest.fixture
+def client():
+    """Cliente de test para Flask"""
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    eventos.limpiar()
+    feeds.limpiar()
+
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+        db.drop_all()
+
+@pytest.fixture
+def datos(client):
+    """Dos clientes con un caso y dos plazos cada uno; devuelve ids"""
+    ids = {}
+    hoy = date.today()
+    for nombre, rut in (('Ana', '11111111-1'), ('Beto', '22222222-2')):
+        cliente = Cliente(nombre=nombre, rut=rut)
+        db.session.add(cliente)
+        db.session.commit()
+        caso = Caso(cliente_id=cliente.id, materia=f'Civil {nombre}', numero_expediente=f'C-{cliente.id}-2025')
+        db.session.add(caso)
+        db.session.commit()
+        for i in (1, 2):
+            db.session.add(Plazo(
+                caso_id=caso.id, titulo=f'Contestar {nombre} {i}', dias=10,
+                fecha_inicio=hoy, fecha_vencimiento=hoy + timedelta(days=10 * i)
+            ))
+        db.session.commit()
+        ids[nombre] = (cliente.id, caso.id)
+    return ids
+
+def eventos_en(cuerpo: str) -> list:
+    return [linea for linea in cuerpo.split('\r\n') if linea.startswith('SUMMARY:')]
+
+# ============ TESTS ============
+
+class TestFormato:
+
+    def test_escapar(self):
+        assert escapar('a;b,c\\d\ne') == 'a\\;b\\,c\\\\d\\ne'
+
+    def test_plegar(self):
+        """Líneas de a lo más 75 octetos sin cortar caracteres UTF-8"""
+        linea = 'SUMMARY:' + 'ñ' * 100
+        plegada = plegar(linea)
+        partes = plegada.rstrip('\r\n').split('\r\n')
+        assert all(len(p.encode('utf-8')) <= 75 for p in partes)
+        assert ''.join(p[1:] if i else p for i, p in enumerate(partes)) == linea
+
+
+class TestFeed:
+
+    def test_feed_completo(self, client, datos):
+        respuesta = client.get('/api/calendario.ics')
+        assert respuesta.status_code == 200
+        assert respuesta.mimetype == 'text/calendar'
+        cuerpo = respuesta.get_data(as_text=True)
+        assert cuerpo.startswith('BEGIN:VCALENDAR\r\n')
+        assert cuerpo.endswith('END:VCALENDAR\r\n')
+        assert len(eventos_en(cuerpo)) == 4
+        vencimiento = (date.today() + timedelta(days=10)).strftime('%Y%m%d')
+        assert f'DTSTART;VALUE=DATE:{vencimiento}' in cuerpo
+
+    def test_por_caso_y_cliente(self, client, datos):
+        cliente_id, caso_id = datos['Ana']
+        por_caso = client.get(f'/api/calendario.ics?caso={caso_id}').get_data(as_text=True)
+        por_cliente = client.get(f'/api/calendario.ics?cliente={cliente_id}').get_data(as_text=True)
+
+        assert eventos_en(por_caso) == eventos_en(por_cliente)
+        assert all('Ana' in linea for linea in eventos_en(por_caso))
+        assert 'X-WR-CALNAME:Plazos · Ana' in por_cliente
+        assert client.get('/api/calendario.ics?caso=999').status_code == 404
+
+    def test_304_sin_cambios(self, client, datos):
+        """Con el mismo ETag o Last-Modified responde 304 sin cuerpo"""
+        primera = client.get('/api/calendario.ics')
+        etag = primera.headers['ETag']
+        assert primera.headers['Last-Modified']
+
+        segunda = client.get('/api/calendario.ics', headers={'If-None-Match': etag})
+        assert segunda.status_code == 304
+        assert segunda.get_data() == b''
+
+        tercera = client.get('/api/calendario.ics', headers={
+            'If-Modified-Since': primera.headers['Last-Modified']
+        })
+        assert tercera.status_code == 304
+
+    def test_cambio_regenera_solo_el_evento(self, client, datos):
+        """Editar un plazo cambia el ETag y solo se renderiza ese evento"""
+        etag = client.get('/api/calendario.ics').headers['ETag']
+        antes = estadisticas_cache()['eventos']
+
+        plazo = Plazo.query.filter_by(titulo='Contestar Ana 1').one()
+        plazo.titulo = 'Apelar Ana 1'
+        db.session.commit()
+
+        respuesta = client.get('/api/calendario.ics', headers={'If-None-Match': etag})
+        assert respuesta.status_code == 200
+        assert respuesta.headers['ETag'] != etag
+        assert 'SUMMARY:Apelar Ana 1 · Civil Ana' in respuesta.get_data(as_text=True)
+        despues = estadisticas_cache()['eventos']
+        assert despues['fallos'] - antes['fallos'] == 1
+        assert despues['aciertos'] - antes['aciertos'] == 3
+
+    def test_borrado_cambia_etag(self, client, datos):
+        etag = client.get('/api/calendario.ics').headers['ETag']
+        db.session.delete(Plazo.query.filter_by(titulo='Contestar Beto 2').one())
+        db.session.commit()
+
+        respuesta = client.get('/api/calendario.ics', headers={'If-None-Match': etag})
+        assert respuesta.status_code == 200
+        assert len(eventos_en(respuesta.get_data(as_text=True))) == 3
+
+    def test_cambio_de_cliente_regenera(self, client, datos):
+        """El nombre del cliente va en el evento: editarlo también invalida"""
+        cliente_id, _ = datos['Beto']
+        client.get('/api/calendario.ics')
+        db.session.get(Cliente, cliente_id).nombre = 'Roberto'
+        db.session.commit()
+
+        cuerpo = client.get('/api/calendario.ics').get_data(as_text=True)
+        assert cuerpo.count('Cliente: Roberto') == 2
+
+    def test_plazos_antiguos_fuera(self, client, datos):
+        """Solo entran los plazos vencidos hace menos de DIAS_HISTORIA"""
+        _, caso_id = datos['Ana']
+        hace_un_año = date.today() - timedelta(days=365)
+        db.session.add(Plazo(caso_id=caso_id, titulo='Viejo', dias=5,
+                             fecha_inicio=hace_un_año, fecha_vencimiento=hace_un_año))
+        db.session.commit()
+
+        cuerpo = client.get('/api/calendario.ics').get_data(as_text=True)
+        assert 'Viejo' not in cuerpo
@@ -0,0 +1,211 @@
+# Dialéctico OS - Tests del Registro de Cambios
+# =============================================
+
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import bindparam, update
+from src.app import app, db
+from src.models import Cliente, Caso, Plazo, Cambio, TipoPlazo
+from src.deadlines import CalendarioChileno
+from src.importacion import importar, digito_verificador
+from src.recalculo import recalcular_plazos
+from src.alertas import escanear_alertas
+from src.cambios import leer_cambios, ultimo_seq, podar_cambios, ConsumidorCambios, CursorVencido
+
+# ============ FIXTURES ============
+
+@pytest.fixture
+def client():
+    """Cliente de test para Flask"""
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+        db.drop_all()
+
+@pytest.fixture
+def sample_caso(client):
+    cliente = Cliente(nombre="Cambios", rut="55555555-5")
+    db.session.add(cliente)
+    db.session.commit()
+    caso = Caso(cliente_id=cliente.id, materia="Laboral")
+    db.session.add(caso)
+    db.session.commit()
+    return caso
+
+def cambios(tabla=None):
+    return leer_cambios(0, [tabla] if tabla else None)[0]
+
+# ============ TESTS ============
+
+class TestCaptura:
+
+    def test_insert_update_delete(self, sample_caso):
+        cliente = db.session.get(Cliente, sample_caso.cliente_id)
+        cliente.telefono = '+56911111111'
+        db.session.commit()
+        db.session.delete(sample_caso)
+        db.session.commit()
+
+        registro = cambios()
+
+        assert [(c['tabla'], c['operacion']) for c in registro] == [
+            ('cliente', 'insert'), ('caso', 'insert'), ('cliente', 'update'), ('caso', 'delete')
+        ]
+        assert registro[1]['nuevo']['materia'] == 'Laboral'
+        assert registro[2]['nuevo'] == {'telefono': '+56911111111'}
+        assert registro[2]['anterior'] == {'telefono': None}
+        assert registro[3]['anterior']['id'] == sample_caso.id
+        assert [c['seq'] for c in registro] == sorted(c['seq'] for c in registro)
+
+    def test_columnas_derivadas_no_registran(self, sample_caso):
+        """El escaneo de alertas solo toca estado derivado"""
+        db.session.add(Plazo(caso_id=sample_caso.id, titulo='Contestar', dias=1,
+                             fecha_inicio=date.today(), fecha_vencimiento=date.today()))
+        db.session.commit()
+        antes = ultimo_seq()
+
+        escanear_alertas()
+
+        assert ultimo_seq() == antes
+
+    def test_rollback_descarta(self, sample_caso):
+        antes = ultimo_seq()
+        sample_caso.materia = 'Penal'
+        db.session.flush()
+        db.session.rollback()
+        assert ultimo_seq() == antes
+
+    def test_importacion_masiva(self, client):
+        filas = [{'nombre': f'C{i}', 'rut': f'{10000000 + i}-{digito_verificador(10000000 + i)}'}
+                 for i in range(5)]
+
+        importar('clientes', filas, tamaño_lote=2)
+
+        registro = cambios('cliente')
+        ids = [c.id for c in Cliente.query.order_by(Cliente.id)]
+        assert [c['id'] for c in registro] == ids
+        assert [c['nuevo']['nombre'] for c in registro] == [f'C{i}' for i in range(5)]
+
+    def test_recalculo_masivo(self, sample_caso):
+        plazo = Plazo(caso_id=sample_caso.id, titulo='Apelar', dias=5, tipo=TipoPlazo.HABIL,
+                      fecha_inicio=date(2025, 9, 15), fecha_vencimiento=date(2025, 9, 20))
+        db.session.add(plazo)
+        db.session.commit()
+
+        recalcular_plazos(CalendarioChileno())
+
+        ultimo = cambios('plazo')[-1]
+        db.session.refresh(plazo)
+        assert ultimo['operacion'] == 'update'
+        assert ultimo['id'] == plazo.id
+        assert ultimo['nuevo'] == {'fecha_vencimiento': plazo.fecha_vencimiento.isoformat()}
+
+    def test_update_con_criterio(self, sample_caso):
+        db.session.execute(update(Caso).values(materia='Civil'))
+        db.session.commit()
+
+        ultimo = cambios('caso')[-1]
+        assert ultimo['operacion'] == 'masivo'
+        assert ultimo['id'] is None
+        assert ultimo['nuevo']['filas'] == 1
+
+    def test_executemany_por_sesion(self, sample_caso):
+        """Un UPDATE con parámetros propios por la sesión también se registra"""
+        db.session.execute(
+            update(Caso).where(Caso.id == bindparam('caso')).values(materia=bindparam('materia')),
+            [{'caso': sample_caso.id, 'materia': 'Familia'}],
+            execution_options={'dml_strategy': 'core_only'}
+        )
+        db.session.commit()
+
+        ultimo = cambios('caso')[-1]
+        assert ultimo['operacion'] == 'masivo'
+        assert ultimo['nuevo']['filas'] == 1
+
+
+class TestLectura:
+
+    def test_cursor_y_limite(self, sample_caso):
+        primeros, cursor = leer_cambios(0, limite=1)
+        resto, final = leer_cambios(cursor)
+
+        assert [c['tabla'] for c in primeros] == ['cliente']
+        assert [c['tabla'] for c in resto] == ['caso']
+        assert final == ultimo_seq()
+        assert leer_cambios(final) == ([], final)
+
+    def test_consumidor(self, sample_caso):
+        consumidor = ConsumidorCambios('busqueda', tablas=['caso'])
+        assert len(consumidor.pendientes()) == 1
+        # Sin confirmar, la tanda se repite
+        assert len(consumidor.pendientes()) == 1
+        consumidor.confirmar()
+        assert consumidor.pendientes() == []
+
+        sample_caso.materia = 'Familia'
+        db.session.commit()
+        assert [c['operacion'] for c in ConsumidorCambios('busqueda').pendientes()] == ['update']
+
+    def test_append_only(self, sample_caso):
+        """Los seq no se reutilizan aunque se borren filas del registro"""
+        ultimo = ultimo_seq()
+        db.session.query(Cambio).delete()
+        db.session.commit()
+        sample_caso.materia = 'Penal'
+        db.session.commit()
+        assert ultimo_seq() == ultimo + 1
+
+
+class TestRetencion:
+
+    def envejecer(self, dias):
+        db.session.execute(update(Cambio).values(momento=datetime.now() - timedelta(days=dias)))
+        db.session.commit()
+
+    def test_poda_por_antigüedad(self, sample_caso):
+        self.envejecer(40)
+        sample_caso.materia = 'Penal'
+        db.session.commit()
+
+        assert podar_cambios(dias=30, tamaño_lote=1) == 2
+        registro, _ = leer_cambios(2)
+        assert [(c['tabla'], c['operacion']) for c in registro] == [('caso', 'update')]
+        assert podar_cambios(dias=30) == 0
+
+    def test_cursor_vencido(self, client, sample_caso):
+        self.envejecer(40)
+        podar_cambios(dias=30)
+
+        with pytest.raises(CursorVencido):
+            leer_cambios(0)
+        with pytest.raises(CursorVencido):
+            ConsumidorCambios('busqueda').pendientes()
+        assert leer_cambios(2) == ([], 2)
+
+        respuesta = client.get('/api/cambios?since=1')
+        assert respuesta.status_code == 410
+        assert respuesta.get_json()['ultimo'] == 2
+
+
+class TestAPI:
+
+    def test_since(self, client, sample_caso):
+        datos = client.get('/api/cambios?since=0&tabla=caso').get_json()
+
+        assert [c['tabla'] for c in datos['cambios']] == ['caso']
+        assert datos['completo'] is True
+        siguiente = client.get(f"/api/cambios?since={datos['cursor']}").get_json()
+        assert siguiente['cambios'] == []
+
+    def test_tabla_desconocida(self, client):
+        assert client.get('/api/cambios?tabla=usuarios').status_code == 400
+
+    def test_limite_acotado(self, client, sample_caso):
+        """Un límite negativo o cero no vuelca el registro entero"""
+        for limite in (-1, 0):
+            datos = client.get(f'/api/cambios?since=0&limite={limite}').get_json()
+            assert len(datos['cambios']) == 1
+            assert datos['completo'] is False
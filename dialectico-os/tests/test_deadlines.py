@@ -1,9 +1,13 @@
 # Dialéctico OS - Tests del Motor de Plazos
 # ==========================================
 
+import threading
 import pytest
 from datetime import date, timedelta
-from src.deadlines import CalendarioChileno, PlazosEspeciales
+from src.deadlines import (
+    CalendarioChileno, PlazosEspeciales, IndiceDiasHabiles, IndiceSuspensiones,
+    CapaFeriados, SEMANA_HABIL, FERIADOS_LEGALES, region_de_tribunal, feriados_del_año, domingo_de_pascua, trasladar_a_lunes
+)
 
 @pytest.fixture
 def calendario():
@@ -107,8 +111,407 @@ class TestCalendarioChileno:
         assert date(2025, 12, 25) in fechas  # Navidad
 
 
+class TestConcurrencia:
+    
+    def test_carga_perezosa_entre_hilos(self):
+        """Varios hilos que cargan el mismo año ven todos sus feriados"""
+        calendario = CalendarioChileno(rango_indice=(2040, 2041))
+        barrera = threading.Barrier(8)
+        resultados = []
+        
+        def consultar():
+            barrera.wait()
+            resultados.append((
+                calendario.es_feriado(date(2045, 12, 25)),
+                calendario.calcular_vencimiento(date(2040, 12, 21), 3, 'habil')
+            ))
+        
+        hilos = [threading.Thread(target=consultar) for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        assert resultados == [(True, date(2040, 12, 27))] * 8
+
+class TestIndiceDiasHabiles:
+    
+    @staticmethod
+    def _sumar_lineal(calendario, inicio, dias, judicial=False):
+        """Referencia: sumar días caminando día a día"""
+        actual = inicio
+        while dias > 0:
+            actual += timedelta(days=1)
+            if judicial:
+                cuenta = actual.weekday() != 6 and not calendario.es_feriado(actual)
+            else:
+                cuenta = calendario.es_habil(actual)
+            if cuenta:
+                dias -= 1
+        return actual
+    
+    def test_vencimientos_coinciden_con_conteo_lineal(self, calendario):
+        """El índice entrega las mismas fechas que el recorrido día a día"""
+        inicio = date(2025, 1, 1)
+        for desplazamiento in range(0, 730, 7):
+            fecha = inicio + timedelta(days=desplazamiento)
+            for dias in (1, 5, 10, 15, 30):
+                assert calendario.calcular_vencimiento(fecha, dias, 'habil') == \
+                    self._sumar_lineal(calendario, fecha, dias)
+                assert calendario.calcular_vencimiento(fecha, dias, 'judicial') == \
+                    self._sumar_lineal(calendario, fecha, dias, judicial=True)
+    
+    def test_dias_habiles_entre_coincide(self, calendario):
+        """Conteo indexado igual al conteo día a día"""
+        inicio = date(2025, 3, 1)
+        fin = date(2026, 10, 15)
+        esperado = sum(
+            1 for i in range((fin - inicio).days + 1)
+            if calendario.es_habil(inicio + timedelta(days=i))
+        )
+        assert calendario.dias_habiles_entre(inicio, fin) == esperado
+    
+    def test_agregar_y_remover_feriado_actualiza_indice(self, calendario):
+        """Los cambios de feriados se reflejan en el índice ya construido"""
+        lunes = date(2025, 1, 6)
+        assert calendario.calcular_vencimiento(lunes, 1, 'habil') == date(2025, 1, 7)
+        
+        calendario.agregar_feriado(date(2025, 1, 7), "Feriado test")
+        assert calendario.calcular_vencimiento(lunes, 1, 'habil') == date(2025, 1, 8)
+        assert calendario.dias_habiles_entre(lunes, date(2025, 1, 10)) == 4
+        
+        calendario.remover_feriado(date(2025, 1, 7))
+        assert calendario.calcular_vencimiento(lunes, 1, 'habil') == date(2025, 1, 7)
+        assert calendario.dias_habiles_entre(lunes, date(2025, 1, 10)) == 5
+    
+    def test_fuera_de_rango_extiende_indice(self):
+        """Fechas fuera del rango indexado amplían el índice"""
+        calendario = CalendarioChileno(rango_indice=(2025, 2025))
+        # Cruza el fin del índice
+        assert calendario.calcular_vencimiento(date(2025, 12, 26), 5, 'habil') == date(2026, 1, 6)
+        # Completamente fuera del índice (1 de enero de 2024 es feriado generado)
+        assert calendario.dias_habiles_entre(date(2024, 1, 1), date(2024, 1, 7)) == 4
+        assert calendario.rango_indice == (2024, 2026)
+    
+    def test_rango_invalido(self):
+        """Un rango de años invertido es un error"""
+        with pytest.raises(ValueError):
+            IndiceDiasHabiles(2026, 2025, {})
+
+
+class TestGeneradorFeriados:
+    
+    def test_domingo_de_pascua(self):
+        """Fechas de Pascua conocidas"""
+        assert domingo_de_pascua(2024) == date(2024, 3, 31)
+        assert domingo_de_pascua(2025) == date(2025, 4, 20)
+        assert domingo_de_pascua(2027) == date(2027, 3, 28)
+        assert domingo_de_pascua(2038) == date(2038, 4, 25)
+    
+    def test_traslado_a_lunes(self):
+        """Ley 19.668: martes a jueves al lunes anterior, viernes al siguiente"""
+        assert trasladar_a_lunes(date(2023, 6, 29)) == date(2023, 6, 26)  # jueves
+        assert trasladar_a_lunes(date(2022, 10, 12)) == date(2022, 10, 10)  # miércoles
+        assert trasladar_a_lunes(date(2027, 6, 29)) == date(2027, 6, 28)  # martes
+        assert trasladar_a_lunes(date(2018, 6, 29)) == date(2018, 7, 2)  # viernes
+        assert trasladar_a_lunes(date(2024, 6, 29)) == date(2024, 6, 29)  # sábado
+    
+    def test_feriados_2027(self):
+        """Feriados de un año sin tabla manual"""
+        feriados = feriados_del_año(2027)
+        assert feriados[date(2027, 3, 26)] == "Viernes Santo"
+        assert feriados[date(2027, 3, 27)] == "Sábado Santo"
+        assert feriados[date(2027, 6, 21)] == "Día de los Pueblos Indígenas"
+        assert feriados[date(2027, 10, 11)] == "Encuentro de Dos Mundos"
+        assert date(2027, 9, 18) in feriados
+        assert date(2027, 12, 25) in feriados
+    
+    def test_iglesias_evangelicas_y_feriados_adicionales(self):
+        """Traslados del 31 de octubre y días adicionales fijados por ley"""
+        assert date(2023, 10, 27) in feriados_del_año(2023)  # 31 cae martes
+        assert date(2018, 11, 2) in feriados_del_año(2018)  # 31 cae miércoles
+        assert date(2023, 1, 2) in feriados_del_año(2023)  # 2 de enero lunes
+        assert date(2018, 9, 17) in feriados_del_año(2018)  # 17 de septiembre lunes
+        assert date(2024, 9, 20) in feriados_del_año(2024)  # 20 de septiembre viernes
+    
+    def test_resultado_es_copia(self):
+        """Modificar el resultado no altera el memo"""
+        feriados_del_año(2030).clear()
+        assert feriados_del_año(2030)
+    
+    def test_calendario_carga_años_sin_tabla(self, calendario):
+        """El calendario conoce feriados de años fuera de FERIADOS_LEGALES"""
+        assert calendario.es_feriado(date(2027, 3, 26))
+        # Jueves Santo 2027 + 1 hábil: salta Viernes Santo y el fin de semana
+        assert calendario.calcular_vencimiento(date(2027, 3, 25), 1, 'habil') == date(2027, 3, 29)
+        assert any(n == "Navidad" for _, n in calendario.listar_feriados(2031))
+    
+    def test_tabla_legal_se_suma_a_los_generados(self, calendario):
+        """En los años de la tabla manual también cuentan los feriados generados"""
+        assert calendario.es_feriado(date(2025, 12, 31))  # Feriado bancario solo en la tabla
+        assert calendario.es_feriado(date(2025, 6, 20))  # Pueblos Indígenas
+        assert calendario.es_feriado(date(2026, 6, 29))  # San Pedro y San Pablo
+        assert calendario.es_feriado(date(2026, 10, 12))  # Encuentro de Dos Mundos
+        assert calendario.calcular_vencimiento(date(2026, 6, 26), 1, 'habil') == date(2026, 6, 30)
+    
+    def test_tabla_legal_cubre_los_generados(self, calendario):
+        """Ningún feriado generado falta en el calendario de los años de la tabla"""
+        for año in sorted({f.year for f in FERIADOS_LEGALES}):
+            feriados = dict(calendario.listar_feriados(año))
+            assert set(feriados_del_año(año)) <= set(feriados), año
+    
+    def test_remover_feriado_generado(self, calendario):
+        """Un feriado generado se puede remover y no reaparece"""
+        calendario.remover_feriado(date(2027, 12, 25))
+        assert not calendario.es_feriado(date(2027, 12, 25))
+        assert calendario.dias_habiles_entre(date(2027, 12, 20), date(2027, 12, 26)) == 5
+    
+    def test_sin_generacion(self):
+        """Con generar_feriados=False solo cuentan los feriados entregados"""
+        calendario = CalendarioChileno(generar_feriados=False)
+        assert not calendario.es_feriado(date(2027, 12, 25))
+
+
+class TestVencimientosNumpy:
+    
+    def test_coincide_con_calculo_escalar(self, calendario):
+        """El backend NumPy entrega las mismas fechas que el escalar"""
+        pytest.importorskip('numpy')
+        plazos = [
+            (date(2024, 12, 1) + timedelta(days=d), n, tipo)
+            for d in range(0, 800, 3)
+            for n in (0, 1, 7, 10, 30)
+            for tipo in ('corrido', 'habil', 'judicial')
+        ]
+        fechas, dias, tipos = zip(*plazos)
+        resultado = calendario.calcular_vencimientos_np(fechas, dias, tipos)
+        esperado = [calendario.calcular_vencimiento(f, n, t) for f, n, t in plazos]
+        assert resultado.astype(object).tolist() == esperado
+    
+    def test_lote_usa_feriados_actualizados(self, calendario):
+        """Agregar un feriado invalida el calendario NumPy cacheado"""
+        pytest.importorskip('numpy')
+        plazos = [(date(2025, 1, 6), 1, 'habil')] * 300
+        assert calendario.calcular_vencimientos(plazos)[0] == date(2025, 1, 7)
+        calendario.agregar_feriado(date(2025, 1, 7), "Feriado test")
+        assert calendario.calcular_vencimientos(plazos)[0] == date(2025, 1, 8)
+    
+    def test_tipo_desconocido(self, calendario):
+        """Un tipo inválido es un error, igual que en el cálculo escalar"""
+        pytest.importorskip('numpy')
+        with pytest.raises(ValueError):
+            calendario.calcular_vencimientos_np([date(2025, 1, 6)], [5], ['semanal'])
+
+
+class TestCacheVencimientos:
+    
+    def test_aciertos_y_fallos(self, calendario):
+        """El segundo cálculo igual sale de la caché"""
+        primero = calendario.calcular_vencimiento(date(2025, 3, 3), 10, 'habil')
+        segundo = calendario.calcular_vencimiento(date(2025, 3, 3), 10, 'habil')
+        assert primero == segundo
+        estadisticas = calendario.estadisticas_cache()
+        assert estadisticas['fallos'] == 1
+        assert estadisticas['aciertos'] == 1
+    
+    def test_corridos_no_usan_cache(self, calendario):
+        """Los días corridos son una suma: no vale la pena guardarlos"""
+        calendario.calcular_vencimiento(date(2025, 3, 3), 10, 'corrido')
+        assert calendario.estadisticas_cache()['entradas'] == 0
+    
+    def test_cambio_de_feriado_invalida(self, calendario):
+        """agregar/remover_feriado cambian la versión de la clave"""
+        assert calendario.calcular_vencimiento(date(2025, 1, 6), 1, 'habil') == date(2025, 1, 7)
+        calendario.agregar_feriado(date(2025, 1, 7), "Feriado test")
+        assert calendario.calcular_vencimiento(date(2025, 1, 6), 1, 'habil') == date(2025, 1, 8)
+        calendario.remover_feriado(date(2025, 1, 7))
+        assert calendario.calcular_vencimiento(date(2025, 1, 6), 1, 'habil') == date(2025, 1, 7)
+        assert calendario.estadisticas_cache()['version_feriados'] == 2
+    
+    def test_desalojo_lru(self):
+        """Con la caché llena sale la entrada menos usada"""
+        calendario = CalendarioChileno(tamaño_cache=2)
+        calendario.calcular_vencimiento(date(2025, 3, 3), 5, 'habil')
+        calendario.calcular_vencimiento(date(2025, 3, 4), 5, 'habil')
+        calendario.calcular_vencimiento(date(2025, 3, 3), 5, 'habil')
+        calendario.calcular_vencimiento(date(2025, 3, 5), 5, 'habil')
+        estadisticas = calendario.estadisticas_cache()
+        assert estadisticas['desalojos'] == 1
+        assert estadisticas['entradas'] == 2
+        # La del 3 de marzo se usó más recientemente: sigue en caché
+        calendario.calcular_vencimiento(date(2025, 3, 3), 5, 'habil')
+        assert calendario.estadisticas_cache()['aciertos'] == 2
+    
+    def test_sin_cache(self):
+        """tamaño_cache=0 desactiva la caché"""
+        calendario = CalendarioChileno(tamaño_cache=0)
+        assert calendario.calcular_vencimiento(date(2025, 1, 6), 1, 'habil') == date(2025, 1, 7)
+        assert calendario.precalentar() == 0
+    
+    def test_precalentar(self, calendario):
+        """Precalentar cubre los plazos especiales de los próximos días"""
+        desde = date(2025, 3, 3)
+        calculados = calendario.precalentar(desde, dias=90)
+        duraciones = set(PlazosEspeciales.terminos().values())
+        assert calculados == 90 * len(duraciones) * 2
+        
+        calendario.calcular_vencimiento(desde + timedelta(days=45), PlazosEspeciales.plazo_casacion(), 'habil')
+        assert calendario.estadisticas_cache()['aciertos'] >= 1
+
+
+class TestSuspensiones:
+    
+    def test_indice_fusiona_periodos(self):
+        """Los períodos superpuestos o contiguos quedan en uno solo"""
+        indice = IndiceSuspensiones([
+            (date(2025, 2, 1), date(2025, 2, 10)),
+            (date(2025, 2, 20), date(2025, 2, 28)),
+            (date(2025, 2, 11), date(2025, 2, 15)),
+            (date(2025, 3, 10), date(2025, 3, 12)),
+        ])
+        assert indice.periodos() == [
+            (date(2025, 2, 1), date(2025, 2, 15)),
+            (date(2025, 2, 20), date(2025, 2, 28)),
+            (date(2025, 3, 10), date(2025, 3, 12)),
+        ]
+        indice.agregar(date(2025, 2, 14), date(2025, 3, 9))
+        assert indice.periodos() == [(date(2025, 2, 1), date(2025, 3, 12))]
+    
+    def test_indice_superpuestos(self):
+        """Solo los tramos dentro del rango, recortados"""
+        indice = IndiceSuspensiones([
+            (date(2025, 1, 1), date(2025, 1, 5)),
+            (date(2025, 2, 1), date(2025, 2, 28)),
+        ])
+        assert list(indice.superpuestos(date(2025, 1, 3), date(2025, 2, 2))) == [
+            (date(2025, 1, 3), date(2025, 1, 5)),
+            (date(2025, 2, 1), date(2025, 2, 2)),
+        ]
+        assert indice.contiene(date(2025, 2, 15))
+        assert not indice.contiene(date(2025, 1, 15))
+    
+    def test_periodo_invalido(self):
+        """Fin antes del inicio es un error"""
+        with pytest.raises(ValueError):
+            IndiceSuspensiones([(date(2025, 2, 10), date(2025, 2, 1))])
+    
+    def test_habiles_saltan_suspension(self, calendario):
+        """Los días hábiles suspendidos no cuentan"""
+        # Lunes 3/mar + 5 hábiles = lunes 10/mar; suspender 5-7/mar (3 hábiles)
+        assert calendario.calcular_vencimiento(date(2025, 3, 3), 5, 'habil') == date(2025, 3, 10)
+        calendario.agregar_suspension(date(2025, 3, 5), date(2025, 3, 7))
+        assert calendario.calcular_vencimiento(date(2025, 3, 3), 5, 'habil') == date(2025, 3, 13)
+    
+    def test_corridos_saltan_suspension(self, calendario):
+        """Las suspensiones también alargan los plazos de días corridos"""
+        calendario.agregar_suspension(date(2025, 2, 1), date(2025, 2, 28))
+        # 26-31 de enero (6 días) + 1-4 de marzo (4 días)
+        assert calendario.calcular_vencimiento(date(2025, 1, 25), 10, 'corrido') == date(2025, 3, 4)
+    
+    def test_vencimiento_no_cae_en_suspension(self, calendario):
+        """Un plazo que terminaba dentro del período pasa al día siguiente"""
+        calendario.agregar_suspension(date(2025, 3, 10), date(2025, 3, 14))
+        vencimiento = calendario.calcular_vencimiento(date(2025, 3, 3), 5, 'habil')
+        assert vencimiento == date(2025, 3, 17)
+        assert not calendario.esta_suspendido(vencimiento)
+    
+    def test_varios_periodos(self, calendario):
+        """Un plazo largo salta todos los períodos que atraviesa"""
+        calendario.agregar_suspension(date(2025, 3, 4), date(2025, 3, 4))
+        calendario.agregar_suspension(date(2025, 3, 11), date(2025, 3, 11))
+        assert calendario.calcular_vencimiento(date(2025, 3, 3), 10, 'habil') == date(2025, 3, 19)
+    
+    def test_suspension_por_tribunal(self, calendario):
+        """Una suspensión de un tribunal no afecta a los demás"""
+        calendario.agregar_suspension(date(2025, 3, 5), date(2025, 3, 7), tribunal='1° Juzgado Civil')
+        assert calendario.calcular_vencimiento(
+            date(2025, 3, 3), 5, 'habil', tribunal='1° Juzgado Civil'
+        ) == date(2025, 3, 13)
+        assert calendario.calcular_vencimiento(
+            date(2025, 3, 3), 5, 'habil', tribunal='2° Juzgado Civil'
+        ) == date(2025, 3, 10)
+        assert calendario.calcular_vencimiento(date(2025, 3, 3), 5, 'habil') == date(2025, 3, 10)
+    
+    def test_lote_con_suspensiones(self, calendario):
+        """El cálculo en lote respeta las suspensiones y el tribunal"""
+        calendario.agregar_suspension(date(2025, 3, 5), date(2025, 3, 7), tribunal='TOP')
+        plazos = [(date(2025, 3, 3), 5, 'habil', 'TOP'), (date(2025, 3, 3), 5, 'habil')] * 200
+        vencimientos = calendario.calcular_vencimientos(plazos)
+        assert vencimientos[:2] == [date(2025, 3, 13), date(2025, 3, 10)]
+
+
+class TestCapas:
+    
+    def test_capa_copy_on_write(self):
+        """La capa ve la base y sus cambios no la tocan"""
+        base = {date(2025, 1, 1): "Año Nuevo", date(2025, 5, 1): "Día del Trabajo"}
+        capa = CapaFeriados(base)
+        capa[date(2025, 6, 7)] = "Regional"
+        del capa[date(2025, 5, 1)]
+        
+        assert date(2025, 1, 1) in capa
+        assert date(2025, 5, 1) not in capa
+        assert date(2025, 6, 7) in capa
+        assert len(capa) == 2
+        assert base == {date(2025, 1, 1): "Año Nuevo", date(2025, 5, 1): "Día del Trabajo"}
+        with pytest.raises(KeyError):
+            del capa[date(2025, 5, 1)]
+    
+    def test_region_de_tribunal(self):
+        """La región sale de las localidades del nombre del tribunal"""
+        assert region_de_tribunal("1° Juzgado de Letras de Arica") == 'Arica y Parinacota'
+        assert region_de_tribunal("Juzgado de Familia de Chillán") == 'Chillán'
+        assert region_de_tribunal("2° Juzgado Civil de Santiago") is None
+        assert region_de_tribunal(None) is None
+    
+    def test_feriado_regional_solo_en_su_region(self, calendario):
+        """El 7 de junio es feriado en Arica y no en Santiago"""
+        # Jueves 6/jun/2024 + 1 hábil = viernes 7 (feriado en Arica)
+        arica = "Juzgado de Letras de Arica"
+        assert calendario.calcular_vencimiento(date(2024, 6, 6), 1, 'habil') == date(2024, 6, 7)
+        assert calendario.calcular_vencimiento(date(2024, 6, 6), 1, 'habil', tribunal=arica) == date(2024, 6, 10)
+        assert calendario.para_tribunal(arica).es_feriado(date(2024, 6, 7))
+        assert not calendario.es_feriado(date(2024, 6, 7))
+    
+    def test_capas_se_reutilizan(self, calendario):
+        """Los tribunales de una misma región comparten la capa"""
+        capa = calendario.para_tribunal("1° Juzgado de Letras de Arica")
+        assert calendario.para_tribunal("Juzgado de Familia de Arica") is capa
+        assert calendario.para_tribunal("Juzgado de Santiago") is calendario
+        assert capa.para_tribunal("Juzgado de Familia de Chillán") is capa
+    
+    def test_capa_sin_feriados_propios_comparte_indice(self, calendario):
+        """Una capa igual a la base usa el índice de la base"""
+        capa = calendario.derivar()
+        assert capa._indice(SEMANA_HABIL) is calendario._indice(SEMANA_HABIL)
+        
+        capa.agregar_feriado(date(2025, 3, 4), "Feriado local")
+        assert capa._indice(SEMANA_HABIL) is not calendario._indice(SEMANA_HABIL)
+        assert capa.calcular_vencimiento(date(2025, 3, 3), 1, 'habil') == date(2025, 3, 5)
+        assert calendario.calcular_vencimiento(date(2025, 3, 3), 1, 'habil') == date(2025, 3, 4)
+    
+    def test_cambio_en_base_llega_a_las_capas(self, calendario):
+        """Un feriado o suspensión nuevos en la base se ven en las capas guardadas"""
+        arica = "Juzgado de Letras de Arica"
+        assert calendario.calcular_vencimiento(date(2025, 3, 3), 1, 'habil', tribunal=arica) == date(2025, 3, 4)
+        calendario.agregar_feriado(date(2025, 3, 4), "Feriado test")
+        assert calendario.calcular_vencimiento(date(2025, 3, 3), 1, 'habil', tribunal=arica) == date(2025, 3, 5)
+        calendario.agregar_suspension(date(2025, 3, 5), date(2025, 3, 5))
+        assert calendario.calcular_vencimiento(date(2025, 3, 3), 1, 'habil', tribunal=arica) == date(2025, 3, 6)
+    
+    def test_sin_regionales(self):
+        """incluir_regionales=False usa siempre el calendario nacional"""
+        calendario = CalendarioChileno(incluir_regionales=False)
+        assert calendario.para_tribunal("Juzgado de Letras de Arica") is calendario
+
+
 class TestPlazosEspeciales:
     
+    def test_terminos(self):
+        """Solo los plazos con duración fija"""
+        terminos = PlazosEspeciales.terminos()
+        assert terminos['plazo_casacion'] == 15
+        assert 'plazo_posesion_efectiva' not in terminos
+    
     def test_plazo_apelacion_civil(self):
         """Plazo de apelación en civil"""
         assert PlazosEspeciales.plazo_apelacion_civil() == 10
@@ -0,0 +1,157 @@
+# Dialéctico OS - Tests de la Fuente de Feriados
+# ==============================================
+
+import os
+import subprocess
+import sys
+import pytest
+from datetime import date
+from sqlalchemy import text
+from src.app import app, db
+from src.models import Feriado
+from src.feriados import ProveedorFeriados, firmar, version_tabla
+
+# ============ FIXTURES ============
+
+@pytest.fixture
+def client():
+    """Cliente de test para Flask"""
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+        db.drop_all()
+
+@pytest.fixture
+def proveedor(client):
+    """Proveedor con los feriados legales por defecto"""
+    return ProveedorFeriados()
+
+# ============ TESTS ============
+
+class TestProveedorFeriados:
+    
+    def test_incluye_feriados_legales(self, proveedor):
+        """Sin filas en la tabla, el snapshot son los feriados legales"""
+        snapshot = proveedor.snapshot()
+        assert snapshot.feriados[date(2025, 9, 18)] == "Fiestas Patrias"
+        assert proveedor.calendario().es_feriado(date(2025, 12, 25))
+    
+    def test_une_filas_activas(self, proveedor):
+        """Las filas activas se agregan y las inactivas se ignoran"""
+        db.session.add(Feriado(fecha=date(2025, 6, 20), nombre="Pueblos Indígenas"))
+        db.session.add(Feriado(fecha=date(2025, 3, 3), nombre="Inactivo", activo=False))
+        db.session.commit()
+        
+        snapshot = proveedor.snapshot()
+        assert snapshot.feriados[date(2025, 6, 20)] == "Pueblos Indígenas"
+        assert date(2025, 3, 3) not in snapshot.feriados
+        assert proveedor.calendario().es_feriado(date(2025, 6, 20))
+    
+    def test_version_igual_en_todos_los_procesos(self):
+        """La firma no depende de PYTHONHASHSEED"""
+        codigo = (
+            "from datetime import date; from src.feriados import firmar; "
+            "print(firmar(((date(2025, 6, 20), 'Pueblos Indígenas'),), ((date(2025, 3, 5), date(2025, 3, 7), 'Juzgado'),)))"
+        )
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        versiones = {
+            subprocess.run(
+                [sys.executable, '-c', codigo], cwd=raiz, capture_output=True, text=True, check=True,
+                env={**os.environ, 'PYTHONHASHSEED': semilla}
+            ).stdout.strip()
+            for semilla in ('1', '2')
+        }
+        assert versiones == {str(firmar(
+            ((date(2025, 6, 20), 'Pueblos Indígenas'),), ((date(2025, 3, 5), date(2025, 3, 7), 'Juzgado'),)
+        ))}
+    
+    def test_calendario_publicado_precargado(self, proveedor):
+        """El calendario compartido llega con sus años e índices listos"""
+        calendario = proveedor.calendario()
+        desde, hasta = calendario.rango_indice
+        assert set(range(desde, hasta + 1)) <= calendario._años_cargados
+        assert all(indice._sucio_desde is None for indice in calendario._indices.values())
+        assert len(calendario._indices) == 2
+    
+    def test_snapshot_se_reutiliza_hasta_cambio(self, proveedor):
+        """El snapshot solo se recarga cuando la tabla cambia"""
+        primero = proveedor.snapshot()
+        assert proveedor.snapshot() is primero
+        assert proveedor.calendario() is proveedor.calendario()
+        
+        version = version_tabla()
+        feriado = Feriado(fecha=date(2025, 7, 1), nombre="Nuevo")
+        db.session.add(feriado)
+        db.session.commit()
+        assert version_tabla() != version
+        
+        segundo = proveedor.snapshot()
+        assert segundo is not primero
+        assert date(2025, 7, 1) in segundo.feriados
+        
+        db.session.delete(feriado)
+        db.session.commit()
+        assert date(2025, 7, 1) not in proveedor.snapshot().feriados
+    
+    def test_cambio_externo_tras_intervalo(self, client):
+        """Escrituras sin ORM (otro proceso, SQL directo) se ven al vencer el intervalo"""
+        proveedor = ProveedorFeriados(intervalo=3600)
+        primero = proveedor.snapshot()
+        db.session.connection().execute(text(
+            "INSERT INTO feriado (fecha, nombre, activo) VALUES ('2025-07-02', 'Externo', 1)"
+        ))
+        db.session.commit()
+        
+        # Commit sin eventos ORM: sigue el snapshot hasta verificar
+        assert proveedor.snapshot() is primero
+        proveedor.invalidar()
+        assert date(2025, 7, 2) in proveedor.snapshot().feriados
+    
+    def test_verificar_en_cada_lectura(self, client):
+        """Con intervalo 0 cada lectura compara con la base de datos"""
+        proveedor = ProveedorFeriados(intervalo=0)
+        primero = proveedor.snapshot()
+        assert proveedor.snapshot() is primero
+        
+        db.session.connection().execute(text(
+            "INSERT INTO suspension (fecha_inicio, fecha_fin, motivo, activo) "
+            "VALUES ('2025-07-07', '2025-07-11', 'Cierre', 1)"
+        ))
+        db.session.commit()
+        assert proveedor.snapshot() is not primero
+        assert proveedor.calendario().esta_suspendido(date(2025, 7, 8))
+    
+    def test_rollback_no_cambia_version(self, proveedor):
+        """Un cambio sin confirmar no se publica"""
+        primero = proveedor.snapshot()
+        db.session.add(Feriado(fecha=date(2025, 7, 3), nombre="Descartado"))
+        db.session.flush()
+        db.session.rollback()
+        assert proveedor.snapshot() is primero
+    
+    def test_snapshot_inmutable(self, proveedor):
+        """El snapshot no se puede modificar"""
+        snapshot = proveedor.snapshot()
+        with pytest.raises(TypeError):
+            snapshot.feriados[date(2025, 1, 2)] = "Otro"
+    
+    def test_listar(self, proveedor):
+        """Listar feriados de un año en orden"""
+        feriados = proveedor.snapshot().listar(2025)
+        assert feriados[0] == (date(2025, 1, 1), "Año Nuevo")
+        assert [f for f, _ in feriados] == sorted(f for f, _ in feriados)
+    
+    def test_listar_año_generado(self, proveedor):
+        """Años sin tabla manual se completan con el generador"""
+        db.session.add(Feriado(fecha=date(2028, 8, 20), nombre="Regional"))
+        db.session.commit()
+        feriados = dict(proveedor.snapshot().listar(2028))
+        assert feriados[date(2028, 12, 25)] == "Navidad"
+        assert feriados[date(2028, 8, 20)] == "Regional"
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,221 @@
+# Dialéctico OS - Tests de Importación Masiva
+# ===========================================
+
+import io
+import pytest
+from datetime import date
+from sqlalchemy import text
+from src.app import app, db
+from src.models import Cliente, Caso, Plazo, Prioridad, TipoPlazo
+from src.deadlines import CalendarioChileno
+from src.importacion import (
+    importar, leer_csv, leer_xlsx, normalizar_rut, digito_verificador, variantes_rut
+)
+
+# ============ FIXTURES ============
+
+@pytest.fixture
+def client():
+    """Cliente de test para Flask"""
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+        db.drop_all()
+
+def rut(cuerpo: int) -> str:
+    """RUT válido para un número"""
+    return f'{cuerpo}-{digito_verificador(cuerpo)}'
+
+def csv_bytes(texto: str) -> io.BytesIO:
+    return io.BytesIO(texto.encode('utf-8'))
+
+# ============ TESTS ============
+
+class TestRut:
+
+    def test_normalizar(self):
+        """Puntos, espacios y K minúscula se normalizan"""
+        assert normalizar_rut('12.345.678-5') == '12345678-5'
+        assert normalizar_rut(' 123456785 ') == '12345678-5'
+        assert normalizar_rut('10.000.013-k') == '10000013-K'
+        assert normalizar_rut('11.111.111-1') == '11111111-1'
+
+    def test_invalidos(self):
+        """Dígito verificador incorrecto o formato inválido"""
+        assert normalizar_rut('12.345.678-9') is None
+        assert normalizar_rut('abc') is None
+        assert normalizar_rut('') is None
+        assert normalizar_rut(None) is None
+
+    def test_variantes(self):
+        """Un RUT puede estar guardado con o sin puntos"""
+        assert variantes_rut('12345678-5') == ('12345678-5', '12.345.678-5')
+
+
+class TestLectura:
+
+    def test_csv_punto_y_coma(self):
+        """Detecta el separador y normaliza los encabezados"""
+        filas = list(leer_csv(csv_bytes('﻿Nombre;RUT\nAna;11111111-1\n')))
+        assert filas == [{'nombre': 'Ana', 'rut': '11111111-1'}]
+
+    def test_csv_largo(self):
+        """Las filas que cruzan la muestra inicial se leen completas"""
+        texto = 'nombre,rut\n' + ''.join(f'Cliente {i},{rut(i + 1000)}\n' for i in range(2000))
+        filas = list(leer_csv(csv_bytes(texto)))
+        assert len(filas) == 2000
+        assert filas[-1] == {'nombre': 'Cliente 1999', 'rut': rut(2999)}
+
+    def test_xlsx(self, tmp_path):
+        """Lee la primera hoja y omite filas vacías"""
+        openpyxl = pytest.importorskip('openpyxl')
+        libro = openpyxl.Workbook()
+        hoja = libro.active
+        hoja.append(['Nombre', 'RUT'])
+        hoja.append(['Ana', '11111111-1'])
+        hoja.append([None, None])
+        ruta = tmp_path / 'clientes.xlsx'
+        libro.save(ruta)
+
+        assert list(leer_xlsx(str(ruta))) == [{'nombre': 'Ana', 'rut': '11111111-1'}]
+
+
+class TestImportar:
+
+    def test_clientes_con_errores_por_fila(self, client):
+        """Las filas inválidas se reportan y el resto se inserta"""
+        db.session.add(Cliente(nombre='Existente', rut='12.345.678-5'))
+        db.session.commit()
+        filas = [
+            {'nombre': 'Ana', 'rut': '11.111.111-1'},
+            {'nombre': 'Mal', 'rut': '11.111.111-2'},
+            {'nombre': 'Repetido', 'rut': '111111111'},
+            {'nombre': '', 'rut': '22222222-2'},
+            {'nombre': 'Existente', 'rut': '12345678-5'},
+            {'nombre': 'Pausa', 'rut': '33333333-3', 'estado': 'bloqueado'},
+        ]
+
+        resultado = importar('clientes', filas, tamaño_lote=2)
+
+        assert resultado.leidas == 6
+        assert resultado.insertadas == 1
+        assert [(e.fila, e.mensaje.split(':')[0]) for e in resultado.errores] == [
+            (3, 'RUT inválido'),
+            (4, 'RUT 11111111-1 repetido en el archivo'),
+            (5, 'Falta nombre'),
+            (6, 'Ya existe un cliente con RUT 12345678-5'),
+            (7, 'estado inválido'),
+        ]
+        assert Cliente.query.filter_by(rut='11111111-1').one().nombre == 'Ana'
+
+    def test_casos_resuelven_cliente(self, client):
+        """El cliente se busca por RUT, con o sin puntos en la base"""
+        db.session.add(Cliente(nombre='Ana', rut='11.111.111-1'))
+        db.session.commit()
+        filas = [
+            {'rut_cliente': '11111111-1', 'materia': 'Laboral', 'prioridad': 'Alta',
+             'fecha_inicio': '03/03/2025', 'numero_expediente': 'O-1-2025'},
+            {'rut_cliente': rut(5000), 'materia': 'Civil'},
+            {'rut_cliente': '11111111-1', 'materia': 'Civil', 'fecha_inicio': '2025-13-01'},
+        ]
+
+        resultado = importar('casos', filas)
+
+        assert resultado.insertadas == 1
+        assert [e.fila for e in resultado.errores] == [3, 4]
+        caso = Caso.query.one()
+        assert caso.prioridad == Prioridad.ALTA
+        assert caso.fecha_inicio == date(2025, 3, 3)
+        assert caso.cliente.nombre == 'Ana'
+
+    def test_plazos_calculan_vencimiento(self, client):
+        """Los vencimientos salen del calendario, con el tribunal del caso"""
+        cliente = Cliente(nombre='Ana', rut='11111111-1')
+        db.session.add(cliente)
+        db.session.commit()
+        db.session.add(Caso(cliente_id=cliente.id, materia='Civil', numero_expediente='C-1-2025'))
+        db.session.commit()
+        calendario = CalendarioChileno()
+        filas = [
+            {'numero_expediente': 'C-1-2025', 'titulo': f'Plazo {i}', 'dias': str(5 + i % 30),
+             'fecha_inicio': '2025-03-03', 'tipo': ('habil', 'judicial', 'corrido')[i % 3]}
+            for i in range(300)
+        ] + [{'numero_expediente': 'X-9', 'titulo': 'Huérfano', 'dias': '5', 'fecha_inicio': '2025-03-03'}]
+
+        resultado = importar('plazos', filas, calendario)
+
+        assert resultado.insertadas == 300
+        assert [e.mensaje for e in resultado.errores] == ['No existe un caso con expediente X-9']
+        for plazo in Plazo.query.all():
+            assert plazo.fecha_vencimiento == calendario.calcular_vencimiento(
+                plazo.fecha_inicio, plazo.dias, plazo.tipo.value
+            )
+        assert Plazo.query.filter_by(tipo=TipoPlazo.JUDICIAL).count() == 100
+
+    def test_expediente_ambiguo(self, client):
+        """Si dos casos comparten expediente, la fila se reporta en vez de elegir uno"""
+        cliente = Cliente(nombre='Ana', rut='11111111-1')
+        db.session.add(cliente)
+        db.session.commit()
+        for materia in ('Civil', 'Laboral'):
+            db.session.add(Caso(cliente_id=cliente.id, materia=materia, numero_expediente='C-1-2025'))
+        db.session.add(Caso(cliente_id=cliente.id, materia='Familia', numero_expediente='F-2-2025'))
+        db.session.commit()
+        filas = [
+            {'numero_expediente': 'C-1-2025', 'titulo': 'Ambiguo', 'dias': '5', 'fecha_inicio': '2025-03-03'},
+            {'numero_expediente': 'F-2-2025', 'titulo': 'Único', 'dias': '5', 'fecha_inicio': '2025-03-03'},
+        ]
+
+        resultado = importar('plazos', filas, CalendarioChileno())
+
+        assert resultado.insertadas == 1
+        assert [e.fila for e in resultado.errores] == [2]
+        assert resultado.errores[0].mensaje.startswith('Expediente ambiguo C-1-2025')
+        assert Plazo.query.one().titulo == 'Único'
+
+    def test_lote_rechazado_aisla_la_fila(self, client):
+        """Si la base rechaza un lote, entran las filas buenas y se reporta la culpable"""
+        # Restricción que la validación no conoce
+        db.session.execute(text('CREATE UNIQUE INDEX ix_cliente_email_prueba ON cliente (email)'))
+        db.session.commit()
+        filas = [{'nombre': f'Cliente {i}', 'rut': rut(1000 + i), 'email': f'c{i}@x.cl'} for i in range(10)]
+        filas[7]['email'] = filas[2]['email']
+
+        resultado = importar('clientes', filas, tamaño_lote=10)
+
+        assert resultado.insertadas == 9
+        assert [e.fila for e in resultado.errores] == [9]
+        assert 'IntegrityError' in resultado.errores[0].mensaje
+        assert Cliente.query.count() == 9
+
+    def test_tipo_desconocido(self, client):
+        with pytest.raises(ValueError):
+            importar('tareas', [])
+
+
+class TestApi:
+
+    def test_importar_csv(self, client):
+        """El endpoint recibe el archivo y devuelve el reporte"""
+        texto = f'nombre,rut\nAna,{rut(1001)}\nMal,123\n'
+        respuesta = client.post('/api/importar/clientes', data={
+            'archivo': (csv_bytes(texto), 'clientes.csv')
+        }, content_type='multipart/form-data')
+
+        assert respuesta.status_code == 201
+        datos = respuesta.get_json()
+        assert datos['insertadas'] == 1
+        assert datos['errores'] == [{'fila': 3, 'mensaje': 'RUT inválido: 123'}]
+
+    def test_formato_no_soportado(self, client):
+        respuesta = client.post('/api/importar/clientes', data={
+            'archivo': (csv_bytes(''), 'clientes.pdf')
+        }, content_type='multipart/form-data')
+        assert respuesta.status_code == 400
+
+    def test_sin_archivo(self, client):
+        assert client.post('/api/importar/clientes').status_code == 400
+        assert client.post('/api/importar/tareas').status_code == 404
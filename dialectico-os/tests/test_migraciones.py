@@ -0,0 +1,81 @@
+# Dialéctico OS - Tests de Migraciones
+# ====================================
+
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import inspect, text
+from src.app import app, db
+from src.migraciones import migrar, version_actual, MIGRACIONES, CLAVE_VERSION
+from src.models import Cliente, Caso, Plazo, Configuracion
+
+# ============ FIXTURES ============
+
+@pytest.fixture
+def client():
+    """Cliente de test para Flask"""
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+        db.drop_all()
+
+def indices(tabla):
+    """Nombres de los índices de una tabla"""
+    return {i['name'] for i in inspect(db.session.connection()).get_indexes(tabla)}
+
+# ============ TESTS ============
+
+class TestMigraciones:
+    
+    def test_aplica_todas_y_es_idempotente(self, client):
+        """Una base nueva queda en la última versión; repetir no hace nada"""
+        aplicadas = migrar()
+        assert aplicadas == [v for v, _, _ in MIGRACIONES]
+        assert version_actual() == MIGRACIONES[-1][0]
+        assert migrar() == []
+    
+    def test_crea_indices_en_base_existente(self, client):
+        """Una base creada antes de los índices los recibe al migrar"""
+        db.session.execute(text('DROP INDEX ix_plazo_vigentes'))
+        db.session.execute(text('DROP INDEX ix_tarea_pendientes'))
+        db.session.commit()
+        assert 'ix_plazo_vigentes' not in indices('plazo')
+        
+        migrar()
+        assert 'ix_plazo_vigentes' in indices('plazo')
+        assert 'ix_tarea_pendientes' in indices('tarea')
+        assert 'ix_caso_estado' in indices('caso')
+    
+    def test_vencidos_se_dan_por_notificados(self, client):
+        """Al agregar notificado_estado, los plazos ya vencidos quedan como avisados"""
+        cliente = Cliente(nombre='Historial', rut='66666666-6')
+        db.session.add(cliente)
+        db.session.commit()
+        caso = Caso(cliente_id=cliente.id, materia='Civil')
+        db.session.add(caso)
+        db.session.commit()
+        hoy = date.today()
+        for titulo, vencimiento in (('Viejo', hoy - timedelta(days=400)), ('Futuro', hoy + timedelta(days=3))):
+            db.session.add(Plazo(caso_id=caso.id, titulo=titulo, dias=5,
+                                 fecha_inicio=vencimiento - timedelta(days=5), fecha_vencimiento=vencimiento))
+        db.session.commit()
+        db.session.execute(text('ALTER TABLE plazo DROP COLUMN notificado_estado'))
+        Configuracion.set(CLAVE_VERSION, '6')
+        
+        assert migrar() == [7]
+        db.session.expire_all()
+        assert {p.titulo: p.notificado_estado for p in Plazo.query.all()} == {'Viejo': 'vencido', 'Futuro': None}
+    
+    def test_respeta_version_registrada(self, client):
+        """Las migraciones ya registradas no se repiten"""
+        Configuracion.set(CLAVE_VERSION, str(MIGRACIONES[-1][0]))
+        db.session.execute(text('DROP INDEX ix_caso_estado'))
+        db.session.commit()
+        assert migrar() == []
+        assert 'ix_caso_estado' not in indices('caso')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -6,7 +6,8 @@ from datetime import date, datetime, timedelta
 from src.models import (
     Cliente, Caso, Tarea, Plazo, Feriado, Configuracion,
     EstadoCliente, EstadoCaso, Prioridad, TipoPlazo,
-    db, contar_clientes, contar_casos, plazos_criticos, tareas_pendientes
+    db, contar_clientes, contar_casos, plazos_criticos, tareas_pendientes,
+    metricas_dashboard
 )
 from src.app import app
 
@@ -279,6 +280,22 @@ class TestPlazo:
         
         criticos = plazos_criticos()
         assert len(criticos) >= 1
+    
+    def test_plazos_criticos_limitados(self, client, sample_caso):
+        """El dashboard lista los primeros y cuenta el total aparte"""
+        for dias in range(5):
+            db.session.add(Plazo(
+                caso_id=sample_caso.id,
+                titulo=f"En {dias}",
+                tipo=TipoPlazo.CORRIDO,
+                dias=dias,
+                fecha_inicio=date.today(),
+                fecha_vencimiento=date.today() + timedelta(days=dias)
+            ))
+        db.session.commit()
+        
+        assert [p.titulo for p in plazos_criticos(limite=2)] == ["En 0", "En 1"]
+        assert metricas_dashboard()['total_plazos_criticos'] == 5
 
 # ============ TESTS TAREA ============
 
@@ -386,6 +403,26 @@ class TestFeriados:
         assert data['nombre'] == 'Año Nuevo'
         assert '2025' in data['fecha']
 
+# ============ TESTS MÉTRICAS ============
+
+class TestMetricas:
+    
+    def test_metricas_dashboard(self, client, sample_caso):
+        """Métricas agregadas en una consulta"""
+        archivado = Caso(cliente_id=sample_caso.cliente_id, materia="Familia",
+                         estado=EstadoCaso.ARCHIVADO)
+        db.session.add(archivado)
+        db.session.add(Tarea(caso_id=sample_caso.id, titulo="Pendiente"))
+        db.session.add(Tarea(caso_id=sample_caso.id, titulo="Lista", completado=True))
+        db.session.commit()
+        
+        assert metricas_dashboard() == {
+            'total_clientes': 1,
+            'casos_activos': 1,
+            'tareas_pendientes': 1,
+            'total_plazos_criticos': 0
+        }
+
 # ============ RUN TESTS ============
 
 if __name__ == '__main__':
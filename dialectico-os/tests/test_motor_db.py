@@ -0,0 +1,60 @@
+# Dialéctico OS - Tests de Configuración del Motor SQLite
+# =======================================================
+
+import pytest
+from sqlalchemy import create_engine, text
+from src.motor_db import opciones_motor, instalar_pragmas, es_memoria, BUSY_TIMEOUT_MS
+
+# ============ FIXTURES ============
+
+@pytest.fixture
+def motor(tmp_path):
+    """Motor sobre un archivo temporal con la configuración de la app"""
+    uri = f'sqlite:///{tmp_path / "test.db"}'
+    instalar_pragmas()
+    engine = create_engine(uri, **opciones_motor(uri))
+    yield engine
+    engine.dispose()
+
+def pragma(conexion, nombre):
+    return conexion.execute(text(f'PRAGMA {nombre}')).scalar()
+
+# ============ TESTS ============
+
+class TestMotorDB:
+    
+    def test_pragmas_en_conexion_nueva(self, motor):
+        """Cada conexión queda en WAL con synchronous=NORMAL y busy_timeout"""
+        with motor.connect() as conexion:
+            assert pragma(conexion, 'journal_mode') == 'wal'
+            assert pragma(conexion, 'synchronous') == 1  # NORMAL
+            assert pragma(conexion, 'busy_timeout') == BUSY_TIMEOUT_MS
+            assert pragma(conexion, 'cache_size') < 0
+    
+    def test_pool_dimensionado(self, motor):
+        """Las bases en archivo usan un pool con tamaño configurado"""
+        assert motor.pool.size() == opciones_motor(str(motor.url))['pool_size']
+    
+    def test_lector_no_bloquea_escritor(self, motor):
+        """Con WAL, una lectura abierta no impide escribir"""
+        with motor.begin() as conexion:
+            conexion.execute(text('CREATE TABLE t (x INTEGER)'))
+            conexion.execute(text('INSERT INTO t VALUES (1)'))
+        
+        with motor.connect() as lector, motor.connect() as escritor:
+            lector.execute(text('BEGIN'))
+            assert lector.execute(text('SELECT count(*) FROM t')).scalar() == 1
+            with escritor.begin():
+                escritor.execute(text('INSERT INTO t VALUES (2)'))
+            # El lector mantiene su snapshot
+            assert lector.execute(text('SELECT count(*) FROM t')).scalar() == 1
+            lector.rollback()
+    
+    def test_memoria_sin_opciones(self):
+        """Las bases en memoria conservan las opciones por defecto"""
+        assert es_memoria('sqlite:///:memory:')
+        assert opciones_motor('sqlite:///:memory:') == {}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,151 @@
+# Dialéctico OS - Tests de Paginación y JSON Lines
+# ================================================
+
+import json
+import pytest
+from datetime import date, timedelta
+from src.app import app, db
+from src.models import Cliente, Caso, Tarea, Plazo, Prioridad, TipoPlazo
+from src.paginacion import paginar, codificar_cursor, decodificar_cursor
+
+# ============ FIXTURES ============
+
+@pytest.fixture
+def client():
+    """Cliente de test para Flask"""
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+        db.drop_all()
+
+@pytest.fixture
+def sample_caso(client):
+    """Caso de prueba"""
+    cliente = Cliente(nombre="Paginado", rut="55555555-5")
+    caso = Caso(cliente=cliente, materia="Civil")
+    db.session.add(caso)
+    db.session.commit()
+    return caso
+
+@pytest.fixture
+def plazos(sample_caso):
+    """25 plazos en la próxima semana, varios con el mismo vencimiento"""
+    for i in range(25):
+        db.session.add(Plazo(
+            caso_id=sample_caso.id, titulo=f"Plazo {i}", tipo=TipoPlazo.HABIL, dias=5,
+            fecha_inicio=date.today(), fecha_vencimiento=date.today() + timedelta(days=i % 5)
+        ))
+    db.session.commit()
+
+# ============ TESTS CURSOR ============
+
+class TestCursor:
+    
+    def test_ida_y_vuelta(self):
+        """Un cursor reconstruye fechas, enums y enteros"""
+        claves = [Tarea.prioridad, Tarea.fecha_vencimiento, Tarea.id]
+        cursor = codificar_cursor([Prioridad.ALTA, date(2025, 3, 1), 42])
+        assert decodificar_cursor(cursor, claves) == [Prioridad.ALTA, date(2025, 3, 1), 42]
+    
+    def test_cursor_invalido(self):
+        """Un cursor corrupto es un ValueError"""
+        with pytest.raises(ValueError):
+            decodificar_cursor('no-es-un-cursor', [Plazo.id])
+        with pytest.raises(ValueError):
+            decodificar_cursor(codificar_cursor([1, 2]), [Plazo.id])
+
+# ============ TESTS PAGINACIÓN ============
+
+class TestPaginar:
+    
+    def test_recorre_todo_sin_repetir(self, plazos):
+        """Las páginas cubren todas las filas, en orden y sin repetir"""
+        claves = [Plazo.fecha_vencimiento, Plazo.id]
+        vistos, cursor = [], None
+        while True:
+            pagina, cursor = paginar(Plazo.query, claves, cursor, limite=7)
+            vistos.extend(pagina)
+            if cursor is None:
+                break
+        assert len(vistos) == 25
+        assert len({p.id for p in vistos}) == 25
+        orden = [(p.fecha_vencimiento, p.id) for p in vistos]
+        assert orden == sorted(orden)
+    
+    def test_descendente(self, plazos):
+        """Orden descendente por (creado, id)"""
+        pagina, cursor = paginar(Plazo.query, [Plazo.creado, Plazo.id], limite=20, descendente=True)
+        resto, fin = paginar(Plazo.query, [Plazo.creado, Plazo.id], cursor, limite=20, descendente=True)
+        ids = [p.id for p in pagina + resto]
+        assert fin is None
+        assert ids == sorted(ids, reverse=True)
+    
+    def test_claves_con_nulos(self, sample_caso):
+        """Tareas sin vencimiento se paginan con la clave coalesce"""
+        for i in range(9):
+            db.session.add(Tarea(
+                caso_id=sample_caso.id, titulo=f"T{i}", prioridad=Prioridad.MEDIA,
+                fecha_vencimiento=None if i % 3 == 0 else date(2025, 1, 1 + i)
+            ))
+        db.session.commit()
+        claves = [Tarea.prioridad, db.func.coalesce(Tarea.fecha_vencimiento, date.max), Tarea.id]
+        vistos, cursor = [], None
+        while True:
+            pagina, cursor = paginar(Tarea.query, claves, cursor, limite=2)
+            vistos.extend(t.id for t in pagina)
+            if cursor is None:
+                break
+        assert sorted(vistos) == list(range(1, 10))
+
+# ============ TESTS RUTAS ============
+
+class TestRutasPaginadas:
+    
+    def test_api_plazos_paginada(self, client, plazos):
+        """La API entrega el cursor siguiente en una cabecera"""
+        response = client.get('/api/plazos?limite=10')
+        assert len(response.get_json()) == 10
+        cursor = response.headers['X-Siguiente-Cursor']
+        
+        ids = [p['id'] for p in response.get_json()]
+        while cursor:
+            response = client.get(f'/api/plazos?limite=10&cursor={cursor}')
+            ids.extend(p['id'] for p in response.get_json())
+            cursor = response.headers.get('X-Siguiente-Cursor')
+        assert sorted(ids) == list(range(1, 26))
+    
+    def test_api_plazos_jsonl(self, client, plazos):
+        """Modo JSON Lines: una fila por línea, sin paginar"""
+        response = client.get('/api/plazos?formato=jsonl')
+        assert response.mimetype == 'application/x-ndjson'
+        lineas = response.get_data(as_text=True).splitlines()
+        assert len(lineas) == 25
+        assert json.loads(lineas[0])['titulo'].startswith('Plazo')
+    
+    def test_cursor_invalido_400(self, client, plazos):
+        response = client.get('/api/plazos?cursor=xyz')
+        assert response.status_code == 400
+    
+    def test_clientes_enlace_siguiente(self, client):
+        """La lista HTML enlaza la página siguiente conservando filtros"""
+        for i in range(3):
+            db.session.add(Cliente(nombre=f"Cliente {i}", rut=f"6666666{i}-6"))
+        db.session.commit()
+        response = client.get('/clientes?limite=2')
+        assert response.status_code == 200
+        assert b'Cliente 1' in response.data
+        assert b'Cliente 2' not in response.data
+        assert b'limite=2' in response.data and b'cursor=' in response.data
+    
+    def test_tareas_jsonl(self, client, sample_caso):
+        db.session.add(Tarea(caso_id=sample_caso.id, titulo="Exportada"))
+        db.session.commit()
+        response = client.get('/tareas?formato=jsonl')
+        assert json.loads(response.get_data(as_text=True))['titulo'] == "Exportada"
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
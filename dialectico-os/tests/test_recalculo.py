@@ -0,0 +1,138 @@
+# Dialéctico OS - Tests del Recálculo de Plazos
+# =============================================
+
+import pytest
+from datetime import date
+from src.app import app, db
+from src.models import Cliente, Caso, Plazo, TipoPlazo
+from src.deadlines import CalendarioChileno
+from src.recalculo import recalcular_plazos, recalcular_por_feriado, recalcular_por_suspension
+
+# ============ FIXTURES ============
+
+@pytest.fixture
+def client():
+    """Cliente de test para Flask"""
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+        db.drop_all()
+
+@pytest.fixture
+def calendario():
+    """Calendario de prueba"""
+    return CalendarioChileno()
+
+@pytest.fixture
+def sample_caso(client):
+    """Caso de prueba"""
+    cliente = Cliente(nombre="Recálculo", rut="44444444-4")
+    db.session.add(cliente)
+    db.session.commit()
+    caso = Caso(cliente_id=cliente.id, materia="Civil")
+    db.session.add(caso)
+    db.session.commit()
+    return caso
+
+def crear_plazo(calendario, caso, inicio, dias, tipo=TipoPlazo.HABIL):
+    """Crear plazo con el vencimiento calculado por el calendario"""
+    plazo = Plazo(
+        caso_id=caso.id,
+        titulo=f"Plazo {inicio}",
+        tipo=tipo,
+        dias=dias,
+        fecha_inicio=inicio,
+        fecha_vencimiento=calendario.calcular_vencimiento(inicio, dias, tipo.value)
+    )
+    db.session.add(plazo)
+    db.session.commit()
+    return plazo
+
+# ============ TESTS ============
+
+class TestRecalculo:
+    
+    def test_sin_cambios_no_actualiza(self, calendario, sample_caso):
+        """Si los feriados no cambian, ninguna fila se modifica"""
+        crear_plazo(calendario, sample_caso, date(2025, 3, 3), 10)
+        resultado = recalcular_plazos(calendario)
+        assert resultado.revisados == 1
+        assert resultado.actualizados == 0
+    
+    def test_nuevo_feriado_mueve_plazos_afectados(self, calendario, sample_caso):
+        """Un feriado dentro de la ventana posterga el vencimiento"""
+        afectado = crear_plazo(calendario, sample_caso, date(2025, 3, 3), 10)
+        anterior = crear_plazo(calendario, sample_caso, date(2025, 1, 6), 5)
+        corrido = crear_plazo(calendario, sample_caso, date(2025, 3, 3), 10, TipoPlazo.CORRIDO)
+        vencimiento_original = afectado.fecha_vencimiento
+        afectado.notificado_estado = 'critico'
+        db.session.commit()
+        
+        feriado = date(2025, 3, 10)
+        calendario.agregar_feriado(feriado, "Feriado test")
+        resultado = recalcular_por_feriado(calendario, feriado)
+        
+        assert resultado.revisados == 1
+        assert resultado.actualizados == 1
+        db.session.expire_all()
+        assert db.session.get(Plazo, afectado.id).fecha_vencimiento > vencimiento_original
+        assert db.session.get(Plazo, afectado.id).fecha_vencimiento == \
+            calendario.calcular_vencimiento(date(2025, 3, 3), 10, 'habil')
+        assert db.session.get(Plazo, anterior.id).fecha_vencimiento == date(2025, 1, 13)
+        assert db.session.get(Plazo, corrido.id).fecha_vencimiento == date(2025, 3, 13)
+        # Con el nuevo vencimiento se vuelve a notificar
+        assert db.session.get(Plazo, afectado.id).notificado_estado is None
+    
+    def test_lotes(self, calendario, sample_caso):
+        """Todas las filas se recorren aunque excedan el tamaño de lote"""
+        for dia in range(1, 11):
+            crear_plazo(calendario, sample_caso, date(2025, 4, dia), 20)
+        calendario.agregar_feriado(date(2025, 4, 28), "Feriado test")
+        resultado = recalcular_plazos(calendario, date(2025, 4, 28), tamaño_lote=3)
+        assert resultado.revisados == 10
+        assert resultado.actualizados == 10
+    
+    def test_plazo_suspendido(self, calendario, sample_caso):
+        """Los días de suspensión se suman al recalcular"""
+        plazo = crear_plazo(calendario, sample_caso, date(2025, 3, 3), 10)
+        plazo.suspendido = True
+        plazo.dias_suspension = 2
+        db.session.commit()
+        recalcular_plazos(calendario)
+        db.session.expire_all()
+        assert db.session.get(Plazo, plazo.id).fecha_vencimiento == \
+            calendario.calcular_vencimiento(date(2025, 3, 3), 12, 'habil')
+
+
+class TestRecalculoSuspensiones:
+    
+    def test_suspension_de_tribunal(self, calendario, sample_caso):
+        """Solo se recalculan los plazos del tribunal que corren en el período"""
+        sample_caso.tribunal = 'Juzgado A'
+        otro = Caso(cliente_id=sample_caso.cliente_id, materia="Civil", tribunal='Juzgado B')
+        db.session.add(otro)
+        db.session.commit()
+        
+        afectado = crear_plazo(calendario, sample_caso, date(2025, 3, 3), 10)
+        corrido = crear_plazo(calendario, sample_caso, date(2025, 3, 3), 10, TipoPlazo.CORRIDO)
+        anterior = crear_plazo(calendario, sample_caso, date(2025, 1, 6), 5)
+        de_otro_tribunal = crear_plazo(calendario, otro, date(2025, 3, 3), 10)
+        
+        calendario.agregar_suspension(date(2025, 3, 10), date(2025, 3, 14), tribunal='Juzgado A')
+        resultado = recalcular_por_suspension(calendario, date(2025, 3, 10), date(2025, 3, 14), 'Juzgado A')
+        
+        assert resultado.revisados == 2
+        assert resultado.actualizados == 2
+        db.session.expire_all()
+        assert db.session.get(Plazo, afectado.id).fecha_vencimiento == \
+            calendario.calcular_vencimiento(date(2025, 3, 3), 10, 'habil', tribunal='Juzgado A')
+        assert db.session.get(Plazo, corrido.id).fecha_vencimiento == date(2025, 3, 18)
+        assert db.session.get(Plazo, anterior.id).fecha_vencimiento == date(2025, 1, 13)
+        assert db.session.get(Plazo, de_otro_tribunal.id).fecha_vencimiento == date(2025, 3, 17)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
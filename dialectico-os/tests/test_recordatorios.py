@@ -0,0 +1,221 @@
+# Dialéctico OS - Tests de Recordatorios de Tareas
+# ================================================
+
+import asyncio
+import json
+import pytest
+from datetime import date, timedelta
+from src.app import app, db
+from src.models import Cliente, Caso, Tarea, Configuracion
+from src.recordatorios import (
+    enviar_recordatorios, resumenes_pendientes, despachar,
+    Destino, DestinoBloqueante, DestinoWhatsApp, DestinoCorreo, Resumen,
+    CLAVE_DIAS_RECORDATORIO, SIN_RESPONSABLE
+)
+
+HOY = date(2025, 6, 2)
+
+# ============ FIXTURES ============
+
+@pytest.fixture
+def client():
+    """Cliente de test para Flask"""
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+
+    with app.app_context():
+        db.create_all()
+        yield app.test_client()
+        db.drop_all()
+
+@pytest.fixture
+def sample_caso(client):
+    """Caso de prueba"""
+    cliente = Cliente(nombre="Recordatorios", rut="66666666-6")
+    db.session.add(cliente)
+    db.session.commit()
+    caso = Caso(cliente_id=cliente.id, materia="Familia")
+    db.session.add(caso)
+    db.session.commit()
+    return caso
+
+class DestinoMemoria(Destino):
+    """Guarda los resúmenes; falla las primeras `fallas` veces por responsable"""
+
+    nombre = 'memoria'
+
+    def __init__(self, fallas: int = 0):
+        self.fallas = fallas
+        self.intentos = {}
+        self.recibidos = []
+
+    async def enviar(self, resumen):
+        self.intentos[resumen.responsable] = self.intentos.get(resumen.responsable, 0) + 1
+        if self.intentos[resumen.responsable] <= self.fallas:
+            raise ConnectionError("sin conexión")
+        self.recibidos.append(resumen)
+
+def crear_tarea(caso, dias, responsable=None, **campos):
+    tarea = Tarea(
+        caso_id=caso.id,
+        titulo=f"{responsable} en {dias}",
+        fecha_vencimiento=HOY + timedelta(days=dias),
+        responsable=responsable,
+        **campos
+    )
+    db.session.add(tarea)
+    db.session.commit()
+    return tarea
+
+def enviar(destino, **opciones):
+    return enviar_recordatorios(destino, hoy=HOY, espera_base=0, **opciones)
+
+# ============ TESTS ============
+
+class TestResumenes:
+
+    def test_agrupa_por_responsable(self, sample_caso):
+        """Solo tareas abiertas dentro de la ventana, una lista por responsable"""
+        crear_tarea(sample_caso, 0, 'Ana')
+        crear_tarea(sample_caso, 2, 'Ana')
+        crear_tarea(sample_caso, 1, 'Beto')
+        crear_tarea(sample_caso, 1)
+        crear_tarea(sample_caso, 3, 'Ana')
+        crear_tarea(sample_caso, -1, 'Ana')
+        crear_tarea(sample_caso, 1, 'Ana', completado=True)
+
+        resumenes = {r.responsable: r for r in resumenes_pendientes(HOY)}
+
+        assert set(resumenes) == {'Ana', 'Beto', SIN_RESPONSABLE}
+        assert [t.titulo for t in resumenes['Ana'].tareas] == ['Ana en 0', 'Ana en 2']
+        assert resumenes['Ana'].titulo == 'Tareas por vencer · Ana (2)'
+        assert '02/06/2025 · Ana en 0 · Familia' in resumenes['Ana'].mensaje()
+
+    def test_ventana_configurable(self, sample_caso):
+        Configuracion.set(CLAVE_DIAS_RECORDATORIO, '5')
+        crear_tarea(sample_caso, 4, 'Ana')
+        assert len(resumenes_pendientes(HOY)) == 1
+
+
+class TestEnvio:
+
+    def test_idempotente(self, sample_caso):
+        """Una tarea recordada no vuelve a enviarse, ni tras reiniciar"""
+        crear_tarea(sample_caso, 1, 'Ana')
+        crear_tarea(sample_caso, 2, 'Beto')
+        destino = DestinoMemoria()
+
+        resultado = enviar(destino)
+        assert resultado.enviados == 2
+        assert resultado.tareas == 2
+
+        otra_vez = enviar(DestinoMemoria())
+        assert otra_vez.enviados == 0
+        assert resumenes_pendientes(HOY) == []
+
+    def test_nuevo_vencimiento_se_recuerda(self, sample_caso):
+        tarea = crear_tarea(sample_caso, 2, 'Ana')
+        enviar(DestinoMemoria())
+
+        tarea.fecha_vencimiento = HOY + timedelta(days=1)
+        db.session.commit()
+
+        assert enviar(DestinoMemoria()).enviados == 1
+
+    def test_reintentos(self, sample_caso):
+        """Los errores transitorios se reintentan y cuentan en el resultado"""
+        crear_tarea(sample_caso, 1, 'Ana')
+        destino = DestinoMemoria(fallas=2)
+
+        resultado = enviar(destino)
+
+        assert resultado.enviados == 1
+        assert resultado.intentos == 3
+        assert destino.intentos == {'Ana': 3}
+
+    def test_agotados_quedan_pendientes(self, sample_caso):
+        crear_tarea(sample_caso, 1, 'Ana')
+        crear_tarea(sample_caso, 1, 'Beto')
+
+        class FallaAna(DestinoMemoria):
+            async def enviar(self, resumen):
+                if resumen.responsable == 'Ana':
+                    raise ConnectionError("rechazado")
+                await super().enviar(resumen)
+
+        resultado = enviar(FallaAna(), reintentos=2)
+
+        assert resultado.enviados == 1
+        assert resultado.fallidos == ['Ana']
+        assert [r.responsable for r in resumenes_pendientes(HOY)] == ['Ana']
+
+    def test_no_modifica_actualizado(self, sample_caso):
+        tarea = crear_tarea(sample_caso, 1, 'Ana')
+        antes = tarea.actualizado
+        enviar(DestinoMemoria())
+        db.session.refresh(tarea)
+        assert tarea.actualizado == antes
+        assert tarea.recordado_para == tarea.fecha_vencimiento
+
+
+class TestDespacho:
+
+    def test_envios_concurrentes(self):
+        """Los workers envían en paralelo y el resultado respeta el orden"""
+        activos, maximo = 0, 0
+
+        class Lento(Destino):
+            async def enviar(self, resumen):
+                nonlocal activos, maximo
+                activos += 1
+                maximo = max(maximo, activos)
+                await asyncio.sleep(0.01)
+                activos -= 1
+
+        resumenes = [Resumen(f'R{i}', []) for i in range(8)]
+        resultados = asyncio.run(despachar(resumenes, Lento(), workers=4))
+
+        assert maximo == 4
+        assert [r[0].responsable for r in resultados] == [f'R{i}' for i in range(8)]
+        assert all(entregado for _, entregado, _ in resultados)
+
+
+class TestDestinos:
+
+    def test_destino_incompleto_falla_al_crearlo(self):
+        """Sin `enviar` (o `entregar` en los bloqueantes) no se puede instanciar"""
+        class SinEnviar(Destino):
+            pass
+
+        class SinEntregar(DestinoBloqueante):
+            pass
+
+        for clase in (SinEnviar, SinEntregar):
+            with pytest.raises(TypeError):
+                clase()
+
+    def test_whatsapp_no_duplica(self, sample_caso, tmp_path):
+        crear_tarea(sample_caso, 1, 'Ana')
+        ruta = tmp_path / 'pending_messages.json'
+        ruta.write_text(json.dumps([{'to': '+56900000000', 'message': 'otro'}]))
+        destino = DestinoWhatsApp('+56911111111', {'Ana': '+56922222222'}, ruta=ruta)
+        resumen = resumenes_pendientes(HOY)[0]
+
+        destino.entregar(resumen)
+        destino.entregar(resumen)
+
+        mensajes = json.loads(ruta.read_text())
+        assert len(mensajes) == 2
+        assert mensajes[1]['to'] == '+56922222222'
+        assert mensajes[1]['message'].startswith('Tareas por vencer · Ana (1)')
+
+    def test_correo(self, sample_caso, tmp_path):
+        crear_tarea(sample_caso, 1, 'Ana')
+
+        resultado = enviar(DestinoCorreo(str(tmp_path), correos={'Ana': 'ana@estudio.cl'}))
+
+        archivos = list(tmp_path.glob('*.eml'))
+        assert resultado.enviados == 1
+        assert len(archivos) == 1
+        contenido = archivos[0].read_text()
+        assert 'To: ana@estudio.cl' in contenido
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Dialéctico OS - Punto de Entrada WSGI
+=====================================
+
+Para servidores de producción:
+
+    CACHE_RESPUESTAS=sqlite gunicorn -w 4 -b 0.0.0.0:8080 wsgi:app
+
+o simplemente `python3 run.py --produccion` (que ya usa la caché SQLite,
+compartida entre workers, salvo que CACHE_RESPUESTAS diga otra cosa).
+"""
+
+import os
+import sys
+
+# Agregar la raíz del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.app import app
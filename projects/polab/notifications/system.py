@@ -8,13 +8,14 @@ import json
 
 class NotificationSystem:
     def __init__(self, workspace: str = "~/.openclaw/workspace"):
-        self.workspace = Path(workspace)
+        self.workspace = Path(workspace).expanduser()
         self.notifications_dir = self.workspace / "projects/polab/data/notifications"
         self.notifications_dir.mkdir(parents=True, exist_ok=True)
     
     def send(self, title: str, message: str, type: str = "info", priority: str = "normal") -> str:
         notification = {
-            "id": f"notif_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            # Microsegundos: varios envíos en el mismo segundo no se pisan
+            "id": f"notif_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}",
             "title": title,
             "message": message,
             "type": type,
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Backtester - PauloARIS Trading Bot
+Replays historical OHLCV candles or ticks through MarketMakerBot
+Simulated clock, no sleeping, no network
+"""
+
+import os
+import csv
+import json
+import time
+import logging
+import argparse
+from datetime import datetime, timezone
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from market_maker import MarketMakerBot, TradingMode, Order
+
+# Column names accepted for each field (first match wins)
+TIMESTAMP_COLUMNS = ('timestamp', 'time', 'open_time', 'date', 'datetime')
+PRICE_COLUMNS = ('price', 'close')
+
+# Timestamps above this are epoch milliseconds (Binance klines), not seconds
+EPOCH_MS_THRESHOLD = 10_000_000_000
+
+logger = logging.getLogger('Backtester')
+
+# (timestamp, open, high, low, close); ticks have open == high == low == close
+Candle = Tuple[datetime, float, float, float, float]
+
+
+class SimulatedClock:
+    """Clock advanced by the backtester, passed to the bot as `clock`"""
+
+    def __init__(self, start: Optional[datetime] = None):
+        self.now = start or datetime(1970, 1, 1)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+@dataclass
+class BacktestResult:
+    initial_value: float
+    final_value: float
+    candles: int = 0
+    ticks: int = 0
+    seconds: float = 0.0
+    max_drawdown_pct: float = 0.0
+    equity_curve: List[Tuple[datetime, float]] = field(default_factory=list)
+    fills: List[Order] = field(default_factory=list)
+
+    @property
+    def pnl(self) -> float:
+        return self.final_value - self.initial_value
+
+    @property
+    def pnl_pct(self) -> float:
+        return (self.pnl / self.initial_value) * 100
+
+    def to_dict(self):
+        return {
+            'initial_value': self.initial_value,
+            'final_value': self.final_value,
+            'pnl': self.pnl,
+            'pnl_pct': self.pnl_pct,
+            'max_drawdown_pct': self.max_drawdown_pct,
+            'fills': len(self.fills),
+            'fees': sum(o.fee for o in self.fills),
+            'candles': self.candles,
+            'ticks': self.ticks,
+            'seconds': self.seconds
+        }
+
+    def save(self, out_dir: str):
+        """Write summary.json, equity.csv and fills.csv to `out_dir`"""
+        os.makedirs(out_dir, exist_ok=True)
+
+        with open(os.path.join(out_dir, 'summary.json'), 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+        with open(os.path.join(out_dir, 'equity.csv'), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['timestamp', 'equity'])
+            writer.writerows((ts.isoformat(), f"{value:.2f}") for ts, value in self.equity_curve)
+
+        with open(os.path.join(out_dir, 'fills.csv'), 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['id', 'type', 'status', 'price', 'quantity', 'timestamp', 'fee'])
+            writer.writeheader()
+            writer.writerows(o.to_dict() for o in self.fills)
+
+
+# ============ DATA ============
+
+def parse_timestamp(value) -> datetime:
+    """Epoch seconds, epoch milliseconds or ISO 8601 to naive UTC datetime"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+
+    if number > EPOCH_MS_THRESHOLD:
+        number /= 1000
+    return datetime.fromtimestamp(number, timezone.utc).replace(tzinfo=None)
+
+
+def _pick(columns: Iterable[str], names: Tuple[str, ...]) -> Optional[str]:
+    lowered = {c.lower().strip(): c for c in columns}
+    for name in names:
+        if name in lowered:
+            return lowered[name]
+    return None
+
+
+def _rows_to_candles(rows: Iterable[dict], columns: List[str]) -> Iterator[Candle]:
+    ts_col = _pick(columns, TIMESTAMP_COLUMNS)
+    if ts_col is None:
+        raise ValueError(f"No timestamp column in {columns}")
+
+    ohlc = [_pick(columns, (name,)) for name in ('open', 'high', 'low', 'close')]
+    if all(ohlc):
+        o_col, h_col, l_col, c_col = ohlc
+        for row in rows:
+            yield (parse_timestamp(row[ts_col]), float(row[o_col]), float(row[h_col]),
+                   float(row[l_col]), float(row[c_col]))
+        return
+
+    price_col = _pick(columns, PRICE_COLUMNS)
+    if price_col is None:
+        raise ValueError(f"Need open/high/low/close or price columns, got {columns}")
+    for row in rows:
+        price = float(row[price_col])
+        yield (parse_timestamp(row[ts_col]), price, price, price, price)
+
+
+def load_candles(path: str) -> List[Candle]:
+    """
+    Load OHLCV candles or ticks from CSV or Parquet.
+
+    Columns are matched by name (case-insensitive): a timestamp column
+    (timestamp/time/open_time/date) plus open/high/low/close, or a single
+    price column for tick files. Extra columns (volume...) are ignored.
+    Parquet needs pandas + pyarrow.
+    """
+    if path.endswith('.parquet'):
+        try:
+            import pandas as pd
+        except ImportError:
+            raise RuntimeError("Parquet files need pandas and pyarrow: pip install pandas pyarrow")
+        frame = pd.read_parquet(path)
+        candles = list(_rows_to_candles(frame.to_dict('records'), list(frame.columns)))
+    else:
+        with open(path, newline='') as f:
+            reader = csv.DictReader(f)
+            candles = list(_rows_to_candles(reader, reader.fieldnames or []))
+
+    candles.sort(key=lambda c: c[0])
+    return candles
+
+
+def candle_path(candle: Candle) -> Tuple[float, ...]:
+    """
+    Intrabar price path: open, then the extreme nearer the close last.
+    Bullish candles go open → low → high → close, bearish ones
+    open → high → low → close.
+    """
+    _, o, h, l, c = candle
+    if o == h == l == c:
+        return (c,)
+    if c >= o:
+        return (o, l, h, c)
+    return (o, h, l, c)
+
+
+# ============ BACKTEST ============
+
+class Backtester:
+    """Drive MarketMakerBot.step() over historical data with a simulated clock"""
+
+    def __init__(self, equity_every: int = 1, quiet: bool = True):
+        self.equity_every = max(1, equity_every)
+        self.quiet = quiet
+
+    def run(self, candles: List[Candle]) -> BacktestResult:
+        if not candles:
+            raise ValueError("No candles to backtest")
+
+        bot_logger = logging.getLogger('MarketMakerBot')
+        previous_level = bot_logger.level
+        if self.quiet:
+            # Per-fill INFO logs dominate runtime over a year of candles
+            bot_logger.setLevel(logging.WARNING)
+
+        start = time.perf_counter()
+        try:
+            clock = SimulatedClock(candles[0][0])
+            bot = MarketMakerBot(mode=TradingMode.PAPER, clock=clock)
+            initial_value = bot.balance_usdt
+            result = BacktestResult(initial_value=initial_value, final_value=initial_value)
+            peak = initial_value
+
+            for i, candle in enumerate(candles):
+                clock.now = candle[0]
+                for price in candle_path(candle):
+                    result.fills.extend(bot.step(price))
+                    result.ticks += 1
+
+                equity = bot.balance_usdt + bot.balance_btc * bot.current_price
+                peak = max(peak, equity)
+                result.max_drawdown_pct = max(result.max_drawdown_pct, (peak - equity) / peak * 100)
+                if i % self.equity_every == 0:
+                    result.equity_curve.append((candle[0], equity))
+        finally:
+            bot_logger.setLevel(previous_level)
+
+        result.candles = len(candles)
+        result.final_value = bot.balance_usdt + bot.balance_btc * bot.current_price
+        result.seconds = time.perf_counter() - start
+        return result
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Backtest MarketMakerBot over a CSV/Parquet price file')
+    parser.add_argument('path', help='CSV or Parquet file with OHLCV candles or ticks')
+    parser.add_argument('--out', help='Directory for summary.json, equity.csv and fills.csv')
+    parser.add_argument('--equity-every', type=int, default=1, help='Record equity every N candles')
+    parser.add_argument('--verbose', action='store_true', help='Keep bot INFO logs')
+    args = parser.parse_args()
+
+    candles = load_candles(args.path)
+    result = Backtester(equity_every=args.equity_every, quiet=not args.verbose).run(candles)
+
+    print("\n" + "="*60)
+    print("📊 BACKTEST - MarketMakerBot")
+    print("="*60)
+    print(f"📁 Data: {args.path}")
+    print(f"🕐 Range: {candles[0][0]} → {candles[-1][0]} ({result.candles} candles, {result.ticks} ticks)")
+    print(f"💰 Final value: ${result.final_value:.2f}")
+    print(f"📈 PnL: ${result.pnl:.2f} ({result.pnl_pct:+.2f}%)")
+    print(f"📉 Max drawdown: {result.max_drawdown_pct:.2f}%")
+    print(f"🔁 Fills: {len(result.fills)}")
+    print(f"⏱️  Time: {result.seconds:.2f}s")
+
+    if args.out:
+        result.save(args.out)
+        print(f"💾 Results saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,11 @@ import hmac
 import hashlib
 import logging
 import json
+import threading
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Dict, List
 
 # Configuration
 API_KEY = os.getenv('BINANCE_API_KEY', '')
@@ -23,7 +25,31 @@ TESTNET_URL = 'https://testnet.binance.vision'
 # Rate limits (Binance)
 REQUESTS_PER_MINUTE = 1200
 REQUESTS_PER_SECOND = 20
-REQUEST_WEIGHT = 2400
+REQUEST_WEIGHT = 2400  # Weight per minute
+
+# Client-side throttling
+WEIGHT_SAFETY = 0.9  # Use at most 90% of the weight budget
+POOL_SIZE = 10  # Keep-alive connections per host
+USED_WEIGHT_HEADER = 'X-MBX-USED-WEIGHT-1M'
+
+# Request weight per (method, endpoint); anything else weighs DEFAULT_WEIGHT
+DEFAULT_WEIGHT = 1
+ENDPOINT_WEIGHTS = {
+    ('GET', '/api/v3/account'): 20,
+    ('GET', '/api/v3/account/status'): 1,
+    ('GET', '/api/v3/ticker/price'): 2,
+    ('GET', '/api/v3/exchangeInfo'): 20,
+    ('GET', '/api/v3/openOrders'): 6,
+    ('GET', '/api/v3/order'): 4,
+    ('POST', '/api/v3/order'): 1,
+    ('POST', '/api/v3/order/test'): 1,
+    ('DELETE', '/api/v3/order'): 1,
+}
+# Weight when the symbol parameter is omitted (all symbols)
+ALL_SYMBOLS_WEIGHTS = {
+    ('GET', '/api/v3/ticker/price'): 4,
+    ('GET', '/api/v3/openOrders'): 80,
+}
 
 # Logging setup
 logging.basicConfig(
@@ -33,14 +59,121 @@ logging.basicConfig(
 logger = logging.getLogger('BinanceAPI')
 
 
+def request_weight(method: str, endpoint: str, params: Optional[Dict] = None) -> int:
+    """Binance request weight of a call"""
+    key = (method, endpoint)
+    if key in ALL_SYMBOLS_WEIGHTS and not (params or {}).get('symbol'):
+        return ALL_SYMBOLS_WEIGHTS[key]
+    return ENDPOINT_WEIGHTS.get(key, DEFAULT_WEIGHT)
+
+
+class TokenBucket:
+    """Token bucket: `capacity` tokens, refilled continuously over `period` seconds"""
+    
+    def __init__(self, capacity: float, period: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+    
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available"""
+        self._refill()
+        return max(0.0, (min(amount, self.capacity) - self.tokens) / self.rate)
+    
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+    
+    def limit_used(self, used: float):
+        """Align with the server's count: at most capacity - used tokens left"""
+        self._refill()
+        self.tokens = min(self.tokens, self.capacity - used)
+
+
+class RateLimiter:
+    """
+    Client-side limiter for the Binance REST limits.
+    
+    Three token buckets (weight per minute, requests per minute, requests
+    per second) are checked before every request, so calls are delayed
+    instead of rejected. The weight bucket follows the exchange's own count
+    from the X-MBX-USED-WEIGHT-1M header, which includes weight spent by
+    other clients on the same IP. A 418/429 Retry-After pauses every caller.
+    Thread-safe.
+    """
+    
+    def __init__(self, weight_per_minute: int = REQUEST_WEIGHT, requests_per_minute: int = REQUESTS_PER_MINUTE,
+                 requests_per_second: int = REQUESTS_PER_SECOND, safety: float = WEIGHT_SAFETY,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.weight = TokenBucket(weight_per_minute * safety, 60, clock)
+        self.requests_minute = TokenBucket(requests_per_minute * safety, 60, clock)
+        self.requests_second = TokenBucket(requests_per_second, 1, clock)
+        self.clock = clock
+        self.sleep = sleep
+        self.blocked_until = 0.0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+    
+    def acquire(self, weight: int = DEFAULT_WEIGHT):
+        """Block until a request of `weight` fits in every bucket, then spend it"""
+        with self._lock:
+            while True:
+                delay = max(
+                    self.blocked_until - self.clock(),
+                    self.weight.wait_time(weight),
+                    self.requests_minute.wait_time(1),
+                    self.requests_second.wait_time(1)
+                )
+                # Tolerate float residue after a sleep that refilled exactly enough
+                if delay <= 1e-6:
+                    break
+                # Holding the lock while sleeping keeps callers in FIFO-ish order
+                self.sleep(delay)
+                self.waited += delay
+            self.weight.take(weight)
+            self.requests_minute.take(1)
+            self.requests_second.take(1)
+    
+    def update(self, headers):
+        """Sync with the used-weight header of a response"""
+        used = headers.get(USED_WEIGHT_HEADER)
+        if used is not None:
+            with self._lock:
+                self.weight.limit_used(float(used))
+    
+    def pause(self, seconds: float):
+        """Stop all requests for `seconds` (Retry-After)"""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+
 class BinanceAPI:
     """Binance REST API client"""
     
-    def __init__(self, api_key: str, api_secret: str, testnet: bool = False):
+    def __init__(self, api_key: str, api_secret: str, testnet: bool = False,
+                 limiter: Optional[RateLimiter] = None):
         self.api_key = api_key
         self.api_secret = api_secret
         self.testnet = testnet
         self.base_url = TESTNET_URL if testnet else BASE_URL
+        self.limiter = limiter or RateLimiter()
+        
+        # One pooled keep-alive session for every call (no new TCP/TLS handshake per request)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'X-MBX-APIKEY': self.api_key,
+            'Content-Type': 'application/json'
+        })
         
         logger.info(f"Binance API {'Testnet' if testnet else 'Mainnet'} initialized")
     
@@ -60,10 +193,7 @@ class BinanceAPI:
                     params: Optional[Dict] = None, data: Optional[Dict] = None) -> Dict:
         """Make HTTP request to Binance API with retry logic"""
         url = f"{self.base_url}{endpoint}"
-        headers = {
-            'X-MBX-APIKEY': self.api_key,
-            'Content-Type': 'application/json'
-        }
+        headers = {}
         
         # Add signature if required
         if signed:
@@ -76,27 +206,28 @@ class BinanceAPI:
             headers['X-MBX-SIGNATURE'] = signature
             headers['X-MBX-TIMESTAMP'] = str(timestamp)
         
+        weight = request_weight(method, endpoint, params)
+        
         # Retry logic
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                if method == 'GET':
-                    response = requests.get(url, headers=headers, params=params, timeout=10)
-                elif method == 'POST':
-                    response = requests.post(url, headers=headers, params=params, json=data, timeout=10)
-                elif method == 'DELETE':
-                    response = requests.delete(url, headers=headers, params=params, timeout=10)
+                # Throttle before sending rather than after a 429
+                self.limiter.acquire(weight)
+                response = self.session.request(method, url, headers=headers, params=params,
+                                                json=data if method == 'POST' else None, timeout=10)
+                self.limiter.update(response.headers)
                 
                 # Check rate limits
                 if response.status_code == 418:
                     retry_after = int(response.headers.get('Retry-After', 1))
                     logger.warning(f"Rate limited. Retry after {retry_after}s")
-                    time.sleep(retry_after)
+                    self.limiter.pause(retry_after)
                     continue
                 elif response.status_code == 429:
                     retry_after = int(response.headers.get('Retry-After', 60))
                     logger.warning(f"Too many requests. Retry after {retry_after}s")
-                    time.sleep(retry_after)
+                    self.limiter.pause(retry_after)
                     continue
                 
                 return response
@@ -109,6 +240,10 @@ class BinanceAPI:
         logger.error(f"Max retries exceeded for {endpoint}")
         return None
     
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+    
     def get_account_info(self) -> Optional[Dict]:
         """Get account information"""
         logger.debug("Fetching account info...")
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Market Data Feed - PauloARIS Trading Bot
+Async WebSocket trade/ticker stream with reconnect, plus a local replay server
+Requires: pip install websockets (>= 13)
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Set
+
+try:
+    from websockets.asyncio.client import connect
+    from websockets.asyncio.server import serve
+    from websockets.exceptions import WebSocketException
+except ImportError:  # Optional: only the streaming path needs it
+    connect = serve = None
+    WebSocketException = Exception
+
+# Configuration
+BINANCE_WS_URL = 'wss://stream.binance.com:9443/ws'
+TESTNET_WS_URL = 'wss://testnet.binance.vision/ws'
+MARKET_DATA_URL = os.getenv('MARKET_DATA_URL', '')  # Overrides the Binance stream (e.g. ws://localhost:8765)
+
+BUFFER_SIZE = int(os.getenv('MARKET_DATA_BUFFER', '1000'))  # Recent ticks kept in memory
+QUEUE_SIZE = 1000  # Ticks queued per subscriber before dropping the oldest
+RECONNECT_BASE = 1.0  # Seconds before the first reconnect
+RECONNECT_MAX = 60.0  # Backoff ceiling
+OPEN_TIMEOUT = 10  # Seconds to complete the WebSocket handshake
+
+# Logging setup
+logging.basicConfig(
+    level=getattr(logging, os.getenv('LOG_LEVEL', 'INFO')),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('MarketData')
+
+
+def _require_websockets():
+    if connect is None:
+        raise RuntimeError("Streaming market data needs websockets: pip install websockets")
+
+
+@dataclass
+class Tick:
+    symbol: str
+    price: float
+    quantity: float
+    timestamp: datetime
+    trade_id: Optional[int] = None
+
+    def to_dict(self):
+        return {
+            'symbol': self.symbol,
+            'price': self.price,
+            'quantity': self.quantity,
+            'timestamp': self.timestamp.isoformat(),
+            'trade_id': self.trade_id
+        }
+
+
+def stream_url(symbol: str, stream: str = 'trade', testnet: bool = False) -> str:
+    """Binance raw stream URL, e.g. wss://stream.binance.com:9443/ws/btcusdt@trade"""
+    base = TESTNET_WS_URL if testnet else BINANCE_WS_URL
+    return f"{base}/{symbol.replace('/', '').lower()}@{stream}"
+
+
+def parse_message(raw) -> Optional[Tick]:
+    """
+    Tick from a Binance stream message: trade/aggTrade ('p', 'q', 'T'),
+    24hrTicker/miniTicker ('c', 'E'), combined streams ({'data': ...}).
+    Returns None for anything else (subscription acks, unknown events).
+    """
+    message = json.loads(raw)
+    if isinstance(message, dict) and 'data' in message:
+        message = message['data']
+    if not isinstance(message, dict):
+        return None
+
+    price = message.get('p', message.get('c'))
+    if price is None:
+        return None
+    millis = message.get('T') or message.get('E') or time.time() * 1000
+    return Tick(
+        symbol=message.get('s', ''),
+        price=float(price),
+        quantity=float(message.get('q', 0) or 0),
+        timestamp=datetime.fromtimestamp(millis / 1000, timezone.utc).replace(tzinfo=None),
+        trade_id=message.get('t', message.get('a'))
+    )
+
+
+class MarketDataFeed:
+    """
+    Streaming market data client.
+
+    Keeps the latest tick and a rolling buffer, and pushes every tick to
+    each subscriber queue (slow subscribers lose their oldest ticks rather
+    than blocking the feed). Reconnects with exponential backoff and
+    jitter; the backoff resets once a connection delivers data.
+    """
+
+    def __init__(self, url: str, buffer_size: int = BUFFER_SIZE,
+                 reconnect_base: float = RECONNECT_BASE, reconnect_max: float = RECONNECT_MAX):
+        self.url = url
+        self.buffer = deque(maxlen=buffer_size)
+        self.latest: Optional[Tick] = None
+        self.reconnect_base = reconnect_base
+        self.reconnect_max = reconnect_max
+        self.connections = 0
+        self.messages = 0
+        self.dropped = 0
+        self.running = False
+        self.connected = asyncio.Event()
+        self._subscribers: List[asyncio.Queue] = []
+        self._callbacks: List[Callable[[Tick], None]] = []
+
+    def subscribe(self, maxsize: int = QUEUE_SIZE) -> asyncio.Queue:
+        """Queue that receives every tick from now on"""
+        queue = asyncio.Queue(maxsize=maxsize)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def on_tick(self, callback: Callable[[Tick], None]):
+        """Call `callback(tick)` synchronously for every tick"""
+        self._callbacks.append(callback)
+
+    async def ticks(self) -> AsyncIterator[Tick]:
+        """Async iterator over ticks (subscribes for its lifetime)"""
+        queue = self.subscribe()
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.unsubscribe(queue)
+
+    def _publish(self, tick: Tick):
+        self.latest = tick
+        self.buffer.append(tick)
+        self.messages += 1
+        for callback in self._callbacks:
+            callback(tick)
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(tick)
+
+    def prices(self) -> List[float]:
+        """Prices in the rolling buffer, oldest first"""
+        return [tick.price for tick in self.buffer]
+
+    async def run(self):
+        """Connect and stream until stop(), reconnecting with backoff"""
+        _require_websockets()
+        self.running = True
+        attempt = 0
+        while self.running:
+            try:
+                async with connect(self.url, open_timeout=OPEN_TIMEOUT) as websocket:
+                    self.connections += 1
+                    self.connected.set()
+                    logger.info(f"Connected to {self.url}")
+                    async for raw in websocket:
+                        tick = parse_message(raw)
+                        if tick is not None:
+                            attempt = 0
+                            self._publish(tick)
+                        if not self.running:
+                            break
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.TimeoutError, WebSocketException) as e:
+                logger.warning(f"Market data connection lost: {e}")
+            finally:
+                self.connected.clear()
+
+            if self.running:
+                delay = min(self.reconnect_max, self.reconnect_base * 2 ** attempt)
+                delay *= random.uniform(0.5, 1.0)
+                attempt += 1
+                logger.info(f"Reconnecting in {delay:.1f}s (attempt {attempt})")
+                await asyncio.sleep(delay)
+
+    def stop(self):
+        self.running = False
+
+
+# ============ REPLAY SERVER ============
+
+def ticks_from_file(path: str, symbol: str = 'BTCUSDT') -> List[Tick]:
+    """Ticks along each candle's intrabar path (see backtest.candle_path)"""
+    from backtest import load_candles, candle_path
+
+    ticks = []
+    for candle in load_candles(path):
+        for price in candle_path(candle):
+            ticks.append(Tick(symbol=symbol, price=price, quantity=0.0, timestamp=candle[0]))
+    return ticks
+
+
+def trade_message(tick: Tick, trade_id: int) -> str:
+    """Binance-format trade event for a tick"""
+    millis = int(tick.timestamp.replace(tzinfo=timezone.utc).timestamp() * 1000)
+    return json.dumps({
+        'e': 'trade', 'E': millis, 's': tick.symbol, 't': trade_id,
+        'p': f"{tick.price:.8f}", 'q': f"{tick.quantity:.8f}", 'T': millis
+    })
+
+
+class ReplayServer:
+    """
+    Local stand-in for the exchange stream: replays ticks as Binance trade
+    events to every connected client, like a live feed (clients that
+    connect late or reconnect get the ticks from that point on).
+
+    speed: replay rate relative to the ticks' timestamps (60 = one minute
+        of data per second); 0 sends as fast as clients connect.
+    disconnect_every: close every client after this many messages, to
+        exercise reconnects.
+    """
+
+    def __init__(self, ticks: Iterable[Tick], host: str = 'localhost', port: int = 8765,
+                 speed: float = 0.0, disconnect_every: Optional[int] = None):
+        self.ticks = list(ticks)
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self.disconnect_every = disconnect_every
+        self.sent = 0
+        self.finished = asyncio.Event()
+        self._clients: Set = set()
+        self._has_clients = asyncio.Event()
+        self._server = None
+        self._task = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def _handler(self, websocket):
+        self._clients.add(websocket)
+        self._has_clients.set()
+        try:
+            await websocket.wait_closed()
+        finally:
+            self._clients.discard(websocket)
+            if not self._clients:
+                self._has_clients.clear()
+
+    async def _replay(self):
+        previous = None
+        for trade_id, tick in enumerate(self.ticks, 1):
+            if self.speed and previous is not None:
+                gap = (tick.timestamp - previous).total_seconds() / self.speed
+                if gap > 0:
+                    await asyncio.sleep(gap)
+            previous = tick.timestamp
+
+            # Ticks are not sent into the void while no client is connected
+            await self._has_clients.wait()
+            message = trade_message(tick, trade_id)
+            for websocket in list(self._clients):
+                try:
+                    await websocket.send(message)
+                except WebSocketException:
+                    self._clients.discard(websocket)
+            self.sent += 1
+
+            if self.disconnect_every and self.sent % self.disconnect_every == 0:
+                for websocket in list(self._clients):
+                    await websocket.close()
+            elif not self.speed:
+                await asyncio.sleep(0)
+        self.finished.set()
+
+    async def start(self):
+        _require_websockets()
+        self._server = await serve(self._handler, self.host, self.port)
+        if not self.port:
+            self.port = self._server.sockets[0].getsockname()[1]
+        self._task = asyncio.create_task(self._replay())
+        logger.info(f"Replaying {len(self.ticks)} ticks on {self.url}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+# ============ CLI ============
+
+async def _serve(args):
+    async with ReplayServer(ticks_from_file(args.path, args.symbol), host=args.host, port=args.port,
+                            speed=args.speed, disconnect_every=args.disconnect_every) as server:
+        await server.finished.wait()
+        logger.info(f"Replay finished: {server.sent} ticks sent")
+
+
+async def _watch(args):
+    url = args.url or MARKET_DATA_URL or stream_url(args.symbol, testnet=args.testnet)
+    feed = MarketDataFeed(url)
+    task = asyncio.create_task(feed.run())
+    try:
+        async for tick in feed.ticks():
+            print(f"{tick.timestamp.isoformat()}  {tick.symbol}  {tick.price:.2f}  {tick.quantity:.8f}")
+    finally:
+        feed.stop()
+        task.cancel()
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Market data stream client and local replay server')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_cmd = commands.add_parser('serve', help='Replay a CSV/Parquet price file as a WebSocket trade stream')
+    serve_cmd.add_argument('path')
+    serve_cmd.add_argument('--host', default='localhost')
+    serve_cmd.add_argument('--port', type=int, default=8765)
+    serve_cmd.add_argument('--speed', type=float, default=60.0, help='Data seconds per real second (0 = no pacing)')
+    serve_cmd.add_argument('--symbol', default='BTCUSDT')
+    serve_cmd.add_argument('--disconnect-every', type=int, help='Drop clients every N messages')
+
+    watch_cmd = commands.add_parser('watch', help='Print ticks from a stream')
+    watch_cmd.add_argument('url', nargs='?', help='Stream URL (default: MARKET_DATA_URL or Binance)')
+    watch_cmd.add_argument('--symbol', default='BTCUSDT')
+    watch_cmd.add_argument('--testnet', action='store_true')
+
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args) if args.command == 'serve' else _watch(args))
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
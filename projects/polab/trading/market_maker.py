@@ -9,10 +9,12 @@ import os
 import sys
 import time
 import json
+import heapq
 import logging
+from collections import Counter, deque
 from datetime import datetime
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Callable, Optional, List
 from enum import Enum
 
 # Configuration
@@ -20,6 +22,9 @@ LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 EXCHANGE = os.getenv('EXCHANGE', 'binance')  # binance, coinbase
 MODE = os.getenv('MODE', 'paper')  # paper, live
 TRADING_PAIR = os.getenv('TRADING_PAIR', 'BTC/USDT')
+MARKET_DATA_URL = os.getenv('MARKET_DATA_URL', '')  # WebSocket feed (e.g. ws://localhost:8765 from market_data.py serve)
+STREAM = os.getenv('STREAM', 'false').lower() == 'true'  # Drive the bot from the Binance trade stream
+STATUS_INTERVAL = 10  # Seconds between status saves when streaming
 
 # Strategy parameters
 GRID_LEVELS = int(os.getenv('GRID_LEVELS', '10'))
@@ -27,6 +32,16 @@ GRID_SPREAD = float(os.getenv('GRID_SPREAD', '0.01'))  # 1%
 DCA_AMOUNT = float(os.getenv('DCA_AMOUNT', '10'))  # USDT
 DCA_INTERVAL = int(os.getenv('DCA_INTERVAL', '3600'))  # 1 hour
 
+# Paper trading constants (shared with backtest.py and sweep.py)
+INITIAL_BALANCE = 10000.0  # USDT
+FEE_RATE = 0.001  # 0.1% per fill
+MAX_SELL_QUANTITY = 0.01  # BTC per grid sell order
+REGRID_THRESHOLD = 0.02  # Recalculate grid when price moves 2% from its center
+
+# Order book
+ORDER_ARCHIVE_SIZE = int(os.getenv('ORDER_ARCHIVE_SIZE', '1000'))  # Terminal orders kept in memory
+ORDER_LOG = os.getenv('ORDER_LOG', '')  # JSONL file for every terminal order (empty = disabled)
+
 # Logging setup
 logging.basicConfig(
     level=getattr(logging, LOG_LEVEL),
@@ -92,18 +107,92 @@ class Position:
         }
 
 
+class OrderBook:
+    """
+    Pending orders indexed by price.
+    
+    Bids live in a max-heap and asks in a min-heap, so a tick only looks at
+    the best price on each side and pops the orders it crosses:
+    O(log n + fills) per tick however long the bot runs. Filled and
+    cancelled orders leave the heaps and go to a bounded in-memory ring
+    (and, optionally, an append-only JSONL log on disk).
+    """
+    
+    def __init__(self, archive_size: int = ORDER_ARCHIVE_SIZE, log_path: Optional[str] = None):
+        self._bids = []  # (-price, seq, order)
+        self._asks = []  # (price, seq, order)
+        self._seq = 0
+        self._pending = 0
+        self.archive = deque(maxlen=archive_size)
+        self.log_path = log_path
+        self.counts = Counter()  # Terminal orders per status
+    
+    def __len__(self):
+        return self._pending
+    
+    def add(self, order: Order):
+        self._seq += 1
+        if order.type == OrderType.BUY:
+            heapq.heappush(self._bids, (-order.price, self._seq, order))
+        else:
+            heapq.heappush(self._asks, (order.price, self._seq, order))
+        self._pending += 1
+    
+    def pop_crossed(self, price: float) -> List[Order]:
+        """Remove and return the pending orders crossed by `price`, in placement order"""
+        crossed = []
+        while self._bids and (self._bids[0][2].status != OrderStatus.PENDING or -self._bids[0][0] >= price):
+            entry = heapq.heappop(self._bids)
+            if entry[2].status == OrderStatus.PENDING:
+                crossed.append(entry)
+        while self._asks and (self._asks[0][2].status != OrderStatus.PENDING or self._asks[0][0] <= price):
+            entry = heapq.heappop(self._asks)
+            if entry[2].status == OrderStatus.PENDING:
+                crossed.append(entry)
+        self._pending -= len(crossed)
+        crossed.sort(key=lambda entry: entry[1])
+        return [order for _, _, order in crossed]
+    
+    def cancel(self, order: Order):
+        """Cancel a pending order (dropped from its heap lazily)"""
+        if order.status == OrderStatus.PENDING:
+            order.status = OrderStatus.CANCELLED
+            self._pending -= 1
+            self.close(order)
+    
+    def close(self, order: Order):
+        """Archive an order that reached a terminal status"""
+        self.counts[order.status] += 1
+        self.archive.append(order)
+        if self.log_path:
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(order.to_dict()) + '\n')
+    
+    def pending(self) -> List[Order]:
+        """Pending orders, bids first (best price first on each side)"""
+        bids = sorted(entry for entry in self._bids if entry[2].status == OrderStatus.PENDING)
+        asks = sorted(entry for entry in self._asks if entry[2].status == OrderStatus.PENDING)
+        return [order for _, _, order in bids + asks]
+
+
 class MarketMakerBot:
     """Market Maker Bot with Grid Trading + DCA"""
     
-    def __init__(self, mode: TradingMode = TradingMode.PAPER):
+    def __init__(self, mode: TradingMode = TradingMode.PAPER,
+                 clock: Optional[Callable[[], datetime]] = None):
         self.mode = mode
+        # Wall clock when live/paper; backtests pass a simulated clock
+        self.clock = clock or datetime.now
         self.running = False
-        self.balance_usdt = 10000.0  # Paper balance
+        self.balance_usdt = INITIAL_BALANCE  # Paper balance
         self.balance_btc = 0.0
         self.current_price = 0.0
-        self.orders: List[Order] = []
+        self.book = OrderBook(log_path=ORDER_LOG or None)
         self.positions: List[Position] = []
         self.grid_levels: List[float] = []
+        self.last_dca: Optional[datetime] = None
+        self.feed = None  # market_data.MarketDataFeed when streaming
+        self._order_seq = 0
         
         logger.info(f"Market Maker Bot initialized")
         logger.info(f"Mode: {self.mode.value}")
@@ -128,8 +217,10 @@ class MarketMakerBot:
             
             return self.current_price
         else:
-            # Real exchange API call (to be implemented)
-            pass
+            # Latest price from the streaming feed, if attached
+            if self.feed is not None and self.feed.latest is not None:
+                self.current_price = self.feed.latest.price
+            return self.current_price
     
     def calculate_grid_levels(self, base_price: float) -> List[float]:
         """Calculate grid levels around current price"""
@@ -139,6 +230,11 @@ class MarketMakerBot:
             levels.append(level_price)
         return sorted(levels)
     
+    def _next_order_id(self, side: str) -> str:
+        """Unique order id (sequence avoids clashes within the same second)"""
+        self._order_seq += 1
+        return f"grid_{side}_{int(self.clock().timestamp())}_{self._order_seq}"
+    
     def place_grid_orders(self) -> List[Order]:
         """Place buy/sell orders at grid levels"""
         if not self.grid_levels:
@@ -152,29 +248,30 @@ class MarketMakerBot:
                 # Buy order below current price
                 quantity = DCA_AMOUNT / level
                 order = Order(
-                    id=f"grid_buy_{int(time.time())}_{len(orders)}",
+                    id=self._next_order_id('buy'),
                     type=OrderType.BUY,
                     status=OrderStatus.PENDING,
                     price=level,
                     quantity=quantity,
-                    timestamp=datetime.now()
+                    timestamp=self.clock()
                 )
                 orders.append(order)
             elif level > base_price:
                 # Sell order above current price
                 if self.balance_btc > 0:
-                    quantity = min(self.balance_btc, 0.01)  # Sell max 0.01 BTC
+                    quantity = min(self.balance_btc, MAX_SELL_QUANTITY)
                     order = Order(
-                        id=f"grid_sell_{int(time.time())}_{len(orders)}",
+                        id=self._next_order_id('sell'),
                         type=OrderType.SELL,
                         status=OrderStatus.PENDING,
                         price=level,
                         quantity=quantity,
-                        timestamp=datetime.now()
+                        timestamp=self.clock()
                     )
                     orders.append(order)
         
-        self.orders.extend(orders)
+        for order in orders:
+            self.book.add(order)
         logger.info(f"Placed {len(orders)} grid orders")
         for order in orders:
             logger.debug(f"  {order.type.value} {order.quantity:.8f} @ {order.price:.2f}")
@@ -196,32 +293,27 @@ class MarketMakerBot:
         if self.mode == TradingMode.PAPER:
             filled_orders = []
             
-            for order in self.orders:
-                if order.status == OrderStatus.PENDING:
-                    should_fill = False
-                    
-                    if order.type == OrderType.BUY and self.current_price <= order.price:
-                        should_fill = True
-                    elif order.type == OrderType.SELL and self.current_price >= order.price:
-                        should_fill = True
-                    
-                    if should_fill:
-                        order.status = OrderStatus.FILLED
-                        filled_orders.append(order)
-                        
-                        # Update balances
-                        if order.type == OrderType.BUY:
-                            fee = order.price * order.quantity * 0.001  # 0.1% fee
-                            total_cost = order.price * order.quantity + fee
-                            self.balance_usdt -= total_cost
-                            self.balance_btc += order.quantity
-                        elif order.type == OrderType.SELL:
-                            fee = order.price * order.quantity * 0.001
-                            total_received = order.price * order.quantity - fee
-                            self.balance_usdt += total_received
-                            self.balance_btc -= order.quantity
-                        
-                        logger.info(f"Order filled: {order.type.value} {order.quantity:.8f} @ ${order.price:.2f}")
+            # Only orders crossed by the current price leave the book
+            for order in self.book.pop_crossed(self.current_price):
+                order.status = OrderStatus.FILLED
+                filled_orders.append(order)
+                
+                # Update balances
+                if order.type == OrderType.BUY:
+                    fee = order.price * order.quantity * FEE_RATE
+                    total_cost = order.price * order.quantity + fee
+                    self.balance_usdt -= total_cost
+                    self.balance_btc += order.quantity
+                    order.fee = fee
+                elif order.type == OrderType.SELL:
+                    fee = order.price * order.quantity * FEE_RATE
+                    total_received = order.price * order.quantity - fee
+                    self.balance_usdt += total_received
+                    self.balance_btc -= order.quantity
+                    order.fee = fee
+                
+                self.book.close(order)
+                logger.info(f"Order filled: {order.type.value} {order.quantity:.8f} @ ${order.price:.2f}")
             
             return filled_orders
         
@@ -230,7 +322,7 @@ class MarketMakerBot:
     def calculate_pnl(self) -> float:
         """Calculate total PnL (profit and loss)"""
         # Initial portfolio value
-        initial_value = 10000.0  # Starting with 10000 USDT
+        initial_value = INITIAL_BALANCE
         
         # Current portfolio value
         current_btc_value = self.balance_btc * self.current_price
@@ -255,37 +347,49 @@ class MarketMakerBot:
             'portfolio_value': self.balance_usdt + (self.balance_btc * self.current_price),
             'pnl': pnl,
             'pnl_pct': pnl_pct,
-            'active_orders': len([o for o in self.orders if o.status == OrderStatus.PENDING]),
-            'filled_orders': len([o for o in self.orders if o.status == OrderStatus.FILLED])
+            'active_orders': len(self.book),
+            'filled_orders': self.book.counts[OrderStatus.FILLED]
         }
     
+    def step(self, price: float) -> List[Order]:
+        """
+        Process one price tick: recalculate the grid if needed, fill crossed
+        orders and run DCA when the interval has elapsed on `self.clock`.
+        Shared by the live loop and the backtester.
+        """
+        self.current_price = price
+        
+        # Calculate grid levels (if first run or price moved significantly)
+        if not self.grid_levels or abs(self.current_price - self.grid_levels[len(self.grid_levels)//2]) > self.current_price * REGRID_THRESHOLD:
+            self.grid_levels = self.calculate_grid_levels(self.current_price)
+            logger.info(f"Grid levels recalculated: {len(self.grid_levels)} levels")
+            self.place_grid_orders()
+        
+        # Check for filled orders
+        filled = self.check_filled_orders()
+        
+        # Execute DCA every DCA_INTERVAL seconds
+        now = self.clock()
+        if self.last_dca is None:
+            self.last_dca = now
+        elif (now - self.last_dca).total_seconds() >= DCA_INTERVAL:
+            self.execute_dca()
+            self.last_dca = now
+        
+        return filled
+    
     def run(self):
         """Main bot loop"""
         self.running = True
         logger.info("Starting Market Maker Bot...")
         
-        dca_counter = 0
-        
         try:
             while self.running:
                 # Get current price
-                self.current_price = self.get_current_price()
-                logger.info(f"Current price: ${self.current_price:.2f}")
-                
-                # Calculate grid levels (if first run or price moved significantly)
-                if not self.grid_levels or abs(self.current_price - self.grid_levels[len(self.grid_levels)//2]) > self.current_price * 0.02:
-                    self.grid_levels = self.calculate_grid_levels(self.current_price)
-                    logger.info(f"Grid levels recalculated: {len(self.grid_levels)} levels")
-                    self.place_grid_orders()
+                price = self.get_current_price()
+                logger.info(f"Current price: ${price:.2f}")
                 
-                # Check for filled orders
-                filled = self.check_filled_orders()
-                
-                # Execute DCA every interval
-                dca_counter += 1
-                if dca_counter >= DCA_INTERVAL:
-                    self.execute_dca()
-                    dca_counter = 0
+                self.step(price)
                 
                 # Print status
                 status = self.get_status()
@@ -307,6 +411,48 @@ class MarketMakerBot:
             self.running = False
             self.shutdown()
     
+    async def run_stream(self, feed, max_ticks: Optional[int] = None):
+        """
+        Event-driven loop: run step() on every tick pushed by a
+        market_data.MarketDataFeed. The clock follows the ticks' event
+        time, so replayed data behaves like a backtest and live data like
+        the wall clock.
+        """
+        import asyncio
+        
+        self.feed = feed
+        self.running = True
+        wall_clock = self.clock
+        tick_time = [wall_clock()]
+        self.clock = lambda: tick_time[0]
+        feed_task = asyncio.create_task(feed.run())
+        last_save = 0.0
+        processed = 0
+        logger.info(f"Starting Market Maker Bot on stream {feed.url}...")
+        
+        try:
+            async for tick in feed.ticks():
+                tick_time[0] = tick.timestamp
+                self.step(tick.price)
+                processed += 1
+                
+                if time.monotonic() - last_save >= STATUS_INTERVAL:
+                    self.save_status(self.get_status())
+                    last_save = time.monotonic()
+                if not self.running or (max_ticks and processed >= max_ticks):
+                    break
+        finally:
+            # Later run() / run_stream() calls must not see a frozen clock
+            self.clock = wall_clock
+            feed.stop()
+            feed_task.cancel()
+            try:
+                await feed_task
+            except asyncio.CancelledError:
+                pass
+            self.running = False
+            self.shutdown()
+    
     def save_status(self, status: dict):
         """Save bot status to JSON file"""
         status_file = '/home/pi/.openclaw/workspace/state/trading-bot-status.json'
@@ -350,8 +496,18 @@ def main():
     # Create bot
     bot = MarketMakerBot(mode=TradingMode(MODE))
     
-    # Run bot
-    bot.run()
+    # Run bot: streaming feed if configured, polling loop otherwise
+    if MARKET_DATA_URL or STREAM:
+        import asyncio
+        from market_data import MarketDataFeed, stream_url
+        
+        feed = MarketDataFeed(MARKET_DATA_URL or stream_url(TRADING_PAIR))
+        try:
+            asyncio.run(bot.run_stream(feed))
+        except KeyboardInterrupt:
+            logger.info("Bot stopped by user")
+    else:
+        bot.run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Parameter Sweep - PauloARIS Trading Bot
+Vectorized grid + DCA simulator for thousands of parameter combinations
+GRID_LEVELS x GRID_SPREAD x DCA_AMOUNT x DCA_INTERVAL, fanned out over all cores
+"""
+
+import os
+import csv
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backtest import load_candles
+from market_maker import INITIAL_BALANCE, FEE_RATE, MAX_SELL_QUANTITY, REGRID_THRESHOLD
+
+# Combinations per worker task
+CHUNK_SIZE = 256
+
+# Equity samples per combination used for drawdown
+EQUITY_SAMPLES = 2000
+
+# Ticks per block in the level-crossing search
+BLOCK_SIZE = 1024
+
+# Series shared with the workers (set by _init_worker)
+_series: Dict[str, np.ndarray] = {}
+
+
+@dataclass
+class SweepResult:
+    grid_levels: int
+    grid_spread: float
+    dca_amount: float
+    dca_interval: int
+    final_value: float
+    pnl: float
+    pnl_pct: float
+    max_drawdown_pct: float
+    fills: int
+
+    def to_dict(self):
+        return {
+            'grid_levels': self.grid_levels,
+            'grid_spread': self.grid_spread,
+            'dca_amount': self.dca_amount,
+            'dca_interval': self.dca_interval,
+            'final_value': self.final_value,
+            'pnl': self.pnl,
+            'pnl_pct': self.pnl_pct,
+            'max_drawdown_pct': self.max_drawdown_pct,
+            'fills': self.fills
+        }
+
+
+# ============ SERIES ============
+
+def candles_to_ticks(candles) -> (np.ndarray, np.ndarray):
+    """
+    Flatten candles into the same intrabar path as backtest.candle_path
+    (open, low, high, close if bullish; open, high, low, close if bearish).
+    Returns (prices, epoch seconds), four ticks per candle.
+    """
+    ohlc = np.array([c[1:] for c in candles], dtype=np.float64)
+    seconds = np.array([c[0].timestamp() for c in candles], dtype=np.float64)
+    o, h, l, c = ohlc.T
+    bullish = c >= o
+    path = np.column_stack([o, np.where(bullish, l, h), np.where(bullish, h, l), c])
+    return path.ravel(), np.repeat(seconds, 4)
+
+
+def regrid_ticks(prices: np.ndarray) -> np.ndarray:
+    """
+    Ticks where MarketMakerBot.step() recalculates the grid: the first tick,
+    then whenever the price moves more than REGRID_THRESHOLD from the last
+    grid center. Depends only on prices, so it is shared by every combination.
+    """
+    anchors = [0]
+    n = len(prices)
+    start, window = 1, 4096
+    while start < n:
+        base = prices[anchors[-1]]
+        segment = prices[start:start + window]
+        moved = np.abs(segment - base) > segment * REGRID_THRESHOLD
+        if moved.any():
+            anchors.append(start + int(moved.argmax()))
+            start, window = anchors[-1] + 1, 4096
+        else:
+            start += window
+            window *= 2
+    return np.array(anchors, dtype=np.int64)
+
+
+def dca_ticks(times: np.ndarray, interval: int) -> np.ndarray:
+    """Ticks where DCA fires: first tick at least `interval` seconds after the previous one"""
+    ticks = []
+    last = times[0]
+    while True:
+        i = int(np.searchsorted(times, last + interval, side='left'))
+        if i >= len(times):
+            break
+        ticks.append(i)
+        last = times[i]
+    return np.array(ticks, dtype=np.int64)
+
+
+def blocked(values: np.ndarray) -> (np.ndarray, np.ndarray):
+    """Values padded with +inf to whole blocks, and the minimum of each block"""
+    padded = np.full(-(-len(values) // BLOCK_SIZE) * BLOCK_SIZE, np.inf)
+    padded[:len(values)] = values
+    return padded, padded.reshape(-1, BLOCK_SIZE).min(axis=1)
+
+
+def first_at_or_below(padded: np.ndarray, block_min: np.ndarray, n: int, start: int,
+                      targets: np.ndarray) -> np.ndarray:
+    """
+    First tick >= `start` whose value is <= each target (`n` if none).
+
+    Scans the rest of the starting block directly, then finds the first
+    block whose minimum reaches the target with a running minimum over
+    block minima, and the exact tick inside that block: O(n / BLOCK_SIZE +
+    BLOCK_SIZE) per anchor instead of O(n).
+    """
+    result = np.full(targets.shape, n, dtype=np.int64)
+    head_end = min(n, (start // BLOCK_SIZE + 1) * BLOCK_SIZE)
+    head = np.minimum.accumulate(padded[start:head_end])
+    index = np.searchsorted(-head, -targets, side='left')
+    found = index < len(head)
+    result[found] = start + index[found]
+
+    # Not head_end // BLOCK_SIZE: when the series ends inside the starting
+    # block that is the starting block itself, whose ticks before `start` must not count
+    first_block = start // BLOCK_SIZE + 1
+    if first_block < len(block_min):
+        tail = np.minimum.accumulate(block_min[first_block:])
+        block = np.searchsorted(-tail, -targets, side='left')
+        pending = ~found & (block < len(tail))
+        if pending.any():
+            starts = (first_block + block[pending]) * BLOCK_SIZE
+            window = padded[starts[:, None] + np.arange(BLOCK_SIZE)]
+            result[pending] = starts + (window <= targets[pending][:, None]).argmax(axis=1)
+    return result
+
+
+# ============ WORKERS ============
+
+def _init_worker(series: Dict[str, np.ndarray]):
+    _series.update(series)
+
+
+def _crossings(anchor_batch: Sequence[int], spreads: np.ndarray, max_steps: int):
+    """
+    First tick at or after each anchor where the price reaches each grid level.
+
+    Returns (buys, sells) of shape (len(anchor_batch), len(spreads), max_steps):
+    buys[a, s, k] is the first tick with price <= base * (1 - spread * (k + 1)),
+    sells the first with price >= base * (1 + spread * (k + 1)); len(prices)
+    when never reached.
+    """
+    prices = _series['prices']
+    anchors = _series['anchors']
+    n = len(prices)
+    steps = np.arange(1, max_steps + 1)
+    offsets = spreads[:, None] * steps[None, :]
+    buys = np.empty((len(anchor_batch), len(spreads), max_steps), dtype=np.int64)
+    sells = np.empty_like(buys)
+
+    for row, a in enumerate(anchor_batch):
+        start = anchors[a]
+        base = prices[start]
+        buys[row] = first_at_or_below(*_series['low'], n, start, base * (1 - offsets))
+        # price >= level  <=>  -price <= -level
+        sells[row] = first_at_or_below(*_series['high'], n, start, -base * (1 + offsets))
+    return buys, sells
+
+
+def _binned(rows: np.ndarray, bins: np.ndarray, values: np.ndarray, shape) -> np.ndarray:
+    """Sum `values` into a (combinations, bins) matrix"""
+    flat = np.bincount(rows * shape[1] + bins, values, minlength=shape[0] * shape[1])
+    return flat.reshape(shape)
+
+
+def _simulate_chunk(combos: np.ndarray, spread_index: np.ndarray, interval_index: np.ndarray):
+    """
+    Simulate a chunk of combinations, vectorized across combinations.
+
+    Fill ticks come from the precomputed crossings. Only the sell orders
+    depend on the path (their size is the BTC held when the grid is
+    placed), so the anchors are walked in order for them; DCA and grid buys
+    are booked in one pass. Balance changes are binned per anchor (for the
+    sell decisions) and per equity sample (for drawdown and final value).
+    """
+    prices = _series['prices']
+    anchors = _series['anchors']
+    samples = _series['samples']
+    buys, sells = _series['buys'], _series['sells']
+    n = len(prices)
+    n_combos, n_anchors = len(combos), len(anchors)
+    rows = np.arange(n_combos)
+    by_anchor = (n_combos, n_anchors + 1)
+    by_sample = (n_combos, len(samples) + 1)
+
+    levels = combos[:, 0].astype(np.int64)
+    spreads = combos[:, 1]
+    amounts = combos[:, 2]
+    steps = np.arange(buys.shape[2])
+
+    # BTC held before each anchor (bin k: ticks in [anchors[k-1], anchors[k]))
+    d_btc = np.zeros(by_anchor)
+    # Balance changes per equity sample (bin j: ticks in (samples[j-1], samples[j]])
+    s_usdt = np.zeros(by_sample)
+    s_btc = np.zeros(by_sample)
+
+    # DCA: one schedule per interval, scaled by each combination's amount
+    for iv, ticks in enumerate(_series['dca']):
+        members = rows[interval_index == iv]
+        if len(members) == 0 or len(ticks) == 0:
+            continue
+        amount = amounts[members][:, None]
+        inverse = 1 / prices[ticks]
+        anchor_bins = np.searchsorted(anchors, ticks, side='right')
+        sample_bins = np.searchsorted(samples, ticks, side='left')
+        d_btc[members] += amount * np.bincount(anchor_bins, inverse, minlength=by_anchor[1])
+        s_usdt[members] -= amount * np.bincount(sample_bins, minlength=by_sample[1])
+        s_btc[members] += amount * np.bincount(sample_bins, inverse, minlength=by_sample[1])
+
+    # Grid buys: placed at every anchor regardless of balance
+    buy_levels = 1 - spreads[:, None] * (steps[None, :] + 1)
+    buy_mask = (steps[None, :] < (levels[:, None] + 1) // 2) & (buy_levels > 0)
+    buy_ticks = buys[:, spread_index, :]
+    anchor_rows, combo_rows, step_rows = np.nonzero(buy_mask[None, :, :] & (buy_ticks < n))
+    ticks = buy_ticks[anchor_rows, combo_rows, step_rows]
+    amount = amounts[combo_rows]
+    bought = amount / (prices[anchors[anchor_rows]] * buy_levels[combo_rows, step_rows])
+    d_btc += _binned(combo_rows, np.searchsorted(anchors, ticks, side='right'), bought, by_anchor)
+    events = [(combo_rows, ticks, -amount * (1 + FEE_RATE), bought)]
+
+    # Grid sells: quantity depends on the BTC held when the grid is placed
+    sell_levels = 1 + spreads[:, None] * (steps[None, :] + 1)
+    sell_mask = steps[None, :] < (levels[:, None] // 2)
+    held = np.zeros(n_combos)
+    for k in range(n_anchors):
+        held += d_btc[:, k]
+        sell_ticks = sells[k][spread_index]
+        hit = sell_mask & (sell_ticks < n) & (held > 0)[:, None]
+        if not hit.any():
+            continue
+        combo_rows, step_rows = np.nonzero(hit)
+        ticks = sell_ticks[combo_rows, step_rows]
+        quantity = np.minimum(held[combo_rows], MAX_SELL_QUANTITY)
+        level = prices[anchors[k]] * sell_levels[combo_rows, step_rows]
+        np.add.at(d_btc, (combo_rows, np.searchsorted(anchors, ticks, side='right')), -quantity)
+        events.append((combo_rows, ticks, level * quantity * (1 - FEE_RATE), -quantity))
+
+    combo_rows, ticks, usdt, btc = (np.concatenate(column) for column in zip(*events))
+    sample_bins = np.searchsorted(samples, ticks, side='left')
+    s_usdt += _binned(combo_rows, sample_bins, usdt, by_sample)
+    s_btc += _binned(combo_rows, sample_bins, btc, by_sample)
+    fills = np.bincount(combo_rows, minlength=n_combos)
+
+    usdt = INITIAL_BALANCE + np.cumsum(s_usdt, axis=1)
+    btc = np.cumsum(s_btc, axis=1)
+    equity = usdt[:, :-1] + btc[:, :-1] * prices[samples][None, :]
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), INITIAL_BALANCE)
+    drawdown = ((peak - equity) / peak).max(axis=1) * 100
+
+    final = usdt[:, -1] + btc[:, -1] * prices[-1]
+    return final, drawdown, fills
+
+
+# ============ SWEEP ============
+
+def parse_values(text: str, kind=float) -> List:
+    """'5,10,20' or a range 'start:stop:step' (stop inclusive)"""
+    if ':' in text:
+        start, stop, step = (float(x) for x in text.split(':'))
+        values = np.arange(start, stop + step / 2, step)
+        return [kind(round(v, 10)) for v in values]
+    return [kind(x) for x in text.split(',') if x.strip()]
+
+
+def sweep(
+    candles,
+    grid_levels: Sequence[int],
+    grid_spreads: Sequence[float],
+    dca_amounts: Sequence[float],
+    dca_intervals: Sequence[int],
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    equity_samples: int = EQUITY_SAMPLES
+) -> List[SweepResult]:
+    """
+    Evaluate every combination of the parameter lists over `candles`.
+
+    Matches MarketMakerBot.step() over backtest.py's intrabar path: grid
+    recalculated when the price leaves REGRID_THRESHOLD, buys at every level
+    below, sells of min(BTC held, MAX_SELL_QUANTITY) at every level above,
+    orders never cancelled, DCA every interval. Drawdown is measured on
+    `equity_samples` evenly spaced candle closes.
+
+    Balances are summed in a different order than the bot does, so they
+    differ in the last bits; while BTC held is below MAX_SELL_QUANTITY every
+    grid sell is sized from it and that difference compounds. Over long
+    runs expect PnL within a fraction of a percent of backtest.py, not
+    bit-identical.
+
+    Returns:
+        Results sorted by PnL, best first
+    """
+    prices, times = candles_to_ticks(candles)
+    anchors = regrid_ticks(prices)
+    closes = np.arange(3, len(prices), 4)
+    samples = closes[np.unique(np.linspace(0, len(closes) - 1, min(equity_samples, len(closes))).astype(np.int64))]
+
+    spreads = np.array(sorted(set(grid_spreads)), dtype=np.float64)
+    intervals = sorted(set(dca_intervals))
+    max_steps = (max(grid_levels) + 1) // 2
+
+    combos = np.array(list(itertools.product(grid_levels, grid_spreads, dca_amounts, dca_intervals)), dtype=np.float64)
+    spread_index = np.searchsorted(spreads, combos[:, 1])
+    interval_index = np.searchsorted(intervals, combos[:, 3])
+
+    series = {
+        'prices': prices,
+        'anchors': anchors,
+        'samples': samples,
+        'low': blocked(prices),
+        'high': blocked(-prices),
+        'dca': [dca_ticks(times, interval) for interval in intervals]
+    }
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(series,)) as pool:
+        # Level crossings per anchor, shared by all combinations
+        batches = np.array_split(np.arange(len(anchors)), min(len(anchors), workers * 4))
+        parts = list(pool.map(_crossings, batches, itertools.repeat(spreads), itertools.repeat(max_steps)))
+        buys = np.concatenate([b for b, _ in parts])
+        sells = np.concatenate([s for _, s in parts])
+
+    series.update(buys=buys, sells=sells)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(series,)) as pool:
+        chunks = [slice(i, i + chunk_size) for i in range(0, len(combos), chunk_size)]
+        outputs = pool.map(
+            _simulate_chunk,
+            [combos[c] for c in chunks],
+            [spread_index[c] for c in chunks],
+            [interval_index[c] for c in chunks]
+        )
+        final = np.empty(len(combos))
+        drawdown = np.empty(len(combos))
+        fills = np.empty(len(combos), dtype=np.int64)
+        for c, (f, d, n) in zip(chunks, outputs):
+            final[c], drawdown[c], fills[c] = f, d, n
+
+    results = [
+        SweepResult(
+            grid_levels=int(levels),
+            grid_spread=float(spread),
+            dca_amount=float(amount),
+            dca_interval=int(interval),
+            final_value=float(value),
+            pnl=float(value - INITIAL_BALANCE),
+            pnl_pct=float((value - INITIAL_BALANCE) / INITIAL_BALANCE * 100),
+            max_drawdown_pct=float(dd),
+            fills=int(n)
+        )
+        for (levels, spread, amount, interval), value, dd, n in zip(combos, final, drawdown, fills)
+    ]
+    results.sort(key=lambda r: r.pnl, reverse=True)
+    return results
+
+
+def save_results(results: List[SweepResult], path: str):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0].to_dict()))
+        writer.writeheader()
+        writer.writerows(r.to_dict() for r in results)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description='Sweep grid + DCA parameters over a CSV/Parquet price file')
+    parser.add_argument('path', help='CSV or Parquet file with OHLCV candles or ticks')
+    parser.add_argument('--levels', default='4:20:2', help="GRID_LEVELS values: '6,10,14' or 'start:stop:step'")
+    parser.add_argument('--spreads', default='0.0025:0.03:0.0025', help='GRID_SPREAD values')
+    parser.add_argument('--amounts', default='5,10,20,50', help='DCA_AMOUNT values (USDT)')
+    parser.add_argument('--intervals', default='1800,3600,7200,14400', help='DCA_INTERVAL values (seconds)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: all cores)')
+    parser.add_argument('--top', type=int, default=20, help='Rows to print')
+    parser.add_argument('--out', help='CSV file for the full ranking')
+    args = parser.parse_args()
+
+    candles = load_candles(args.path)
+    start = time.perf_counter()
+    results = sweep(
+        candles,
+        grid_levels=parse_values(args.levels, int),
+        grid_spreads=parse_values(args.spreads),
+        dca_amounts=parse_values(args.amounts),
+        dca_intervals=parse_values(args.intervals, int),
+        workers=args.workers
+    )
+    seconds = time.perf_counter() - start
+
+    print("\n" + "="*78)
+    print(f"📊 PARAMETER SWEEP - {len(results)} combinations, {len(candles)} candles in {seconds:.2f}s")
+    print("="*78)
+    print(f"{'#':>4} {'levels':>6} {'spread':>7} {'dca $':>7} {'dca s':>6} {'PnL $':>10} {'PnL %':>8} {'max DD %':>9} {'fills':>6}")
+    for rank, r in enumerate(results[:args.top], 1):
+        print(f"{rank:>4} {r.grid_levels:>6} {r.grid_spread:>7.4f} {r.dca_amount:>7.2f} {r.dca_interval:>6} "
+              f"{r.pnl:>10.2f} {r.pnl_pct:>+8.2f} {r.max_drawdown_pct:>9.2f} {r.fills:>6}")
+
+    if args.out:
+        save_results(results, args.out)
+        print(f"\n💾 Ranking saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
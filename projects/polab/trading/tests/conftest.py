@@ -0,0 +1,7 @@
+# Market Maker Bot - Tests
+# The trading modules import each other by name (from market_maker import ...)
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,78 @@
+# Client-side rate limiting of binance_api, driven by a fake clock
+
+import pytest
+
+from binance_api import RateLimiter, TokenBucket, USED_WEIGHT_HEADER
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the limiter sleeps"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def limiter(clock, weight_per_minute=100):
+    """Only the weight bucket binds: request counts are far above what the tests use"""
+    return RateLimiter(weight_per_minute=weight_per_minute, requests_per_minute=10_000,
+                       requests_per_second=10_000, safety=1.0, clock=clock, sleep=clock.sleep)
+
+
+def test_token_bucket_refills_over_period(clock):
+    bucket = TokenBucket(60, 60, clock)
+    bucket.take(60)
+    assert bucket.wait_time(30) == pytest.approx(30)
+    clock.now += 30
+    assert bucket.wait_time(30) == 0
+    clock.now += 600
+    assert bucket.wait_time(60) == 0
+    assert bucket.tokens == 60  # Capped at capacity
+
+
+def test_weight_budget_forces_wait(clock):
+    rate = limiter(clock)
+    rate.acquire(60)
+    assert clock.sleeps == []
+
+    # 40 tokens left, 60 needed: 20 tokens at 100/60 per second
+    rate.acquire(60)
+    assert sum(clock.sleeps) == pytest.approx(12)
+    assert rate.waited == pytest.approx(12)
+
+
+def test_update_clamps_to_used_weight_header(clock):
+    rate = limiter(clock)
+    rate.update({USED_WEIGHT_HEADER: '90'})  # Other clients on the same IP spent 90
+    rate.acquire(10)
+    assert clock.sleeps == []
+    rate.acquire(1)
+    assert sum(clock.sleeps) == pytest.approx(0.6)
+
+    # A lower count from the server never hands back tokens spent locally
+    tokens = rate.weight.tokens
+    rate.update({USED_WEIGHT_HEADER: '0'})
+    rate.update({})
+    assert rate.weight.tokens == pytest.approx(tokens)
+
+
+def test_pause_blocks_next_acquire(clock):
+    rate = limiter(clock)
+    rate.pause(5)
+    rate.pause(2)  # A shorter Retry-After does not shorten the pause
+    rate.acquire()
+    assert sum(clock.sleeps) == pytest.approx(5)
+    rate.acquire()
+    assert sum(clock.sleeps) == pytest.approx(5)
@@ -0,0 +1,39 @@
+# Offline round trip of the live path: ReplayServer -> MarketDataFeed -> MarketMakerBot.run_stream
+
+import asyncio
+from datetime import datetime, timedelta
+
+from market_data import MarketDataFeed, ReplayServer, Tick
+from market_maker import MarketMakerBot
+
+
+def make_ticks(n: int):
+    start = datetime(2024, 1, 1)
+    return [Tick(symbol='BTCUSDT', price=50000.0 + 10 * i, quantity=0.001, timestamp=start + timedelta(seconds=i))
+            for i in range(n)]
+
+
+def test_replay_round_trip_with_reconnect():
+    """Every tick reaches the bot across one forced reconnect, and the bot gets its clock back"""
+    ticks = make_ticks(10)
+    bot = MarketMakerBot()
+    wall_clock = bot.clock
+    seen = []
+
+    async def scenario():
+        async with ReplayServer(ticks, port=0, disconnect_every=6) as server:
+            feed = MarketDataFeed(server.url, reconnect_base=0.01, reconnect_max=0.05)
+            feed.on_tick(seen.append)
+            await asyncio.wait_for(bot.run_stream(feed, max_ticks=len(ticks)), timeout=10)
+            return feed
+
+    feed = asyncio.run(scenario())
+
+    assert [tick.price for tick in seen] == [tick.price for tick in ticks]
+    assert feed.connections == 2
+    assert bot.current_price == ticks[-1].price
+    assert bot.clock is wall_clock
+
+
+def test_stop_before_start():
+    asyncio.run(ReplayServer([], port=0).stop())
@@ -0,0 +1,50 @@
+# sweep.py must reproduce backtest.py (MarketMakerBot.step) for the bot's own parameters
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from backtest import Backtester
+from market_maker import GRID_LEVELS, GRID_SPREAD, DCA_AMOUNT, DCA_INTERVAL
+import numpy as np
+
+from sweep import BLOCK_SIZE, blocked, first_at_or_below, sweep
+
+
+def random_walk(n: int, seed: int = 7, start: float = 50000.0, step: float = 0.004):
+    """Minute candles (timestamp, open, high, low, close) of a seeded random walk"""
+    rng = random.Random(seed)
+    t = datetime(2024, 1, 1)
+    price = start
+    candles = []
+    for _ in range(n):
+        close = price * (1 + rng.gauss(0, step))
+        high = max(price, close) * (1 + abs(rng.gauss(0, step / 2)))
+        low = min(price, close) * (1 - abs(rng.gauss(0, step / 2)))
+        candles.append((t, price, high, low, close))
+        price = close
+        t += timedelta(minutes=1)
+    return candles
+
+
+@pytest.mark.parametrize('seed', [0, 3, 7])
+def test_matches_backtester(seed):
+    """Same final value and fill count as the bot replayed candle by candle"""
+    candles = random_walk(1500, seed=seed)  # 6000 ticks: the last block is partial
+    expected = Backtester().run(candles)
+
+    [result] = sweep(candles, [GRID_LEVELS], [GRID_SPREAD], [DCA_AMOUNT], [DCA_INTERVAL], workers=1)
+
+    assert len(expected.fills) > 50  # The series exercises the grid, not only DCA
+    assert result.fills == len(expected.fills)
+    assert result.final_value == pytest.approx(expected.final_value, rel=1e-9)
+
+
+def test_first_at_or_below_ignores_ticks_before_start():
+    """Starting in the last, partial block never returns an earlier tick"""
+    values = np.full(BLOCK_SIZE + 100, 10.0)
+    values[BLOCK_SIZE + 10] = 1.0  # Before start, same block
+    n = len(values)
+    result = first_at_or_below(*blocked(values), n, BLOCK_SIZE + 50, np.array([5.0, 10.0]))
+    assert list(result) == [n, BLOCK_SIZE + 50]